@@ -1,19 +1,28 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
 from modules.test_manager import TestManager
-from modules.query_executor import QueryExecutor
+from modules.query_executor import QueryExecutor, QueryTimeoutError
 from modules.security import SecurityTester
+from modules.log_scanner import LOG_FORMATS, LogScanner
 from modules.reporter import ReportGenerator
+from modules.baseline import create_baseline_store
+from modules.job_queue import create_job_manager
+from modules.selection import TestSelection, parse_shard
 from config import Config
+import json
 import os
 
 app = Flask(__name__)
 app.config.from_object(Config)
 
 # Initialize components
-query_executor = QueryExecutor(Config.DATABASE_URI)
-test_manager = TestManager(Config.TEST_CASES_DIR)
+query_executor = QueryExecutor.from_config(Config)
+baseline_store = create_baseline_store(Config)
+test_manager = TestManager(Config.TEST_CASES_DIR, cache_file=Config.TEST_CASE_CACHE_FILE,
+                           baseline_store=baseline_store)
 security_tester = SecurityTester(injection_patterns=Config.SQL_INJECTION_PATTERNS)
-report_generator = ReportGenerator()
+report_generator = ReportGenerator(Config.REPORT_DIR, baseline_store=baseline_store,
+                                   compression=Config.REPORT_COMPRESSION)
+job_manager = create_job_manager(Config)
 
 @app.route('/')
 def index():
@@ -36,17 +45,35 @@ def execute_query():
                 'issues': validation['issues']
             }), 400
         
+        # Stream SELECT results as NDJSON, one row per line
+        if data.get('stream') and validation['query_type'] == 'SELECT':
+            return Response(
+                stream_with_context(_stream_rows(query, data.get('batch_size'), data.get('params'))),
+                mimetype='application/x-ndjson'
+            )
+        
         # Execute query
-        result = query_executor.execute(query)
+        result = query_executor.execute(query, use_cache=data.get('cache', True),
+                                        params=data.get('params'))
         return jsonify({
             'success': True,
             'result': result
         })
+    except QueryTimeoutError as e:
+        return jsonify({
+            'error': str(e)
+        }), 504
     except Exception as e:
         return jsonify({
             'error': str(e)
         }), 500
 
+def _stream_rows(query, batch_size=None, params=None):
+    """Yield the rows of a query as NDJSON lines."""
+    for batch in query_executor.execute_stream(query, batch_size, params=params):
+        for row in batch:
+            yield json.dumps(row, default=str) + '\n'
+
 @app.route('/api/test/injection', methods=['POST'])
 def test_injection():
     data = request.get_json()
@@ -66,6 +93,36 @@ def test_injection():
             'error': str(e)
         }), 500
 
+@app.route('/api/test/injection/bulk', methods=['POST'])
+def test_injection_bulk():
+    log_format = request.args.get('format', 'lines')
+    if log_format not in LOG_FORMATS:
+        return jsonify({'error': f'Unsupported log format: {log_format}'}), 400
+    
+    # Accept a multipart upload or the raw request body, read as a stream
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    
+    # Requests may use fewer worker processes than configured, never more
+    workers = request.args.get('workers', Config.LOG_SCAN_WORKERS, type=int)
+    workers = min(max(1, workers), Config.LOG_SCAN_WORKERS)
+
+    try:
+        scanner = LogScanner(
+            injection_patterns=Config.SQL_INJECTION_PATTERNS,
+            workers=workers,
+            chunk_size=Config.LOG_SCAN_CHUNK_SIZE
+        )
+        lines = (line.decode('utf-8', 'replace') for line in stream)
+        return jsonify({
+            'success': True,
+            'scan': scanner.scan(lines, log_format)
+        })
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
 @app.route('/api/tests/load', methods=['GET'])
 def load_tests():
     try:
@@ -82,7 +139,8 @@ def load_tests():
 @app.route('/api/tests/run', methods=['POST'])
 def run_tests():
     try:
-        results = test_manager.run_tests(query_executor)
+        data = request.get_json(silent=True) or {}
+        results = test_manager.run_tests(query_executor, **_run_options(data))
         report = report_generator.generate_report(results)
         return jsonify({
             'success': True,
@@ -94,5 +152,125 @@ def run_tests():
             'error': str(e)
         }), 500
 
+def _run_options(data):
+    """Read test run options from a request body, falling back to the configuration."""
+    return {
+        'workers': int(data.get('workers', Config.TEST_WORKERS)),
+        'worker_mode': data.get('worker_mode', Config.TEST_WORKER_MODE),
+        'isolated': bool(data.get('isolated', Config.TEST_ISOLATION)),
+        'capture_plans': bool(data.get('capture_plans', Config.CAPTURE_PLANS)),
+        'selection': TestSelection(
+            names=data.get('names'),
+            tags=data.get('tags'),
+            files=data.get('files'),
+            shard=parse_shard(data['shard']) if data.get('shard') else None
+        ),
+        'max_failures': int(data['max_failures']) if data.get('max_failures') else None
+    }
+
+def _run_test_job(job, options):
+    """Run the suite as a background job, publishing each result as it completes."""
+    report = report_generator.begin_report()
+    
+    def on_result(result):
+        job.publish('result', report.add_result(result), item=True)
+    
+    try:
+        test_manager.run_tests(query_executor, on_result=on_result, cancel=job.cancel_event, **options)
+    except Exception:
+        report.close()
+        raise
+    return report.finish()
+
+@app.route('/api/tests/jobs', methods=['POST'])
+def submit_test_job():
+    try:
+        data = request.get_json(silent=True) or {}
+        options = _run_options(data)
+        total = len(test_manager.select_test_cases(options['selection']))
+        job = job_manager.submit(lambda job: _run_test_job(job, options), total=total)
+        return jsonify({
+            'success': True,
+            'job': job.to_dict(),
+            'status_url': f'/api/tests/jobs/{job.id}',
+            'events_url': f'/api/tests/jobs/{job.id}/events'
+        }), 202
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@app.route('/api/tests/jobs', methods=['GET'])
+def list_test_jobs():
+    return jsonify({
+        'success': True,
+        'jobs': job_manager.list_jobs()
+    })
+
+@app.route('/api/tests/jobs/<job_id>', methods=['GET'])
+def get_test_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    # Poll with ?after=<last event id> to receive only new results; once the
+    # job has finished they are only kept in the report
+    after = request.args.get('after', -1, type=int)
+    events = job.events(after, timeout=request.args.get('wait', 0, type=float))
+    response = {
+        'success': True,
+        'job': job.to_dict(),
+        'results': [event['data'] for event in events if event['event'] == 'result'],
+        'last_event': events[-1]['id'] if events else after
+    }
+    if job.finished and job.result is not None:
+        response['report'] = job.result
+    return jsonify(response)
+
+@app.route('/api/tests/jobs/<job_id>/events', methods=['GET'])
+def stream_test_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    
+    # EventSource resends the last event id when it reconnects
+    after = request.headers.get('Last-Event-ID', request.args.get('after', -1, type=int), type=int)
+    return Response(
+        stream_with_context(_job_events(job, after)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def _job_events(job, after):
+    """Yield the events of a job as server-sent events until it finishes."""
+    while True:
+        events = job.events(after, timeout=15)
+        if not events:
+            # Keep idle connections open through proxies
+            yield ': keep-alive\n\n'
+        for event in events:
+            after = event['id']
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+        if job.finished and not job.events(after):
+            return
+
+@app.route('/api/tests/jobs/<job_id>', methods=['DELETE'])
+def cancel_test_job(job_id):
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        'success': True,
+        'pool': query_executor.pool_status(),
+        'result_cache': query_executor.result_cache.stats() if query_executor.result_cache else None
+    })
+
 if __name__ == '__main__':
     app.run(debug=Config.DEBUG) 
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import json
+from asgiref.wsgi import WsgiToAsgi
+from app import app as flask_app, report_generator, test_manager
+from modules.async_executor import AsyncQueryExecutor
+from modules.query_executor import QueryTimeoutError
+from config import Config
+
+# Flask serves every route without an async implementation
+wsgi_app = WsgiToAsgi(flask_app)
+async_executor = None
+
+
+async def _read_json(receive):
+    """Read and decode a JSON request body."""
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    return json.loads(body) if body else {}
+
+
+async def _send_json(send, payload, status=200):
+    """Send a JSON response."""
+    body = json.dumps(payload, default=str).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def execute_query(data):
+    query = data.get('query')
+    if not query:
+        return {'error': 'No query provided'}, 400
+
+    try:
+        validation = async_executor.validate_query(query)
+        if not validation['is_valid']:
+            return {
+                'error': 'Invalid query',
+                'issues': validation['issues']
+            }, 400
+
+        result = await async_executor.execute(query, params=data.get('params'))
+        return {
+            'success': True,
+            'result': result
+        }, 200
+    except QueryTimeoutError as e:
+        return {'error': str(e)}, 504
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+
+async def run_tests(data):
+    try:
+        results = await test_manager.run_tests_async(
+            async_executor,
+            concurrency=int(data.get('concurrency', Config.ASYNC_TEST_CONCURRENCY)),
+            isolated=bool(data.get('isolated', Config.TEST_ISOLATION))
+        )
+        # Report files are written off the event loop
+        report = await asyncio.to_thread(report_generator.generate_report, results)
+        return {
+            'success': True,
+            'results': results,
+            'report': report
+        }, 200
+    except Exception as e:
+        return {'error': str(e)}, 500
+
+
+ROUTES = {
+    '/api/async/execute': execute_query,
+    '/api/async/tests/run': run_tests
+}
+
+
+async def _lifespan(receive, send):
+    global async_executor
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            async_executor = AsyncQueryExecutor.from_config(Config)
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if async_executor is not None:
+                await async_executor.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """
+    ASGI entry point, e.g. ``uvicorn asgi:app``.
+
+    Query execution and test runs under ``/api/async/`` run on the event
+    loop with an async database driver, so slow queries do not tie up a
+    worker thread each. All other routes are served by the Flask app.
+    """
+    if scope['type'] == 'lifespan':
+        await _lifespan(receive, send)
+        return
+
+    handler = ROUTES.get(scope.get('path')) if scope['type'] == 'http' else None
+    if handler is None:
+        await wsgi_app(scope, receive, send)
+        return
+    if scope['method'] != 'POST':
+        await _send_json(send, {'error': 'Method not allowed'}, 405)
+        return
+
+    global async_executor
+    if async_executor is None:
+        # Servers without lifespan support
+        async_executor = AsyncQueryExecutor.from_config(Config)
+    try:
+        data = await _read_json(receive)
+    except ValueError:
+        await _send_json(send, {'error': 'Invalid JSON body'}, 400)
+        return
+    payload, status = await handler(data)
+    await _send_json(send, payload, status)
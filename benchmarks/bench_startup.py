@@ -0,0 +1,113 @@
+"""
+Guard the start-up cost of the entry points and worker modules.
+
+Each target is imported in a fresh interpreter. The script fails when a
+target pulls in a module it must not import, which is what makes start-up
+slow, or when its median import time exceeds its budget. Budgets are
+multiples of the time a bare ``python -c pass`` takes to start on the same
+machine, so they hold on slow and fast hardware alike, and can be scaled:
+
+    python benchmarks/bench_startup.py --runs 7 --scale 2
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (module, budget in bare interpreter starts, modules that must not be imported)
+TARGETS: List[Tuple[str, float, Tuple[str, ...]]] = [
+    ('cli', 10, ('pandas', 'sqlalchemy', 'yaml', 'flask')),
+    ('modules.log_scanner', 8, ('pandas', 'sqlalchemy', 'yaml')),
+    ('modules.sql_lexer', 2, ('pandas', 'sqlalchemy', 'yaml')),
+    ('modules.query_executor', 40, ('pandas', 'yaml')),
+    ('modules.test_manager', 45, ('pandas', 'yaml')),
+    ('modules.reporter', 4, ('pandas', 'sqlalchemy', 'yaml')),
+    ('app', 80, ('pandas',))
+]
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+'''
+
+
+def measure(module: str, runs: int) -> Tuple[float, List[str]]:
+    """Import a module in fresh interpreters and return the median time and the loaded modules."""
+    timings = []
+    modules: List[str] = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', _PROBE.format(module=module)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        timings.append(result['elapsed'])
+        modules = result['modules']
+    return statistics.median(timings), modules
+
+
+def interpreter_start(runs: int) -> float:
+    """Median wall time of starting a bare interpreter."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='Interpreter starts per target')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget by this factor')
+    parser.add_argument('--json', action='store_true', help='Print the measurements as JSON')
+    args = parser.parse_args()
+
+    baseline = interpreter_start(args.runs) * 1000
+    results: List[Dict[str, object]] = []
+    failed = False
+    for module, budget, forbidden in TARGETS:
+        try:
+            elapsed, modules = measure(module, args.runs)
+        except subprocess.CalledProcessError as e:
+            # Targets whose optional dependencies are missing cannot be measured
+            results.append({'module': module, 'error': e.stderr.strip().splitlines()[-1]})
+            continue
+        loaded = sorted(name for name in forbidden
+                        if name in modules or any(m.startswith(name + '.') for m in modules))
+        over_budget = elapsed * 1000 > budget * baseline * args.scale
+        failed = failed or over_budget or bool(loaded)
+        results.append({
+            'module': module,
+            'milliseconds': round(elapsed * 1000, 1),
+            'budget': round(budget * baseline * args.scale, 1),
+            'forbidden_imports': loaded
+        })
+
+    if args.json:
+        print(json.dumps({'interpreter_start_ms': round(baseline, 1), 'targets': results}, indent=2))
+    else:
+        print(f"interpreter start: {baseline:.1f} ms")
+        for result in results:
+            if 'error' in result:
+                print(f"SKIP  {result['module']}: {result['error']}")
+                continue
+            status = 'FAIL' if result['forbidden_imports'] or result['milliseconds'] > result['budget'] else 'OK'
+            line = f"{status:<5} {result['module']:<24} {result['milliseconds']:>7.1f} ms (budget {result['budget']:.0f} ms)"
+            if result['forbidden_imports']:
+                line += f" imports {', '.join(result['forbidden_imports'])}"
+            print(line)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,323 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from colorama import Fore, Style, init
+from config import Config
+from modules.log_scanner import LOG_FORMATS, LogScanner
+
+# The test run stack (SQLAlchemy, PyYAML, ...) is imported by run_command,
+# so `scan` and `--help` start without it
+if TYPE_CHECKING:
+    from modules.query_executor import QueryExecutor
+
+# Statuses that make a run fail, so CI can reject the change
+FAILING_STATUSES = ('FAIL', 'ERROR', 'TIMEOUT', 'REGRESSED', 'DIVERGED')
+
+STATUS_COLORS = {
+    'PASS': Fore.GREEN,
+    'FAIL': Fore.RED,
+    'ERROR': Fore.YELLOW,
+    'TIMEOUT': Fore.MAGENTA,
+    'REGRESSED': Fore.RED,
+    'DIVERGED': Fore.CYAN
+}
+
+def print_results(test_results: List[Dict[str, Any]], summary: Dict[str, Any]):
+    """Print one line per test result followed by the run summary."""
+    for result in test_results:
+        color = STATUS_COLORS.get(result['status'], '')
+        line = f"{color}{result['status']:<9}{Style.RESET_ALL} {result['name']} ({result['execution_time']:.4f}s)"
+        if result.get('cached'):
+            line += ' [reused]'
+        if result['error']:
+            line += f"\n          {result['error']}"
+        if result.get('plan_changed'):
+            change = result['plan_changed']
+            line += f"\n          {Fore.YELLOW}Query plan changed{Style.RESET_ALL}"
+            if change['new_full_scans']:
+                line += f" (new full scans: {', '.join(change['new_full_scans'])})"
+        if result.get('snapshot_updated'):
+            line += f"\n          Snapshot written to {result['snapshot_updated']}"
+        for target, outcome in result.get('targets', {}).items():
+            color = STATUS_COLORS.get(outcome['status'], '')
+            line += f"\n          {target}: {color}{outcome['status']}{Style.RESET_ALL} ({outcome['execution_time']:.4f}s)"
+        print(line)
+
+    print(
+        f"\n{summary['total_tests']} tests: {summary['passed_tests']} passed, "
+        f"{summary['failed_tests']} failed, {summary['error_tests']} errors, "
+        f"{summary['timeout_tests']} timeouts, {summary['regressed_tests']} regressed, "
+        f"{summary['plan_changes']} plan changes"
+        + (f", {summary['diverged_tests']} diverged" if summary.get('diverged_tests') else '')
+        + (f", {summary['cached_tests']} reused" if summary.get('cached_tests') else '')
+    )
+
+def create_fixture_executor(args: argparse.Namespace, work_dir: str) -> 'QueryExecutor':
+    """Create an executor on a private copy of the fixture template."""
+    from modules.fixtures import create_fixture_loader
+    from modules.query_executor import QueryExecutor
+    loader = create_fixture_loader(Config)
+    options = {'batch_size': Config.QUERY_BATCH_SIZE, 'timeout': Config.MAX_QUERY_EXECUTION_TIME}
+    if args.workers <= 1:
+        return loader.create_executor(**options)
+    # Parallel workers need their own connections, so they share a file copy
+    return QueryExecutor(loader.clone_to_file(os.path.join(work_dir, 'fixtures.db')), **options)
+
+def run_command(args: argparse.Namespace) -> int:
+    """Run the test suite and return the process exit code."""
+    from modules.query_executor import QueryExecutor
+    if args.fixtures:
+        with tempfile.TemporaryDirectory() as work_dir:
+            return run_suite(args, create_fixture_executor(args, work_dir))
+    return run_suite(args, QueryExecutor.from_config(Config))
+
+def run_suite(args: argparse.Namespace, query_executor: 'QueryExecutor') -> int:
+    """Run the test suite on an executor, closing it afterwards."""
+    from modules.baseline import create_baseline_store
+    from modules.impact import create_impact_analyzer
+    from modules.reporter import ReportGenerator
+    from modules.selection import TestSelection, parse_shard
+    from modules.test_manager import FAILED_STATUSES, TestManager
+    selection = TestSelection(names=args.name, tags=args.tag, files=args.file,
+                              shard=parse_shard(args.shard) if args.shard else None)
+    baseline_store = None if args.no_baselines else create_baseline_store(Config)
+    test_manager = TestManager(args.test_dir, cache_file=Config.TEST_CASE_CACHE_FILE,
+                               baseline_store=baseline_store)
+    report_generator = ReportGenerator(Config.REPORT_DIR, baseline_store=baseline_store,
+                                       compression=args.compression)
+    # Results are written to the report file as they complete
+    report = report_generator.begin_report(args.format)
+
+    try:
+        results = test_manager.run_tests(
+            query_executor,
+            workers=args.workers,
+            worker_mode=args.worker_mode,
+            isolated=args.isolated,
+            capture_plans=args.capture_plans,
+            on_result=report.add_result,
+            update_snapshots=args.update_snapshots,
+            selection=selection,
+            max_failures=args.max_failures,
+            impact=create_impact_analyzer(Config) if args.incremental else None
+        )
+    except Exception:
+        report.close()
+        raise
+    finally:
+        query_executor.close()
+    report = report.finish()
+
+    print_results(results, report['summary'])
+    if args.max_failures and sum(result['status'] in FAILED_STATUSES for result in results) >= args.max_failures:
+        print(f"Stopped after {args.max_failures} failures (--max-failures)")
+    return 1 if any(result['status'] in FAILING_STATUSES for result in results) else 0
+
+def diff_command(args: argparse.Namespace) -> int:
+    """Run the test suite against several databases and return the process exit code."""
+    from modules.differential import create_target_executors, parse_targets
+    from modules.reporter import ReportGenerator
+    from modules.test_manager import TestManager
+
+    targets = parse_targets(args.targets)
+    if len(targets) < 2:
+        print('At least two targets are needed, e.g. --targets "a=sqlite:///a.db,b=sqlite:///b.db"')
+        return 2
+
+    test_manager = TestManager(args.test_dir, cache_file=Config.TEST_CASE_CACHE_FILE)
+    report = ReportGenerator(Config.REPORT_DIR, compression=args.compression).begin_report(args.format)
+    executors = create_target_executors(Config, targets)
+    try:
+        results = test_manager.run_differential(
+            executors,
+            isolated=args.isolated,
+            relative_tolerance=Config.DIFF_RELATIVE_TOLERANCE,
+            on_result=report.add_result
+        )
+    except Exception:
+        report.close()
+        raise
+    finally:
+        for executor in executors.values():
+            executor.close()
+    report = report.finish()
+
+    print_results(results, report['summary'])
+    return 1 if any(result['status'] in FAILING_STATUSES for result in results) else 0
+
+def load_command(args: argparse.Namespace) -> int:
+    """Replay the test suite as load against the database and return the process exit code."""
+    from modules.load_generator import LoadGenerator
+    from modules.query_executor import QueryExecutor
+    from modules.test_manager import TestManager
+
+    test_cases = TestManager(args.test_dir, cache_file=Config.TEST_CASE_CACHE_FILE).load_test_cases()
+    if args.case:
+        test_cases = [test_case for test_case in test_cases if test_case['name'] in args.case]
+    query_executor = QueryExecutor.from_config(Config)
+
+    def print_interval(interval: Dict[str, Any]):
+        label = 'warmup' if interval['warmup'] else f"{interval['elapsed']:6.1f}s"
+        utilization = interval['pool_utilization']
+        print(f"{label}  {interval['throughput']:8.1f} ops/s  {interval['errors']} errors"
+              + (f"  pool {utilization:.0%}" if utilization is not None else ''), file=sys.stderr)
+
+    try:
+        generator = LoadGenerator(query_executor, test_cases, workers=args.workers,
+                                  rate=args.rate, mode=args.mode, seed=args.seed)
+        summary = generator.run(duration=args.duration, warmup=args.warmup,
+                                max_operations=args.operations,
+                                on_interval=None if args.json else print_interval)
+    finally:
+        query_executor.close()
+
+    if args.json:
+        print(json.dumps(summary, indent=2, default=str))
+    else:
+        latency = summary['latency']
+        pool = summary['pool']
+        print(
+            f"\n{summary['operations']} operations in {summary['duration']:.1f}s: "
+            f"{summary['throughput']:.1f} ops/s, {summary['errors']} errors ({summary['error_rate']:.2%}), "
+            f"{summary['timeouts']} timeouts"
+        )
+        print(f"latency  p50 {latency['p50'] * 1000:.2f}ms  p90 {latency['p90'] * 1000:.2f}ms  "
+              f"p99 {latency['p99'] * 1000:.2f}ms  p99.9 {latency['p99_9'] * 1000:.2f}ms  "
+              f"max {latency['max'] * 1000:.2f}ms")
+        if pool['max_utilization'] is not None:
+            print(f"pool     peak {pool['peak_checked_out']} connections, "
+                  f"max utilization {pool['max_utilization']:.0%}, "
+                  f"average checkout wait {pool['average_wait_time'] * 1000:.2f}ms, "
+                  f"{pool['checkout_timeouts']} checkout timeouts")
+        for name, case in summary['test_cases'].items():
+            print(f"  {case['count']:>8}  p50 {case['p50'] * 1000:8.2f}ms  p99 {case['p99'] * 1000:8.2f}ms  "
+                  f"{case['errors']} errors  {name}")
+        if summary['last_error']:
+            print(f"{Fore.YELLOW}last error:{Style.RESET_ALL} {summary['last_error']}")
+    return 1 if summary['errors'] else 0
+
+def scan_command(args: argparse.Namespace) -> int:
+    """Scan query logs for injection patterns and return the process exit code."""
+    scanner = LogScanner(
+        injection_patterns=Config.SQL_INJECTION_PATTERNS,
+        workers=args.workers,
+        chunk_size=Config.LOG_SCAN_CHUNK_SIZE
+    )
+    flagged = 0
+    for path in args.paths:
+        summary = scanner.scan_file(path, args.log_format)
+        flagged += summary['flagged_fingerprints']
+        if args.json:
+            print(json.dumps(dict(summary, path=path), default=str))
+            continue
+
+        print(
+            f"{path}: {summary['statements']} statements, {summary['unique_statements']} unique, "
+            f"{summary['fingerprints']} fingerprints, {summary['flagged_fingerprints']} flagged"
+        )
+        for finding in summary['findings']:
+            print(f"  {Fore.RED}{finding['type']:<20}{Style.RESET_ALL} {finding['match']} "
+                  f"({finding['statements']} statements)")
+        for query in summary['queries'][:args.top]:
+            print(f"  {query['count']:>8}x {query['example']}")
+    return 1 if flagged else 0
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='SQL query testing tool')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the YAML test suite')
+    run_parser.add_argument('--test-dir', default=Config.TEST_CASES_DIR,
+                            help='Directory containing YAML test cases')
+    run_parser.add_argument('--workers', type=int, default=Config.TEST_WORKERS,
+                            help='Number of parallel workers')
+    run_parser.add_argument('--worker-mode', choices=['thread', 'process'], default=Config.TEST_WORKER_MODE,
+                            help='Worker pool type')
+    run_parser.add_argument('--isolated', action='store_true', default=Config.TEST_ISOLATION,
+                            help='Roll back every test case after it runs')
+    run_parser.add_argument('--format', choices=Config.REPORT_FORMATS, default='json',
+                            help='Report file format')
+    run_parser.add_argument('--compression', choices=['gzip', 'zstd'], default=Config.REPORT_COMPRESSION,
+                            help='Compress the report file')
+    run_parser.add_argument('--no-baselines', action='store_true',
+                            help='Skip latency regression checks against stored baselines')
+    run_parser.add_argument('--capture-plans', action='store_true', default=Config.CAPTURE_PLANS,
+                            help='Capture query plans and flag plan changes')
+    run_parser.add_argument('--fixtures', action='store_true',
+                            help='Run against a fresh copy of the schema and seed data instead of DATABASE_URI')
+    run_parser.add_argument('--name', action='append',
+                            help='Only run test cases whose name matches this glob pattern (repeatable)')
+    run_parser.add_argument('--tag', action='append',
+                            help='Only run test cases with this tag (repeatable)')
+    run_parser.add_argument('--file', action='append',
+                            help='Only run test cases from files matching this glob pattern (repeatable)')
+    run_parser.add_argument('--shard',
+                            help='Run shard k of n, e.g. 3/8; shards are balanced by recorded timings')
+    run_parser.add_argument('--max-failures', type=int,
+                            help='Stop the run after this many failed test cases')
+    run_parser.add_argument('--incremental', action='store_true',
+                            help='Only run test cases affected by table or test changes since their last green run')
+    run_parser.add_argument('--update-snapshots', action='store_true',
+                            help='Rewrite expected_snapshot files from the actual results instead of comparing')
+    run_parser.set_defaults(handler=run_command)
+
+    diff_parser = subparsers.add_parser('diff', help='Run the YAML test suite against several databases and compare them')
+    diff_parser.add_argument('--targets', default=Config.DIFF_TARGETS,
+                             help='Comma separated name=uri pairs; the first target is the reference')
+    diff_parser.add_argument('--test-dir', default=Config.TEST_CASES_DIR,
+                             help='Directory containing YAML test cases')
+    diff_parser.add_argument('--isolated', action='store_true', default=Config.TEST_ISOLATION,
+                             help='Roll back every test case after it runs')
+    diff_parser.add_argument('--format', choices=Config.REPORT_FORMATS, default='json',
+                             help='Report file format')
+    diff_parser.add_argument('--compression', choices=['gzip', 'zstd'], default=Config.REPORT_COMPRESSION,
+                             help='Compress the report file')
+    diff_parser.set_defaults(handler=diff_command)
+
+    load_parser = subparsers.add_parser('load', help='Replay the YAML test cases as load at a target rate')
+    load_parser.add_argument('--test-dir', default=Config.TEST_CASES_DIR,
+                             help='Directory containing YAML test cases')
+    load_parser.add_argument('--case', action='append',
+                             help='Only use the named test case (repeatable)')
+    load_parser.add_argument('--workers', type=int, default=4,
+                             help='Number of concurrent workers')
+    load_parser.add_argument('--rate', type=float,
+                             help='Target operations per second (required with --mode open)')
+    load_parser.add_argument('--mode', choices=['closed', 'open'], default='closed',
+                             help='closed: workers loop back to back; open: operations start on a fixed schedule')
+    load_parser.add_argument('--duration', type=float, default=10.0,
+                             help='Seconds of measured load')
+    load_parser.add_argument('--warmup', type=float, default=0.0,
+                             help='Seconds of unmeasured load before measuring')
+    load_parser.add_argument('--operations', type=int,
+                             help='Stop after this many measured operations')
+    load_parser.add_argument('--seed', type=int,
+                             help='Seed for the workload mix')
+    load_parser.add_argument('--json', action='store_true',
+                             help='Print the full summary as JSON')
+    load_parser.set_defaults(handler=load_command)
+
+    scan_parser = subparsers.add_parser('scan', help='Scan query logs for SQL injection patterns')
+    scan_parser.add_argument('paths', nargs='+', help='Log or SQL files, optionally gzip-compressed')
+    scan_parser.add_argument('--log-format', choices=LOG_FORMATS, default='lines',
+                             help='Input format of the files')
+    scan_parser.add_argument('--workers', type=int, default=Config.LOG_SCAN_WORKERS,
+                             help='Number of worker processes')
+    scan_parser.add_argument('--top', type=int, default=20,
+                             help='Number of flagged queries to show per file')
+    scan_parser.add_argument('--json', action='store_true',
+                             help='Print the full scan summary as JSON')
+    scan_parser.set_defaults(handler=scan_command)
+
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    init()
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
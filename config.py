@@ -25,12 +25,21 @@ class Config:
         print(f"Warning: Unsupported database type '{DB_TYPE}'. Defaulting to SQLite.")
         DATABASE_URI = f'sqlite:///{DB_NAME}.db'
 
+    # Connection pool configuration
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+
     # Application configuration
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev_secret_key_123')
     DEBUG = os.getenv('DEBUG', 'True').lower() == 'true'
     
     # Test configuration
     TEST_CASES_DIR = 'tests/test_cases'
+    # Optional file for persisting parsed test cases between runs
+    TEST_CASE_CACHE_FILE = os.getenv('TEST_CASE_CACHE_FILE') or None
     # Clean and parse MAX_QUERY_EXECUTION_TIME value
     try:
         max_time = os.getenv('MAX_QUERY_EXECUTION_TIME', '5').strip()
@@ -41,6 +50,23 @@ class Config:
         print("Warning: Invalid MAX_QUERY_EXECUTION_TIME value. Defaulting to 5 seconds.")
         MAX_QUERY_EXECUTION_TIME = 5.0
 
+    # Parallel test execution ('thread' or 'process' workers; 1 runs serially)
+    try:
+        TEST_WORKERS = max(1, int(os.getenv('TEST_WORKERS', '1').split('#')[0].strip()))
+    except ValueError:
+        print("Warning: Invalid TEST_WORKERS value. Defaulting to 1 worker.")
+        TEST_WORKERS = 1
+    TEST_WORKER_MODE = os.getenv('TEST_WORKER_MODE', 'thread').strip().lower()
+    # Rows fetched per batch when streaming query results
+    QUERY_BATCH_SIZE = int(os.getenv('QUERY_BATCH_SIZE', '1000'))
+    # Roll back every test case so suites never change the database
+    TEST_ISOLATION = os.getenv('TEST_ISOLATION', 'False').lower() == 'true'
+    # Test cases in flight at once on the async API (asgi.py)
+    ASYNC_TEST_CONCURRENCY = max(1, int(os.getenv('ASYNC_TEST_CONCURRENCY', '10')))
+    # Background test runs submitted to /api/tests/jobs
+    JOB_WORKERS = max(1, int(os.getenv('JOB_WORKERS', '1')))
+    JOB_HISTORY_SIZE = int(os.getenv('JOB_HISTORY_SIZE', '100'))
+
     SQL_INJECTION_PATTERNS = [
         "' OR '1'='1",
         "'; DROP TABLE users; --",
@@ -49,6 +75,41 @@ class Config:
         "1; DROP TABLE users; --"
     ]
 
+    # Fixture template built from the schema script and seed files (<table>.csv / <table>.parquet)
+    FIXTURE_SCHEMA_FILE = os.getenv('FIXTURE_SCHEMA_FILE', 'schema.sql')
+    FIXTURE_SEED_DIR = os.getenv('FIXTURE_SEED_DIR') or None
+    # Optional directory for reusing built templates between runs
+    FIXTURE_CACHE_DIR = os.getenv('FIXTURE_CACHE_DIR') or None
+
+    # Result cache for repeated read-only queries from /api/execute
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'False').lower() == 'true'
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '1024'))
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '60'))
+    RESULT_CACHE_MAX_BYTES = int(os.getenv('RESULT_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+    # Bulk log scanning (defaults to one worker process per core)
+    LOG_SCAN_WORKERS = int(os.getenv('LOG_SCAN_WORKERS', '0')) or os.cpu_count() or 1
+    LOG_SCAN_CHUNK_SIZE = int(os.getenv('LOG_SCAN_CHUNK_SIZE', '500'))
+
     # Report configuration
     REPORT_DIR = 'reports'
-    REPORT_FORMATS = ['json', 'yaml', 'html'] 
\ No newline at end of file
+    REPORT_FORMATS = ['json', 'jsonl', 'yaml', 'html', 'msgpack']
+    # Compress report files with 'gzip' or 'zstd' (empty for none)
+    REPORT_COMPRESSION = os.getenv('REPORT_COMPRESSION', '').strip().lower() or None
+
+    # SQLite file for latency baselines, plans and timings (disabled unless set,
+    # e.g. BASELINE_DB=reports/baselines.db)
+    BASELINE_DB = os.getenv('BASELINE_DB') or None
+    BASELINE_WINDOW = int(os.getenv('BASELINE_WINDOW', '20'))
+    BASELINE_MIN_SAMPLES = int(os.getenv('BASELINE_MIN_SAMPLES', '5'))
+    REGRESSION_THRESHOLD = float(os.getenv('REGRESSION_THRESHOLD', '3.0'))
+    REGRESSION_MIN_RATIO = float(os.getenv('REGRESSION_MIN_RATIO', '0.2'))
+    # Capture query plans of SELECT test cases and flag plan changes
+    CAPTURE_PLANS = os.getenv('CAPTURE_PLANS', 'False').lower() == 'true'
+    # Results and table fingerprints of the last green run of each case, for incremental runs
+    IMPACT_STATE_FILE = os.getenv('IMPACT_STATE_FILE', os.path.join(REPORT_DIR, 'impact_state.json'))
+
+    # Differential testing targets as name=uri pairs, e.g. 'sqlite=sqlite:///a.db,pg=postgresql://...'
+    DIFF_TARGETS = os.getenv('DIFF_TARGETS', '')
+    # Relative tolerance for numeric values compared across backends
+    DIFF_RELATIVE_TOLERANCE = float(os.getenv('DIFF_RELATIVE_TOLERANCE', '1e-9')) 
\ No newline at end of file
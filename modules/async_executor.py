@@ -0,0 +1,367 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from .query_executor import QueryExecutor, QueryTimeoutError, batch_statement, compile_statement, rows_per_batch
+
+# Async drivers used in place of each backend's default driver
+ASYNC_DRIVERS = {
+    'sqlite': 'aiosqlite',
+    'postgresql': 'asyncpg',
+    'mysql': 'aiomysql'
+}
+
+
+def to_async_uri(database_uri: str) -> str:
+    """
+    Rewrite a database URI to use the backend's async driver.
+
+    Args:
+        database_uri (str): SQLAlchemy URI, e.g. ``postgresql://...``
+
+    Returns:
+        str: The URI with an async driver, e.g. ``postgresql+asyncpg://...``
+    """
+    url = make_url(database_uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    if url.get_driver_name() == ASYNC_DRIVERS[backend]:
+        return database_uri
+    return url.set(drivername=f'{backend}+{ASYNC_DRIVERS[backend]}').render_as_string(hide_password=False)
+
+
+class AsyncQueryExecutor:
+    # Validation and timeout detection only look at the query and the
+    # dialect, so they are shared with the synchronous executor
+    validate_query = QueryExecutor.validate_query
+    _is_timeout = QueryExecutor._is_timeout
+
+    def __init__(self, database_uri: str, batch_size: int = 1000, pool_size: int = 5,
+                 max_overflow: int = 10, pool_timeout: float = 30, pool_recycle: int = -1,
+                 pool_pre_ping: bool = False, timeout: Optional[float] = None):
+        """
+        Asyncio counterpart of ``QueryExecutor`` on SQLAlchemy's async engine.
+
+        Queries hold a pooled connection only while they are in flight and
+        never block a thread while waiting for the database, so a single
+        process can keep as many queries running as the pool allows.
+
+        Args:
+            database_uri (str): SQLAlchemy URI, rewritten to the backend's
+                async driver (aiosqlite, asyncpg or aiomysql)
+            batch_size (int): Rows per batch when streaming and parameter
+                sets per ``execute_many`` batch
+            pool_size (int): Connections kept open in the pool
+            max_overflow (int): Extra connections opened under load
+            pool_timeout (float): Seconds to wait for a free connection
+            pool_recycle (int): Seconds after which connections are replaced
+            pool_pre_ping (bool): Test connections before using them
+            timeout (Optional[float]): Per-query execution time limit in seconds
+        """
+        self.database_uri = database_uri
+        self.batch_size = batch_size
+        self.timeout = timeout if timeout and timeout > 0 else None
+
+        options: Dict[str, Any] = {'pool_pre_ping': pool_pre_ping}
+        connect_args: Dict[str, Any] = {}
+        backend = make_url(database_uri).get_backend_name()
+        if backend != 'sqlite' or QueryExecutor._sqlite_path(database_uri):
+            options.update({
+                'pool_size': pool_size,
+                'max_overflow': max_overflow,
+                'pool_timeout': pool_timeout,
+                'pool_recycle': pool_recycle
+            })
+        # Let the server cancel slow statements as well, so a timed out query
+        # stops consuming database resources
+        if self.timeout and backend == 'postgresql':
+            connect_args['server_settings'] = {'statement_timeout': str(int(self.timeout * 1000))}
+        elif self.timeout and backend == 'mysql':
+            connect_args['init_command'] = f'SET SESSION MAX_EXECUTION_TIME = {int(self.timeout * 1000)}'
+        if connect_args:
+            options['connect_args'] = connect_args
+
+        self.engine = create_async_engine(to_async_uri(database_uri), **options)
+        if backend == 'sqlite':
+            QueryExecutor._enable_sqlite_transactions(self.engine.sync_engine)
+
+    @classmethod
+    def from_config(cls, config: Any) -> 'AsyncQueryExecutor':
+        """
+        Create an async executor from the application configuration.
+
+        Args:
+            config (Any): Configuration object such as ``config.Config``
+
+        Returns:
+            AsyncQueryExecutor: Executor for ``config.DATABASE_URI``
+        """
+        return cls(
+            config.DATABASE_URI,
+            batch_size=config.QUERY_BATCH_SIZE,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            timeout=config.MAX_QUERY_EXECUTION_TIME
+        )
+
+    @asynccontextmanager
+    async def _checkout(self, connection: Optional[AsyncConnection] = None) -> AsyncIterator[AsyncConnection]:
+        """Use the given connection, or check one out of the pool for the block."""
+        if connection is not None:
+            yield connection
+            return
+        async with self.engine.connect() as connection:
+            yield connection
+
+    @asynccontextmanager
+    async def isolated(self, connection: Optional[AsyncConnection] = None) -> AsyncIterator[AsyncConnection]:
+        """
+        Run statements in a transaction that is always rolled back.
+
+        Args:
+            connection (Optional[AsyncConnection]): Connection to isolate,
+                defaults to a connection checked out for the block
+
+        Yields:
+            AsyncConnection: The connection to execute statements on
+        """
+        async with self._checkout(connection) as connection:
+            if connection.in_transaction():
+                transaction = connection.begin_nested()
+            else:
+                transaction = connection.begin()
+            await transaction.start()
+            try:
+                yield connection
+            finally:
+                if transaction.is_active:
+                    await transaction.rollback()
+
+    @asynccontextmanager
+    async def _deadline(self, connection: AsyncConnection) -> AsyncIterator[None]:
+        """
+        Interrupt SQLite statements on the connection once the timeout elapses.
+
+        aiosqlite runs statements on a worker thread that cancelling the
+        awaiting task does not stop, so the statement itself is interrupted.
+        """
+        if not self.timeout or self.engine.dialect.name != 'sqlite':
+            yield
+            return
+
+        raw_connection = await connection.get_raw_connection()
+        driver_connection = raw_connection.driver_connection
+        loop = asyncio.get_running_loop()
+        interrupts: List[asyncio.Task] = []
+        guarding = True
+
+        def expire():
+            if guarding:
+                interrupts.append(loop.create_task(driver_connection.interrupt()))
+
+        timer = loop.call_later(self.timeout, expire)
+        try:
+            yield
+        finally:
+            # An interrupt still pending would hit whichever statement the
+            # pooled connection runs next, so it is dropped or waited for
+            guarding = False
+            timer.cancel()
+            for interrupt in interrupts:
+                if not interrupt.done():
+                    interrupt.cancel()
+                await asyncio.gather(interrupt, return_exceptions=True)
+
+    async def _with_deadline(self, operation: Any) -> Any:
+        """Await an operation, raising QueryTimeoutError once the timeout elapses."""
+        if not self.timeout or self.engine.dialect.name == 'sqlite':
+            # SQLite statements are interrupted by _deadline instead
+            return await operation
+        try:
+            return await asyncio.wait_for(operation, self.timeout)
+        except asyncio.TimeoutError:
+            raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+
+    async def execute(self, query: str, connection: Optional[AsyncConnection] = None,
+                      timings: Optional[Dict[str, float]] = None,
+                      params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Execute a SQL query and return the results.
+
+        The statement is committed immediately unless the connection is
+        already inside a transaction owned by the caller.
+
+        Args:
+            query (str): The SQL query to execute
+            connection (Optional[AsyncConnection]): Connection to execute on,
+                defaults to a connection checked out for this query
+            timings (Optional[Dict[str, float]]): If given, receives the
+                seconds spent executing the statement ('execute') and
+                fetching its rows ('fetch')
+            params (Optional[Dict[str, Any]]): Values for the query's
+                ``:name`` bind parameters
+
+        Returns:
+            Any: Rows as dictionaries, or the affected row count
+        """
+        async with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                async with self._deadline(connection):
+                    start = time.perf_counter()
+                    result = await self._with_deadline(connection.execute(compile_statement(query), params or {}))
+                    executed = time.perf_counter()
+
+                # Async results are buffered by execute, so converting them does not wait on the database
+                if result.returns_rows:
+                    output = [dict(row._mapping) for row in result]
+                else:
+                    output = {'affected_rows': result.rowcount}
+
+                if timings is not None:
+                    timings['execute'] = executed - start
+                    timings['fetch'] = time.perf_counter() - executed
+
+                if autocommit:
+                    await connection.commit()
+                return output
+
+            except QueryTimeoutError:
+                if autocommit and connection.in_transaction():
+                    await connection.rollback()
+                raise
+            except Exception as e:
+                if autocommit and connection.in_transaction():
+                    await connection.rollback()
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+
+    async def execute_stream(self, query: str, batch_size: Optional[int] = None,
+                             connection: Optional[AsyncConnection] = None,
+                             params: Optional[Dict[str, Any]] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Execute a SQL query and yield its rows in batches.
+
+        Args:
+            query (str): The SQL query to execute
+            batch_size (Optional[int]): Rows per batch, defaults to the
+                executor's batch size
+            connection (Optional[AsyncConnection]): Connection to execute on,
+                defaults to a connection checked out until the stream ends
+            params (Optional[Dict[str, Any]]): Values for the query's
+                ``:name`` bind parameters
+
+        Yields:
+            List[Dict[str, Any]]: The next batch of rows
+        """
+        batch_size = batch_size or self.batch_size
+        async with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                async with self._deadline(connection):
+                    result = await self._with_deadline(connection.stream(
+                        compile_statement(query),
+                        params or {},
+                        execution_options={'yield_per': batch_size}
+                    ))
+                    async for partition in result.partitions(batch_size):
+                        yield [dict(row._mapping) for row in partition]
+                if autocommit:
+                    await connection.commit()
+            except QueryTimeoutError:
+                raise
+            except Exception as e:
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+            finally:
+                if autocommit and connection.in_transaction():
+                    await connection.rollback()
+
+    async def execute_many(self, query: str, param_sets: Iterable[Dict[str, Any]],
+                           connection: Optional[AsyncConnection] = None,
+                           batch_size: Optional[int] = None,
+                           timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Execute a statement once per parameter set, in batches.
+
+        Batches are built like ``QueryExecutor.execute_many``'s: single-row
+        INSERT ... VALUES statements become one multi-row INSERT per batch.
+
+        Args:
+            query (str): The SQL statement with ``:name`` bind parameters
+            param_sets (Iterable[Dict[str, Any]]): One parameter dict per execution
+            connection (Optional[AsyncConnection]): Connection to execute on,
+                defaults to a connection checked out for this call
+            batch_size (Optional[int]): Parameter sets per batch, defaults to
+                the executor's batch size
+            timings (Optional[Dict[str, float]]): If given, receives the
+                seconds spent executing all batches ('execute'); 'fetch' is 0
+
+        Returns:
+            Dict[str, Any]: Total affected rows, and the number of executions
+                and batches
+        """
+        batch_size = rows_per_batch(query, batch_size or self.batch_size, self.engine.dialect.name)
+        param_sets = iter(param_sets)
+        summary = {'affected_rows': 0, 'executions': 0, 'batches': 0}
+        async with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                start = time.perf_counter()
+                async with self._deadline(connection):
+                    while True:
+                        batch = list(islice(param_sets, batch_size))
+                        if not batch:
+                            break
+                        result = await self._with_deadline(connection.execute(*batch_statement(query, batch)))
+                        if result.rowcount >= 0:
+                            summary['affected_rows'] += result.rowcount
+                        summary['executions'] += len(batch)
+                        summary['batches'] += 1
+                if timings is not None:
+                    timings['execute'] = time.perf_counter() - start
+                    timings['fetch'] = 0.0
+                if autocommit:
+                    await connection.commit()
+                return summary
+            except QueryTimeoutError:
+                if autocommit and connection.in_transaction():
+                    await connection.rollback()
+                raise
+            except Exception as e:
+                if autocommit and connection.in_transaction():
+                    await connection.rollback()
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Report connection pool occupancy.
+
+        Returns:
+            Dict[str, Any]: Pool class, size and connections in use and idle
+        """
+        pool = self.engine.sync_engine.pool
+        status = {'pool_class': type(pool).__name__}
+        if hasattr(pool, 'checkedout'):
+            status.update({
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow()
+            })
+        return status
+
+    async def close(self):
+        """Close all pooled database connections."""
+        await self.engine.dispose()
@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import statistics
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+def query_hash(query: str) -> str:
+    """
+    Hash a query so that whitespace-only edits keep the same baseline.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        str: Hex digest identifying the query
+    """
+    normalized = re.sub(r'\s+', ' ', query).strip().rstrip(';').strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()[:16]
+
+
+class BaselineStore:
+    def __init__(self, db_path: str, window: int = 20, min_samples: int = 5,
+                 threshold: float = 3.0, min_ratio: float = 0.2, min_delta: float = 0.001):
+        """
+        Local SQLite store of per-test latency history and query plans.
+
+        Args:
+            db_path (str): Path of the SQLite file holding the history
+            window (int): Number of most recent samples a baseline is built from
+            min_samples (int): Samples needed before regressions are reported
+            threshold (float): Robust z-score above which a test counts as slower
+            min_ratio (float): Minimum relative slowdown over the baseline median
+            min_delta (float): Minimum absolute slowdown in seconds
+        """
+        self.db_path = db_path
+        self.window = window
+        self.min_samples = min_samples
+        self.threshold = threshold
+        self.min_ratio = min_ratio
+        self.min_delta = min_delta
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS timings (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    test_name TEXT NOT NULL,
+                    query_hash TEXT NOT NULL,
+                    execution_time REAL NOT NULL,
+                    recorded_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute(
+                'CREATE INDEX IF NOT EXISTS idx_timings_test ON timings (test_name, query_hash, id)'
+            )
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS plans (
+                    test_name TEXT NOT NULL,
+                    query_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    nodes TEXT NOT NULL,
+                    recorded_at TEXT NOT NULL,
+                    PRIMARY KEY (test_name, query_hash)
+                )
+            ''')
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for one transaction; one per call keeps the store thread-safe."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def history(self, test_name: str, query: str) -> List[float]:
+        """
+        Get the most recent recorded latencies of a test.
+
+        Args:
+            test_name (str): Name of the test case
+            query (str): Query of the test case
+
+        Returns:
+            List[float]: Up to ``window`` latencies in seconds, newest first
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT execution_time FROM timings WHERE test_name = ? AND query_hash = ? '
+                'ORDER BY id DESC LIMIT ?',
+                (test_name, query_hash(query), self.window)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def median_timings(self) -> Dict[Tuple[str, str], float]:
+        """
+        Get the median recent latency of every test with recorded timings.
+
+        Returns:
+            Dict[Tuple[str, str], float]: Median of up to ``window`` latencies
+                in seconds by test name and query hash
+        """
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT test_name, query_hash, execution_time FROM ('
+                '  SELECT test_name, query_hash, execution_time, ROW_NUMBER() OVER ('
+                '    PARTITION BY test_name, query_hash ORDER BY id DESC) AS position'
+                '  FROM timings'
+                ') WHERE position <= ?',
+                (self.window,)
+            ).fetchall()
+        samples: Dict[Tuple[str, str], List[float]] = {}
+        for test_name, digest, execution_time in rows:
+            samples.setdefault((test_name, digest), []).append(execution_time)
+        return {key: statistics.median(values) for key, values in samples.items()}
+
+    def record(self, test_results: List[Dict[str, Any]]):
+        """
+        Add the latencies of passing tests to the history.
+
+        Args:
+            test_results (List[Dict[str, Any]]): Test results of a run
+        """
+        recorded_at = datetime.now().isoformat()
+        rows = [
+            (result['name'], query_hash(result['query']), latency(result), recorded_at)
+            for result in test_results if result['status'] == 'PASS'
+        ]
+        if rows:
+            with self._connect() as conn:
+                conn.executemany(
+                    'INSERT INTO timings (test_name, query_hash, execution_time, recorded_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    rows
+                )
+
+    def last_plan(self, test_name: str, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recently recorded query plan of a test.
+
+        Args:
+            test_name (str): Name of the test case
+            query (str): Query of the test case
+
+        Returns:
+            Optional[Dict[str, Any]]: Plan fingerprint and nodes, or None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                'SELECT fingerprint, nodes FROM plans WHERE test_name = ? AND query_hash = ?',
+                (test_name, query_hash(query))
+            ).fetchone()
+        if row is None:
+            return None
+        return {'fingerprint': row[0], 'nodes': json.loads(row[1])}
+
+    def record_plan(self, test_name: str, query: str, plan: Dict[str, Any]):
+        """
+        Store the query plan of a test, replacing the previous one.
+
+        Args:
+            test_name (str): Name of the test case
+            query (str): Query of the test case
+            plan (Dict[str, Any]): Plan fingerprint and nodes
+        """
+        with self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO plans (test_name, query_hash, fingerprint, nodes, recorded_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (test_name, query_hash(query), plan['fingerprint'], json.dumps(plan['nodes']),
+                 datetime.now().isoformat())
+            )
+
+    def check(self, result: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Compare a test result's latency against its baseline.
+
+        A test regresses when its latency is more than ``threshold`` robust
+        standard deviations (scaled median absolute deviation) above the
+        baseline median, and also slower by at least ``min_ratio`` and
+        ``min_delta``, so that noise on very fast queries is ignored.
+
+        Args:
+            result (Dict[str, Any]): A passing test result
+
+        Returns:
+            Optional[Dict[str, Any]]: Regression details, or None if the test
+                is within its baseline or has too little history
+        """
+        samples = self.history(result['name'], result['query'])
+        if len(samples) < self.min_samples:
+            return None
+
+        current = latency(result)
+        median = statistics.median(samples)
+        spread = 1.4826 * statistics.median(abs(sample - median) for sample in samples)
+        limit = max(median + self.threshold * spread,
+                    median * (1 + self.min_ratio),
+                    median + self.min_delta)
+        if current <= limit:
+            return None
+        return {
+            'baseline_median': median,
+            'baseline_samples': len(samples),
+            'current': current,
+            'limit': limit,
+            'ratio': current / median if median > 0 else None
+        }
+
+
+def latency(result: Dict[str, Any]) -> float:
+    """Latency of a test result, preferring the benchmark median when available."""
+    benchmark = result.get('benchmark')
+    if benchmark and benchmark.get('iterations'):
+        return benchmark['median']
+    return result['execution_time']
+
+
+def create_baseline_store(config: Any) -> Optional[BaselineStore]:
+    """
+    Create the baseline store described by the application configuration.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+
+    Returns:
+        Optional[BaselineStore]: The store, or None if baselines are disabled
+    """
+    if not config.BASELINE_DB:
+        return None
+    return BaselineStore(
+        config.BASELINE_DB,
+        window=config.BASELINE_WINDOW,
+        min_samples=config.BASELINE_MIN_SAMPLES,
+        threshold=config.REGRESSION_THRESHOLD,
+        min_ratio=config.REGRESSION_MIN_RATIO
+    )
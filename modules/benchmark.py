@@ -0,0 +1,50 @@
+import math
+from typing import Any, Dict, List
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Compute a percentile by linear interpolation between closest ranks.
+
+    Args:
+        sorted_values (List[float]): Values in ascending order
+        fraction (float): Percentile as a fraction between 0 and 1
+
+    Returns:
+        float: The interpolated percentile, or 0 for no values
+    """
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    weight = position - lower
+    return sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+
+
+def summarize_latencies(latencies: List[float], rows: int = 0) -> Dict[str, Any]:
+    """
+    Summarize benchmark iteration latencies.
+
+    Args:
+        latencies (List[float]): Latency of each measured iteration in seconds
+        rows (int): Total rows returned or affected over all iterations
+
+    Returns:
+        Dict[str, Any]: Iteration count, min, max, mean, median, p95 and p99
+            latency in seconds, and rows per second
+    """
+    ordered = sorted(latencies)
+    total_time = sum(ordered)
+    return {
+        'iterations': len(ordered),
+        'min': ordered[0] if ordered else 0.0,
+        'max': ordered[-1] if ordered else 0.0,
+        'mean': total_time / len(ordered) if ordered else 0.0,
+        'median': percentile(ordered, 0.5),
+        'p95': percentile(ordered, 0.95),
+        'p99': percentile(ordered, 0.99),
+        'rows_per_second': rows / total_time if total_time > 0 else 0.0
+    }
@@ -0,0 +1,361 @@
+import hashlib
+import math
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import zip_longest
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Number of sample rows reported for each side of an unordered mismatch
+MAX_DIFF_SAMPLES = 5
+
+
+class ResultComparator:
+    def __init__(self, ordered: bool = True, tolerance: float = 0.0, relative_tolerance: float = 0.0):
+        """
+        Compare query results row by row.
+
+        Args:
+            ordered (bool): Whether row order must match
+            tolerance (float): Absolute tolerance for numeric values
+            relative_tolerance (float): Relative tolerance for numeric values
+        """
+        self.ordered = ordered
+        self.tolerance = tolerance
+        self.relative_tolerance = relative_tolerance
+
+    @classmethod
+    def from_test_case(cls, test_case: Dict[str, Any]) -> 'ResultComparator':
+        """
+        Build a comparator from the comparison options of a test case.
+
+        Args:
+            test_case (Dict[str, Any]): Test case with optional ``ordered``,
+                ``tolerance`` and ``relative_tolerance`` keys
+
+        Returns:
+            ResultComparator: Comparator configured for the test case
+        """
+        return cls(
+            ordered=test_case.get('ordered', True),
+            tolerance=float(test_case.get('tolerance', 0.0)),
+            relative_tolerance=float(test_case.get('relative_tolerance', 0.0))
+        )
+
+    def compare(self, actual: Iterable[Dict[str, Any]], expected: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Compare two streams of rows.
+
+        Ordered comparisons stop at the first differing row. Unordered
+        comparisons without tolerance count row digests on both sides as a
+        multiset, so neither side has to be sorted. Unordered comparisons
+        with tolerance pair each actual row with an expected row whose
+        numbers are within tolerance, see ``_compare_tolerant``.
+
+        Args:
+            actual (Iterable[Dict[str, Any]]): Actual rows
+            expected (Iterable[Dict[str, Any]]): Expected rows
+
+        Returns:
+            Optional[Dict[str, Any]]: Compact diff, or None if the rows match
+        """
+        if self.ordered:
+            return self._compare_ordered(actual, expected)
+        if self._is_tolerant():
+            # Tolerant values cannot be hashed, so rows are matched instead
+            return self._compare_tolerant(actual, expected)
+        return self._compare_unordered(actual, expected)
+
+    def _is_tolerant(self) -> bool:
+        """Check whether numeric values are compared with a tolerance."""
+        return self.tolerance > 0 or self.relative_tolerance > 0
+
+    def _compare_ordered(self, actual: Iterable[Dict[str, Any]], expected: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Compare rows position by position and report the first difference."""
+        missing = object()
+        for index, (actual_row, expected_row) in enumerate(zip_longest(actual, expected, fillvalue=missing)):
+            if actual_row is missing:
+                return {'row': index, 'reason': 'missing_row', 'expected': expected_row}
+            if expected_row is missing:
+                return {'row': index, 'reason': 'unexpected_row', 'actual': actual_row}
+
+            columns = self._differing_columns(actual_row, expected_row)
+            if columns:
+                return {
+                    'row': index,
+                    'reason': 'row_mismatch',
+                    'columns': columns,
+                    'expected': {column: expected_row.get(column) for column in columns},
+                    'actual': {column: actual_row.get(column) for column in columns}
+                }
+        return None
+
+    def _compare_unordered(self, actual: Iterable[Dict[str, Any]], expected: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Compare rows as multisets of row digests."""
+        counts = Counter()
+        samples = {}
+        for row in actual:
+            digest = self.digest(row)
+            counts[digest] += 1
+            samples.setdefault(digest, row)
+        for row in expected:
+            digest = self.digest(row)
+            counts[digest] -= 1
+            samples.setdefault(digest, row)
+
+        unexpected = [(digest, count) for digest, count in counts.items() if count > 0]
+        missing = [(digest, -count) for digest, count in counts.items() if count < 0]
+        if not unexpected and not missing:
+            return None
+        return {
+            'reason': 'multiset_mismatch',
+            'unexpected_rows': sum(count for _, count in unexpected),
+            'missing_rows': sum(count for _, count in missing),
+            'unexpected': [samples[digest] for digest, _ in unexpected[:MAX_DIFF_SAMPLES]],
+            'missing': [samples[digest] for digest, _ in missing[:MAX_DIFF_SAMPLES]]
+        }
+
+    def _compare_tolerant(self, actual: Iterable[Dict[str, Any]], expected: Iterable[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Compare rows in any order, matching numbers within tolerance.
+
+        Rows are grouped by their columns and non-numeric values. Within a
+        group, actual rows are taken in order of their numbers and each is
+        paired with the first unmatched expected row whose numbers are all
+        within tolerance. Only expected rows whose first number is close
+        enough are tried, so a group is matched in about n log n steps.
+        With several numeric columns this greedy pairing can miss a valid
+        one, so a group left with unmatched rows on both sides is completed
+        to a maximum matching before any row is reported.
+        """
+        actual_groups = self._group_by_numbers(actual)
+        expected_groups = self._group_by_numbers(expected)
+        unexpected: List[Dict[str, Any]] = []
+        missing: List[Dict[str, Any]] = []
+        for signature, actual_entries in actual_groups.items():
+            unmatched_actual, unmatched_expected = self._match_group(actual_entries, expected_groups.pop(signature, []))
+            unexpected.extend(unmatched_actual)
+            missing.extend(unmatched_expected)
+        for expected_entries in expected_groups.values():
+            missing.extend(row for _, row in expected_entries)
+
+        if not unexpected and not missing:
+            return None
+        return {
+            'reason': 'multiset_mismatch',
+            'unexpected_rows': len(unexpected),
+            'missing_rows': len(missing),
+            'unexpected': unexpected[:MAX_DIFF_SAMPLES],
+            'missing': missing[:MAX_DIFF_SAMPLES]
+        }
+
+    @staticmethod
+    def _group_by_numbers(rows: Iterable[Dict[str, Any]]) -> Dict[str, List[Tuple[tuple, Dict[str, Any]]]]:
+        """Group rows by everything but their finite numbers, each group sorted by those numbers."""
+        groups: Dict[str, List[Tuple[tuple, Dict[str, Any]]]] = defaultdict(list)
+        for row in rows:
+            signature = []
+            numbers = []
+            for column, value in normalize_row(row):
+                if _is_number(value) and math.isfinite(value):
+                    signature.append((column,))
+                    numbers.append(value)
+                else:
+                    signature.append((column, value))
+            groups[repr(signature)].append((tuple(numbers), row))
+        for entries in groups.values():
+            entries.sort(key=lambda entry: entry[0])
+        return groups
+
+    def _match_group(self, actual: List[Tuple[tuple, Dict[str, Any]]],
+                     expected: List[Tuple[tuple, Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Pair the sorted rows of one group, returning the unmatched actual and expected rows."""
+        keys = [numbers[0] if numbers else 0 for numbers, _ in expected]
+        # Next unmatched expected position at or after each position
+        following = list(range(len(expected) + 1))
+
+        def next_unmatched(position: int) -> int:
+            root = position
+            while following[root] != root:
+                root = following[root]
+            while following[position] != root:
+                following[position], position = root, following[position]
+            return root
+
+        # Expected position paired with each actual row, -1 while unmatched
+        partners = []
+        for numbers, _ in actual:
+            partner = -1
+            if numbers:
+                reach = self._reach(numbers[0])
+                position = next_unmatched(bisect_left(keys, numbers[0] - reach))
+                limit = numbers[0] + reach
+            else:
+                position = next_unmatched(0)
+                limit = math.inf
+            while position < len(expected) and keys[position] <= limit:
+                if self._rows_close(numbers, expected[position][0]):
+                    following[position] = position + 1
+                    partner = position
+                    break
+                position = next_unmatched(position + 1)
+            partners.append(partner)
+
+        if -1 in partners and len(partners) - partners.count(-1) < len(expected):
+            partners = self._maximum_matching(actual, expected, keys, partners)
+        matched = set(partners)
+        unexpected = [row for partner, (_, row) in zip(partners, actual) if partner < 0]
+        missing = [row for position, (_, row) in enumerate(expected) if position not in matched]
+        return unexpected, missing
+
+    def _maximum_matching(self, actual: List[Tuple[tuple, Dict[str, Any]]], expected: List[Tuple[tuple, Dict[str, Any]]],
+                          keys: List[float], partners: List[int]) -> List[int]:
+        """Grow a pairing of actual to expected positions into a maximum one (Hopcroft-Karp)."""
+        candidates = []
+        for numbers, _ in actual:
+            if numbers:
+                reach = self._reach(numbers[0])
+                start, limit = bisect_left(keys, numbers[0] - reach), numbers[0] + reach
+            else:
+                start, limit = 0, math.inf
+            options = []
+            for position in range(start, len(expected)):
+                if keys[position] > limit:
+                    break
+                if self._rows_close(numbers, expected[position][0]):
+                    options.append(position)
+            candidates.append(options)
+
+        owners = [-1] * len(expected)
+        for index, partner in enumerate(partners):
+            if partner >= 0:
+                owners[partner] = index
+
+        while True:
+            # Layer the actual rows by their distance from an unmatched one
+            layers = [-1] * len(actual)
+            queue = [index for index, partner in enumerate(partners) if partner < 0]
+            for index in queue:
+                layers[index] = 0
+            reachable = False
+            for index in queue:
+                for position in candidates[index]:
+                    owner = owners[position]
+                    if owner < 0:
+                        reachable = True
+                    elif layers[owner] < 0:
+                        layers[owner] = layers[index] + 1
+                        queue.append(owner)
+            if not reachable:
+                return partners
+
+            # Augment along disjoint paths, iteratively to stay clear of the recursion limit
+            augmented = False
+            tried = [0] * len(actual)
+            for root in range(len(actual)):
+                if partners[root] >= 0:
+                    continue
+                path, positions = [root], []
+                while path:
+                    index = path[-1]
+                    if tried[index] == len(candidates[index]):
+                        # A dead end; no later path needs to pass through it
+                        layers[index] = -1
+                        path.pop()
+                        if positions:
+                            positions.pop()
+                        continue
+                    position = candidates[index][tried[index]]
+                    tried[index] += 1
+                    owner = owners[position]
+                    if owner < 0:
+                        positions.append(position)
+                        for step, step_position in zip(path, positions):
+                            partners[step] = step_position
+                            owners[step_position] = step
+                        augmented = True
+                        break
+                    if layers[owner] == layers[index] + 1:
+                        path.append(owner)
+                        positions.append(position)
+            if not augmented:
+                return partners
+
+    def _rows_close(self, numbers: tuple, others: tuple) -> bool:
+        """Check whether every number of a row is within tolerance of the other row's."""
+        return all(self._numbers_close(value, other) for value, other in zip(numbers, others))
+
+    def _reach(self, value: float) -> float:
+        """Largest distance from value at which another number can still be within tolerance."""
+        if self.relative_tolerance >= 1:
+            return math.inf
+        reach = max(self.tolerance, self.relative_tolerance * abs(value) / (1 - self.relative_tolerance))
+        # Leave room for rounding; candidates are checked exactly afterwards
+        return reach * (1 + 1e-9)
+
+    def _numbers_close(self, actual: float, expected: float) -> bool:
+        """Compare two numbers with the comparator's tolerance."""
+        return math.isclose(actual, expected, rel_tol=self.relative_tolerance, abs_tol=self.tolerance)
+
+    def _differing_columns(self, actual_row: Dict[str, Any], expected_row: Dict[str, Any]) -> List[str]:
+        """List the columns whose values differ between two rows."""
+        columns = []
+        for column in sorted(set(actual_row) | set(expected_row), key=str):
+            if column not in actual_row or column not in expected_row:
+                columns.append(column)
+            elif not self._values_equal(actual_row[column], expected_row[column]):
+                columns.append(column)
+        return columns
+
+    def _values_equal(self, actual: Any, expected: Any) -> bool:
+        """Compare two normalized values, applying numeric tolerance."""
+        actual = normalize_value(actual)
+        expected = normalize_value(expected)
+        if self._is_tolerant() and _is_number(actual) and _is_number(expected):
+            return self._numbers_close(actual, expected)
+        return actual == expected
+
+    @staticmethod
+    def digest(row: Dict[str, Any]) -> bytes:
+        """
+        Compute a digest of a row that is independent of column order and of
+        equivalent value types (e.g. Decimal('1.0') and 1).
+
+        Args:
+            row (Dict[str, Any]): The row to digest
+
+        Returns:
+            bytes: 16-byte row digest
+        """
+        return hashlib.blake2b(repr(normalize_row(row)).encode(), digest_size=16).digest()
+
+
+def normalize_row(row: Dict[str, Any]) -> tuple:
+    """Normalize a row into a sorted tuple of (column, value) pairs."""
+    return tuple(sorted(((str(column), normalize_value(value)) for column, value in row.items())))
+
+
+def normalize_value(value: Any) -> Any:
+    """
+    Normalize a value so equivalent values from different drivers compare equal.
+
+    Integral numbers become ints, other numbers floats, and dates and
+    binary values their string forms.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (Decimal, float)):
+        if math.isfinite(value) and value == int(value):
+            return int(value)
+        return float(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return bytes(value).hex()
+    return value
+
+
+def _is_number(value: Any) -> bool:
+    """Check whether a normalized value is numeric."""
+    return isinstance(value, (int, float))
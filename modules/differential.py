@@ -0,0 +1,101 @@
+from typing import Any, Dict, List, Optional
+from .comparator import normalize_value
+from .query_executor import QueryExecutor
+
+
+def parse_targets(spec: str) -> Dict[str, str]:
+    """
+    Parse named database targets.
+
+    Args:
+        spec (str): Comma separated ``name=uri`` pairs, e.g.
+            ``sqlite=sqlite:///a.db,pg=postgresql://user:pw@localhost/db``
+
+    Returns:
+        Dict[str, str]: Database URI by target name, in the given order;
+            the first target is the reference the others are compared with
+    """
+    targets: Dict[str, str] = {}
+    for item in spec.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        name, separator, uri = item.partition('=')
+        if not separator or not name.strip() or not uri.strip():
+            raise ValueError(f"Invalid target '{item}', expected name=uri")
+        if name.strip() in targets:
+            raise ValueError(f"Duplicate target name: {name.strip()}")
+        targets[name.strip()] = uri.strip()
+    return targets
+
+
+def create_target_executors(config: Any, targets: Dict[str, str]) -> Dict[str, QueryExecutor]:
+    """
+    Create one query executor per target, with the configured pool settings.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+        targets (Dict[str, str]): Database URI by target name
+
+    Returns:
+        Dict[str, QueryExecutor]: Executor by target name
+    """
+    executors: Dict[str, QueryExecutor] = {}
+    try:
+        for name, uri in targets.items():
+            executors[name] = QueryExecutor.from_config(config, uri)
+    except Exception:
+        for executor in executors.values():
+            executor.close()
+        raise
+    return executors
+
+
+def normalize_output(output: Any) -> Any:
+    """
+    Normalize a query output so equivalent results from different backends compare equal.
+
+    Column names are lowercased, since PostgreSQL folds unquoted names to
+    lower case while other backends keep them as written, and values are
+    normalized with ``normalize_value`` (numeric types, dates, booleans and
+    binary values).
+
+    Args:
+        output (Any): Rows as dictionaries, or an affected row count dict
+
+    Returns:
+        Any: The normalized output
+    """
+    if isinstance(output, list):
+        return [normalize_target_row(row) for row in output]
+    if isinstance(output, dict):
+        return normalize_target_row(output)
+    return output
+
+
+def normalize_target_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Lowercase the column names of a row and normalize its values."""
+    return {str(column).lower(): normalize_value(value) for column, value in row.items()}
+
+
+def summarize_divergences(divergences: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Describe the targets that disagree with the reference in one line.
+
+    Args:
+        divergences (List[Dict[str, Any]]): Divergences of a test case
+
+    Returns:
+        Optional[str]: Summary, or None if all targets agree
+    """
+    if not divergences:
+        return None
+    parts = []
+    for divergence in divergences:
+        if divergence['reason'] == 'status_mismatch':
+            parts.append(f"{divergence['target']} {divergence['status']} vs "
+                         f"{divergence['reference']} {divergence['reference_status']}")
+        else:
+            parts.append(f"{divergence['target']} differs from {divergence['reference']} "
+                         f"({divergence['diff']['reason']})")
+    return 'Targets diverge: ' + '; '.join(parts)
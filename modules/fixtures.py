@@ -0,0 +1,236 @@
+import csv
+import hashlib
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Any, Iterator, List, Optional, Sequence, Tuple
+from .query_executor import QueryExecutor
+
+SEED_EXTENSIONS = ('.csv', '.parquet')
+
+
+class FixtureLoader:
+    def __init__(self, schema_file: str = 'schema.sql', seed_dir: Optional[str] = None,
+                 cache_dir: Optional[str] = None, batch_size: int = 10000):
+        """
+        Build the schema and seed data once into an in-memory SQLite template.
+
+        The template is created by running the whole schema script in one
+        call and bulk loading every seed file, one table per file named after
+        the file. Suites and workers then get their own copy of the template
+        through SQLite's backup API, which copies database pages instead of
+        replaying statements, so setup time does not grow with the number of
+        suites.
+
+        Args:
+            schema_file (str): SQL script creating the schema (and any inline data)
+            seed_dir (Optional[str]): Directory of ``<table>.csv`` or
+                ``<table>.parquet`` seed files, loaded in name order
+            cache_dir (Optional[str]): Directory where built templates are
+                kept between runs, keyed by the content of the fixture files
+            batch_size (int): Rows inserted per ``executemany`` call
+        """
+        self.schema_file = schema_file
+        self.seed_dir = seed_dir
+        self.cache_dir = cache_dir
+        self.batch_size = batch_size
+        self._template: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def seed_files(self) -> List[str]:
+        """
+        List the seed files in load order.
+
+        Returns:
+            List[str]: Paths of CSV and Parquet files in the seed directory
+        """
+        if not self.seed_dir or not os.path.isdir(self.seed_dir):
+            return []
+        return [
+            os.path.join(self.seed_dir, filename)
+            for filename in sorted(os.listdir(self.seed_dir))
+            if filename.lower().endswith(SEED_EXTENSIONS)
+        ]
+
+    def fingerprint(self) -> str:
+        """Identify the fixture inputs, so a cached template is rebuilt when any of them changes."""
+        digest = hashlib.sha256()
+        with open(self.schema_file, 'rb') as f:
+            digest.update(f.read())
+        for path in self.seed_files():
+            stat = os.stat(path)
+            digest.update(f'{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+        return digest.hexdigest()[:16]
+
+    def template(self) -> sqlite3.Connection:
+        """
+        Get the template database, building or loading it on first use.
+
+        Returns:
+            sqlite3.Connection: In-memory database holding schema and seed data
+        """
+        with self._lock:
+            if self._template is None:
+                self._template = self._load_template()
+            return self._template
+
+    def _load_template(self) -> sqlite3.Connection:
+        template = sqlite3.connect(':memory:', check_same_thread=False)
+        cache_file = None
+        if self.cache_dir:
+            cache_file = os.path.join(self.cache_dir, f'template-{self.fingerprint()}.db')
+            if os.path.exists(cache_file):
+                source = sqlite3.connect(cache_file)
+                try:
+                    source.backup(template)
+                finally:
+                    source.close()
+                return template
+
+        with open(self.schema_file, 'r') as f:
+            template.executescript(f.read())
+        for path in self.seed_files():
+            self.load_seed(template, path)
+        template.commit()
+
+        if cache_file:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._backup_to_file(template, cache_file)
+        return template
+
+    def load_seed(self, connection: sqlite3.Connection, path: str) -> int:
+        """
+        Bulk load a seed file into the table named after it.
+
+        Rows are inserted with ``executemany`` in batches inside a single
+        transaction. Empty CSV fields are loaded as NULL.
+
+        Args:
+            connection (sqlite3.Connection): Database to load into
+            path (str): Path of a CSV (with a header row) or Parquet file
+
+        Returns:
+            int: Number of rows loaded
+        """
+        table = os.path.splitext(os.path.basename(path))[0]
+        if path.lower().endswith('.parquet'):
+            columns, rows = self._read_parquet(path)
+        else:
+            columns, rows = self._read_csv(path)
+
+        statement = 'INSERT INTO "{}" ({}) VALUES ({})'.format(
+            table.replace('"', '""'),
+            ', '.join('"{}"'.format(column.replace('"', '""')) for column in columns),
+            ', '.join('?' for _ in columns)
+        )
+        count = 0
+        with connection:
+            while True:
+                batch = list(islice(rows, self.batch_size))
+                if not batch:
+                    break
+                connection.executemany(statement, batch)
+                count += len(batch)
+        return count
+
+    def _read_csv(self, path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+        """Read the header of a CSV file and stream its rows."""
+        f = open(path, 'r', newline='', encoding='utf-8')
+        reader = csv.reader(f)
+        columns = next(reader, [])
+
+        def rows() -> Iterator[Sequence[Any]]:
+            with f:
+                for row in reader:
+                    yield [value if value != '' else None for value in row]
+
+        return columns, rows()
+
+    def _read_parquet(self, path: str) -> Tuple[List[str], Iterator[Sequence[Any]]]:
+        """Read the columns of a Parquet file and stream its rows in record batches."""
+        try:
+            import pyarrow.parquet as parquet
+        except ImportError:
+            raise ValueError(f"Loading {path} requires pyarrow (pip install pyarrow)")
+        parquet_file = parquet.ParquetFile(path)
+
+        def rows() -> Iterator[Sequence[Any]]:
+            for batch in parquet_file.iter_batches(batch_size=self.batch_size):
+                yield from zip(*(column.to_pylist() for column in batch.columns))
+
+        return parquet_file.schema_arrow.names, rows()
+
+    def clone(self) -> sqlite3.Connection:
+        """
+        Copy the template into a new in-memory database.
+
+        Returns:
+            sqlite3.Connection: A private copy of the fixture data
+        """
+        template = self.template()
+        connection = sqlite3.connect(':memory:', check_same_thread=False)
+        with self._lock:
+            template.backup(connection)
+        return connection
+
+    def clone_to_file(self, path: str) -> str:
+        """
+        Copy the template into a database file, e.g. for a pool of worker processes.
+
+        Args:
+            path (str): Database file to create or overwrite
+
+        Returns:
+            str: SQLAlchemy URI of the copy
+        """
+        template = self.template()
+        with self._lock:
+            self._backup_to_file(template, path)
+        return f'sqlite:///{path}'
+
+    @staticmethod
+    def _backup_to_file(source: sqlite3.Connection, path: str):
+        """Write a database to a file atomically."""
+        temp_path = f'{path}.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        target = sqlite3.connect(temp_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+        os.replace(temp_path, path)
+
+    def create_executor(self, **options: Any) -> QueryExecutor:
+        """
+        Create a query executor on a fresh in-memory clone of the template.
+
+        The clone is a single connection, so use ``clone_to_file`` instead
+        for parallel test runs.
+
+        Args:
+            **options (Any): Further ``QueryExecutor`` arguments
+
+        Returns:
+            QueryExecutor: Executor whose database is the clone
+        """
+        connection = self.clone()
+        return QueryExecutor('sqlite://', creator=lambda: connection, **options)
+
+
+def create_fixture_loader(config: Any) -> FixtureLoader:
+    """
+    Create the fixture loader described by the application configuration.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+
+    Returns:
+        FixtureLoader: Loader for the configured schema and seed files
+    """
+    return FixtureLoader(
+        config.FIXTURE_SCHEMA_FILE,
+        seed_dir=config.FIXTURE_SEED_DIR,
+        cache_dir=config.FIXTURE_CACHE_DIR
+    )
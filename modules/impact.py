@@ -0,0 +1,326 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+from .sql_lexer import table_access
+
+# Bump when the layout of the state file changes
+STATE_VERSION = 1
+# Stands for every table when a query's table access cannot be determined
+ALL_TABLES = '*'
+# Columns conventionally set on every update, whose maximum reveals updates
+# that leave the row count and the highest rowid unchanged
+UPDATE_MARKER_COLUMNS = ('updated_at', 'modified_at', 'last_modified')
+
+
+class ImpactPlan(NamedTuple):
+    # Positions of the test cases to run, in suite order
+    run: List[int]
+    # Result of the last green run by position of each test case to skip
+    cached: Dict[int, Dict[str, Any]]
+    # Tables whose schema or data changed since the last green run of a case
+    changed_tables: FrozenSet[str]
+    # Fingerprint of each table at the start of the run
+    fingerprints: Dict[str, str]
+    # Tables that running the plan may change, fingerprinted again afterwards
+    dirty_tables: FrozenSet[str]
+
+
+class ImpactAnalyzer:
+    def __init__(self, state_file: str):
+        """
+        Run only the test cases affected by changes since their last green run.
+
+        Each case's query is analyzed for the tables it reads and writes.
+        A case runs again when its definition changed, or when the schema or
+        data of one of its tables no longer matches the fingerprint recorded
+        when it last passed; otherwise its recorded result is reused.
+
+        Cases that depend on tables modified by other, non-isolated cases
+        are grouped, and a group always runs as a whole, so setup cases are
+        repeated before the cases that rely on them.
+
+        Args:
+            state_file (str): JSON file holding the results and table
+                fingerprints of the last green run of each case
+        """
+        self.state_file = state_file
+
+    @staticmethod
+    def case_key(test_case: Dict[str, Any]) -> str:
+        """Identify a test case across runs by its file and name."""
+        return f"{test_case.get('source_file', '')}::{test_case['name']}"
+
+    @staticmethod
+    def case_hash(test_case: Dict[str, Any], isolated: bool) -> str:
+        """
+        Hash everything that defines a test case's result.
+
+        Args:
+            test_case (Dict[str, Any]): Parsed test case
+            isolated (bool): Run-wide isolation setting
+
+        Returns:
+            str: Hex digest of the case definition
+        """
+        definition = {key: value for key, value in test_case.items() if key not in ('source_file', 'cached_result')}
+        definition['isolated'] = bool(test_case.get('isolated', isolated))
+        snapshot = test_case.get('expected_snapshot')
+        if snapshot and os.path.exists(snapshot):
+            stat = os.stat(snapshot)
+            definition['expected_snapshot'] = [snapshot, stat.st_size, stat.st_mtime_ns]
+        encoded = json.dumps(definition, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()[:32]
+
+    @staticmethod
+    def dependencies(test_case: Dict[str, Any]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """
+        Find the tables a test case accesses and the tables it writes.
+
+        Args:
+            test_case (Dict[str, Any]): Parsed test case
+
+        Returns:
+            Tuple[FrozenSet[str], FrozenSet[str]]: Tables read or written,
+                and tables written; ``ALL_TABLES`` when they are unknown
+        """
+        access = table_access(test_case['query'])
+        accessed = access.read | access.written
+        written = access.written
+        if access.unknown_writes:
+            accessed = written = frozenset((ALL_TABLES,))
+        return accessed, written
+
+    def plan(self, test_cases: List[Dict[str, Any]], query_executor: Any, isolated: bool = False) -> ImpactPlan:
+        """
+        Decide which test cases to run and which results to reuse.
+
+        Args:
+            test_cases (List[Dict[str, Any]]): Test cases in suite order
+            query_executor (QueryExecutor): Executor of the database under test
+            isolated (bool): Run-wide isolation setting
+
+        Returns:
+            ImpactPlan: Cases to run, results to reuse and the table fingerprints
+        """
+        state = self._read_state()
+        keys = self._unique_keys(test_cases)
+        dependencies = [self.dependencies(test_case) for test_case in test_cases]
+        tables = set().union(*(accessed for accessed, _ in dependencies)) - {ALL_TABLES}
+        fingerprints = self.fingerprint_tables(query_executor, tables)
+
+        changed: Set[str] = set()
+        affected: Set[int] = set()
+        for position, test_case in enumerate(test_cases):
+            entry = state.get(keys[position])
+            if entry is None or entry['hash'] != self.case_hash(test_case, isolated):
+                affected.add(position)
+                continue
+            accessed = dependencies[position][0]
+            recorded = entry['tables']
+            if ALL_TABLES in accessed:
+                # Compare every known table, including ones seen when the case last ran
+                accessed = frozenset(tables | set(recorded))
+            stale = {table for table in accessed
+                     if table not in recorded or table not in fingerprints or fingerprints[table] != recorded[table]}
+            if stale:
+                changed |= stale
+                affected.add(position)
+
+        groups = self._group(test_cases, dependencies, isolated)
+        affected_groups = {groups[position] for position in affected}
+        run = [position for position in range(len(test_cases)) if groups[position] in affected_groups]
+        dirty: Set[str] = set()
+        for position in run:
+            if not test_cases[position].get('isolated', isolated):
+                dirty |= dependencies[position][1]
+        if ALL_TABLES in dirty:
+            dirty = set(tables)
+        return ImpactPlan(
+            run=run,
+            cached={position: state[keys[position]]['result']
+                    for position in range(len(test_cases)) if groups[position] not in affected_groups},
+            changed_tables=frozenset(changed),
+            fingerprints=fingerprints,
+            dirty_tables=frozenset(dirty)
+        )
+
+    def record(self, plan: ImpactPlan, test_cases: List[Dict[str, Any]], results: List[Dict[str, Any]],
+               query_executor: Any, isolated: bool = False) -> bool:
+        """
+        Remember the results of a green run for later incremental runs.
+
+        Nothing is recorded unless every test case ran (or was reused) and
+        passed. Tables the run may have changed are fingerprinted again, so
+        the next run starts from the state this run left behind.
+
+        Args:
+            plan (ImpactPlan): Plan the run followed
+            test_cases (List[Dict[str, Any]]): Test cases in suite order
+            results (List[Dict[str, Any]]): Results in suite order
+            query_executor (QueryExecutor): Executor of the database under test
+            isolated (bool): Run-wide isolation setting
+
+        Returns:
+            bool: Whether the run was green and has been recorded
+        """
+        if len(results) != len(test_cases) or any(result['status'] != 'PASS' for result in results):
+            return False
+        fingerprints = {table: fingerprint for table, fingerprint in plan.fingerprints.items()
+                        if table not in plan.dirty_tables}
+        fingerprints.update(self.fingerprint_tables(query_executor, set(plan.dirty_tables)))
+        tables = set(fingerprints)
+
+        state = self._read_state()
+        keys = self._unique_keys(test_cases)
+        for position, (test_case, result) in enumerate(zip(test_cases, results)):
+            accessed = self.dependencies(test_case)[0]
+            if ALL_TABLES in accessed:
+                accessed = tables
+            state[keys[position]] = {
+                'hash': self.case_hash(test_case, isolated),
+                # Tables that could not be fingerprinted are left out, so the case runs next time
+                'tables': {table: fingerprints[table] for table in accessed if table in fingerprints},
+                'result': {key: value for key, value in result.items() if key != 'cached'}
+            }
+        self._write_state(state)
+        return True
+
+    def fingerprint_tables(self, query_executor: Any, tables: Set[str]) -> Dict[str, str]:
+        """
+        Fingerprint the schema and data of tables from change markers.
+
+        Each table's data is described by one aggregate query: its row
+        count, the highest value of each primary key column (the rowid of
+        SQLite tables without one) and the latest value of any
+        ``UPDATE_MARKER_COLUMNS``. The query scans the table, but no rows
+        are transferred or hashed, and the answer is exact on every
+        database. Rows updated in place outside the suite go unnoticed
+        unless such a column records the update.
+
+        Table names are matched case-insensitively, since the names
+        extracted from queries are lowercased. Tables that cannot be
+        resolved to exactly one table, or whose markers cannot be read, are
+        left out, which makes every case depending on them run.
+
+        Args:
+            query_executor (QueryExecutor): Executor of the database under test
+            tables (Set[str]): Table names
+
+        Returns:
+            Dict[str, str]: Fingerprint by table name
+        """
+        from sqlalchemy import inspect
+        inspector = inspect(query_executor.engine)
+        try:
+            names = inspector.get_table_names()
+        except Exception:
+            return {}
+        by_lowered: Dict[str, List[str]] = {}
+        for name in names:
+            by_lowered.setdefault(name.lower(), []).append(name)
+
+        fingerprints: Dict[str, str] = {}
+        for table in sorted(tables):
+            candidates = [table] if table in names else by_lowered.get(table.lower(), [])
+            if len(candidates) != 1:
+                continue
+            name = candidates[0]
+            try:
+                columns = [(column['name'], str(column['type'])) for column in inspector.get_columns(name)]
+                key = inspector.get_pk_constraint(name).get('constrained_columns') or []
+                marker = self._change_marker(query_executor, name, [column[0] for column in columns], key)
+            except Exception:
+                continue
+            encoded = json.dumps([name, columns, marker], default=str).encode()
+            fingerprints[table] = hashlib.sha256(encoded).hexdigest()[:32]
+        return fingerprints
+
+    def _change_marker(self, query_executor: Any, table: str, columns: List[str], key: List[str]) -> Any:
+        """Aggregate values that change whenever rows are inserted, deleted or marked as updated."""
+        quote = query_executor.engine.dialect.identifier_preparer.quote
+        lowered = {column.lower(): column for column in columns}
+        markers = [quote(column) for column in key]
+        if not key and query_executor.engine.dialect.name == 'sqlite' and 'rowid' not in lowered:
+            markers.append('rowid')
+        markers += [quote(lowered[column]) for column in UPDATE_MARKER_COLUMNS if column in lowered]
+        aggregates = ['count(*) AS row_count'] + [f'max({marker}) AS marker_{index}'
+                                                  for index, marker in enumerate(markers)]
+        return query_executor.execute(f"SELECT {', '.join(aggregates)} FROM {quote(table)}")
+
+    def _group(self, test_cases: List[Dict[str, Any]], dependencies: List[Tuple[FrozenSet[str], FrozenSet[str]]],
+               isolated: bool) -> List[int]:
+        """
+        Group test cases that share state through tables written by non-isolated cases.
+
+        Returns:
+            List[int]: Group number of each test case
+        """
+        parents = list(range(len(test_cases)))
+
+        def find(position: int) -> int:
+            while parents[position] != position:
+                parents[position] = parents[parents[position]]
+                position = parents[position]
+            return position
+
+        def union(first: int, second: int):
+            parents[find(first)] = find(second)
+
+        stateful: Set[str] = set()
+        for test_case, (_, written) in zip(test_cases, dependencies):
+            if not test_case.get('isolated', isolated):
+                stateful |= written
+        if ALL_TABLES in stateful:
+            # A non-isolated case with unknown effects shares state with every case
+            return [0] * len(test_cases)
+        first_access: Dict[str, int] = {}
+        for position, (accessed, _) in enumerate(dependencies):
+            shared = stateful if ALL_TABLES in accessed else accessed & stateful
+            for table in shared:
+                union(position, first_access.setdefault(table, position))
+        return [find(position) for position in range(len(test_cases))]
+
+    def _unique_keys(self, test_cases: List[Dict[str, Any]]) -> List[str]:
+        """Key each test case, numbering repeated names within a file."""
+        seen: Dict[str, int] = {}
+        keys = []
+        for test_case in test_cases:
+            key = self.case_key(test_case)
+            seen[key] = seen.get(key, 0) + 1
+            keys.append(key if seen[key] == 1 else f'{key}#{seen[key]}')
+        return keys
+
+    def _read_state(self) -> Dict[str, Dict[str, Any]]:
+        """Load the recorded case states, ignoring stale or unreadable files."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(state, dict) or state.get('version') != STATE_VERSION:
+            return {}
+        return state.get('cases', {})
+
+    def _write_state(self, cases: Dict[str, Dict[str, Any]]):
+        """Persist the case states atomically."""
+        directory = os.path.dirname(self.state_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f'{self.state_file}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': STATE_VERSION, 'cases': cases}, f, default=str)
+        os.replace(temp_path, self.state_file)
+
+
+def create_impact_analyzer(config: Any) -> ImpactAnalyzer:
+    """
+    Create the impact analyzer described by the application configuration.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+
+    Returns:
+        ImpactAnalyzer: Analyzer keeping its state in ``IMPACT_STATE_FILE``
+    """
+    return ImpactAnalyzer(config.IMPACT_STATE_FILE)
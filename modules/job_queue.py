@@ -0,0 +1,234 @@
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+JOB_STATES = ('queued', 'running', 'completed', 'failed', 'cancelled')
+FINISHED_STATES = ('completed', 'failed', 'cancelled')
+
+
+class Job:
+    def __init__(self, job_id: str, total: Optional[int] = None):
+        """
+        A background run with its progress and an ordered log of events.
+
+        Events are numbered from 0, so clients can poll or resume a stream
+        from the last event they saw. Once the job finishes with a result,
+        its item events are dropped so retained jobs stay small; IDs do not
+        change, and clients catching up after that read the result instead.
+
+        Args:
+            job_id (str): Identifier returned to the client
+            total (Optional[int]): Number of items the job will produce, if known
+        """
+        self.id = job_id
+        self.status = 'queued'
+        self.total = total
+        self.completed = 0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cancel_event = threading.Event()
+        self._events: List[Dict[str, Any]] = []
+        # ID of each event, and whether it completed an item
+        self._ids: List[int] = []
+        self._items: List[bool] = []
+        self._next_id = 0
+        self._condition = threading.Condition()
+
+    def publish(self, event: str, data: Any = None, item: bool = False):
+        """
+        Append an event and wake up clients waiting for it.
+
+        Args:
+            event (str): Event type, e.g. 'result'
+            data (Any): JSON-serializable payload
+            item (bool): Whether the event completes one of the ``total`` items
+        """
+        with self._condition:
+            if item:
+                self.completed += 1
+            self._append(event, data, item)
+
+    def events(self, after: int = -1, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Get the events published after a given event.
+
+        Args:
+            after (int): ID of the last event already seen (-1 for all)
+            timeout (Optional[float]): Seconds to wait for a new event when
+                there is none yet and the job is still running
+
+        Returns:
+            List[Dict[str, Any]]: Events with ``id``, ``event`` and ``data``
+        """
+        with self._condition:
+            if timeout and self._next_id <= after + 1 and not self.finished:
+                self._condition.wait(timeout)
+            return self._events[bisect_right(self._ids, after):]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def _set_status(self, status: str, **fields: Any):
+        with self._condition:
+            self.status = status
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if self.finished and self.result is not None:
+                kept = [index for index, item in enumerate(self._items) if not item]
+                self._events = [self._events[index] for index in kept]
+                self._ids = [self._ids[index] for index in kept]
+                self._items = [False] * len(kept)
+            self._append('status', self.to_dict(), False)
+
+    def _append(self, event: str, data: Any, item: bool):
+        """Record an event under the next ID and wake up waiting clients."""
+        self._events.append({'id': self._next_id, 'event': event, 'data': data})
+        self._ids.append(self._next_id)
+        self._items.append(item)
+        self._next_id += 1
+        self._condition.notify_all()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the job's state.
+
+        Returns:
+            Dict[str, Any]: ID, status, progress, timestamps and error
+        """
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'total': self.total,
+            'completed': self.completed,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+
+class JobManager:
+    def __init__(self, workers: int = 1, max_jobs: int = 100):
+        """
+        Run jobs on a local thread pool and keep their state for clients.
+
+        Args:
+            workers (int): Jobs running at the same time; further jobs queue
+            max_jobs (int): Jobs kept in memory; the oldest finished jobs are
+                forgotten beyond this
+        """
+        self.workers = max(1, workers)
+        self.max_jobs = max_jobs
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='job')
+        self._jobs: 'OrderedDict[str, Job]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, run: Callable[[Job], Any], total: Optional[int] = None) -> Job:
+        """
+        Queue a job.
+
+        The job function publishes its progress on the job it receives and
+        should stop early once ``job.cancel_event`` is set. Its return value
+        becomes ``job.result``.
+
+        Args:
+            run (Callable[[Job], Any]): Function doing the work
+            total (Optional[int]): Number of items the job will produce, if known
+
+        Returns:
+            Job: The queued job
+        """
+        job = Job(uuid.uuid4().hex, total)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+        self._pool.submit(self._run, job, run)
+        return job
+
+    def _run(self, job: Job, run: Callable[[Job], Any]):
+        if job.cancel_event.is_set():
+            job._set_status('cancelled', finished_at=time.time())
+            return
+        job._set_status('running', started_at=time.time())
+        try:
+            result = run(job)
+        except Exception as e:
+            job._set_status('failed', error=str(e), finished_at=time.time())
+            return
+        status = 'cancelled' if job.cancel_event.is_set() else 'completed'
+        job._set_status(status, result=result, finished_at=time.time())
+
+    def _forget_finished(self):
+        """Drop the oldest finished jobs beyond ``max_jobs``."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Look up a job.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Optional[Job]: The job, or None if it is unknown or was forgotten
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Ask a job to stop.
+
+        Queued jobs never start; running jobs stop at their next check.
+
+        Args:
+            job_id (str): Job identifier
+
+        Returns:
+            Optional[Job]: The job, or None if it is unknown
+        """
+        job = self.get(job_id)
+        if job is not None and not job.finished:
+            job.cancel_event.set()
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Describe all known jobs, oldest first.
+
+        Returns:
+            List[Dict[str, Any]]: State of each job
+        """
+        with self._lock:
+            return [job.to_dict() for job in self._jobs.values()]
+
+    def shutdown(self):
+        """Cancel all jobs and wait for running ones to stop."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            job.cancel_event.set()
+        self._pool.shutdown(wait=True)
+
+
+def create_job_manager(config: Any) -> JobManager:
+    """
+    Create the job manager described by the application configuration.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+
+    Returns:
+        JobManager: Manager for background test runs
+    """
+    return JobManager(workers=config.JOB_WORKERS, max_jobs=config.JOB_HISTORY_SIZE)
@@ -0,0 +1,369 @@
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+from .query_executor import QueryExecutor, QueryTimeoutError
+
+LOAD_MODES = ('closed', 'open')
+# Percentiles reported for every latency histogram
+REPORTED_PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class LatencyHistogram:
+    def __init__(self, significant_figures: int = 2):
+        """
+        Log-linear latency histogram in the style of HdrHistogram.
+
+        Values are recorded in microseconds into buckets whose width doubles
+        with every power of two, with enough sub-buckets per power of two to
+        keep ``significant_figures`` decimal digits of precision. Memory
+        stays constant however many values are recorded, and histograms of
+        different workers can be merged exactly.
+
+        Args:
+            significant_figures (int): Decimal digits of precision (1-5)
+        """
+        self.significant_figures = significant_figures
+        self.sub_bucket_bits = max(1, math.ceil(math.log2(2 * 10 ** significant_figures)))
+        self.sub_bucket_half = 1 << (self.sub_bucket_bits - 1)
+        self.counts: Dict[int, int] = defaultdict(int)
+        self.total_count = 0
+        self.min_value: Optional[int] = None
+        self.max_value = 0
+        self._sum = 0
+
+    def _index(self, value: int) -> int:
+        bucket = max(0, value.bit_length() - self.sub_bucket_bits)
+        return bucket * self.sub_bucket_half + (value >> bucket)
+
+    def _value_range(self, index: int) -> range:
+        """Range of microsecond values counted in a bucket."""
+        bucket = max(0, index // self.sub_bucket_half - 1)
+        sub_bucket = index - bucket * self.sub_bucket_half
+        return range(sub_bucket << bucket, (sub_bucket + 1) << bucket)
+
+    def record(self, seconds: float):
+        """
+        Record a latency.
+
+        Args:
+            seconds (float): The latency in seconds
+        """
+        value = max(0, int(seconds * 1_000_000))
+        self.counts[self._index(value)] += 1
+        self.total_count += 1
+        self._sum += value
+        if self.min_value is None or value < self.min_value:
+            self.min_value = value
+        if value > self.max_value:
+            self.max_value = value
+
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Add the values recorded by another histogram of the same precision.
+
+        Args:
+            other (LatencyHistogram): Histogram to merge into this one
+        """
+        if other.sub_bucket_bits != self.sub_bucket_bits:
+            raise ValueError("Cannot merge histograms of different precision")
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self.total_count += other.total_count
+        self._sum += other._sum
+        if other.min_value is not None and (self.min_value is None or other.min_value < self.min_value):
+            self.min_value = other.min_value
+        self.max_value = max(self.max_value, other.max_value)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Get the latency at a percentile.
+
+        Args:
+            percent (float): Percentile between 0 and 100
+
+        Returns:
+            float: Highest latency in the bucket holding the percentile, in
+                seconds (0 when nothing was recorded)
+        """
+        if not self.total_count:
+            return 0.0
+        target = max(1, math.ceil(self.total_count * percent / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                value = min(self._value_range(index)[-1], self.max_value)
+                return max(value, self.min_value) / 1_000_000
+        return self.max_value / 1_000_000
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded latencies.
+
+        Returns:
+            Dict[str, Any]: Count, min, mean, max and percentiles in seconds
+        """
+        summary = {
+            'count': self.total_count,
+            'min': (self.min_value or 0) / 1_000_000,
+            'mean': self._sum / self.total_count / 1_000_000 if self.total_count else 0.0,
+            'max': self.max_value / 1_000_000
+        }
+        for percent in REPORTED_PERCENTILES:
+            summary[f'p{percent:g}'.replace('.', '_')] = self.percentile(percent)
+        return summary
+
+
+class _WorkerStats:
+    """Measurements owned by one worker thread, merged when the run ends."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.service_time = LatencyHistogram()
+        self.per_case: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.timeouts = 0
+        self.rows = 0
+        self.last_error: Optional[str] = None
+
+
+class LoadGenerator:
+    def __init__(self, query_executor: QueryExecutor, test_cases: List[Dict[str, Any]],
+                 workers: int = 4, rate: Optional[float] = None, mode: str = 'closed',
+                 seed: Optional[int] = None):
+        """
+        Replay test cases as a weighted workload mix against a database.
+
+        Each operation picks a test case at random, weighted by its
+        ``load_weight`` key (default 1), and runs its query with a pooled
+        connection, reading all rows without comparing them. Cases that may
+        modify data run in a rolled-back transaction, so the database is
+        unchanged after the run.
+
+        In closed-loop mode every worker starts its next operation as soon
+        as the previous one finishes, optionally paced so all workers
+        together stay at ``rate`` operations per second. In open-loop mode
+        operations are scheduled at ``rate`` per second regardless of how
+        fast the database answers, and latency is measured from the
+        scheduled start, so queueing behind a saturated database shows up
+        in the latency instead of silently lowering the request rate.
+
+        Args:
+            query_executor (QueryExecutor): Executor to drive
+            test_cases (List[Dict[str, Any]]): Workload mix
+            workers (int): Concurrent worker threads
+            rate (Optional[float]): Target operations per second (required
+                in open-loop mode, unlimited in closed-loop mode if None)
+            mode (str): 'closed' or 'open'
+            seed (Optional[int]): Seed for the workload mix, for repeatable runs
+        """
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unsupported load mode: {mode}")
+        if mode == 'open' and not rate:
+            raise ValueError("Open-loop load needs a target rate")
+        self.test_cases = [test_case for test_case in test_cases if float(test_case.get('load_weight', 1)) > 0]
+        if not self.test_cases:
+            raise ValueError("No test cases to generate load from")
+        self.query_executor = query_executor
+        self.workers = max(1, workers)
+        self.rate = rate
+        self.mode = mode
+        self.seed = seed
+        self._weights = [float(test_case.get('load_weight', 1)) for test_case in self.test_cases]
+        self._mutating = [query_executor.validate_query(test_case['query'])['query_type'] != 'SELECT'
+                          for test_case in self.test_cases]
+
+    def run(self, duration: float = 10.0, warmup: float = 0.0, max_operations: Optional[int] = None,
+            report_interval: float = 1.0,
+            on_interval: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Generate load and summarize it.
+
+        Args:
+            duration (float): Seconds of measured load
+            warmup (float): Seconds of load before measuring starts
+            max_operations (Optional[int]): Stop after this many measured operations
+            report_interval (float): Seconds between ``on_interval`` calls
+                and connection pool samples
+            on_interval (Optional[Callable]): Called with throughput, errors
+                and latency of each interval while the run is in progress
+
+        Returns:
+            Dict[str, Any]: Throughput, error rate, latency histograms
+                overall and per test case, and connection pool saturation
+        """
+        stats = [_WorkerStats() for _ in range(self.workers)]
+        state = {
+            'slot': 0,
+            'measured': 0,
+            'start': time.perf_counter(),
+            'stop': threading.Event(),
+            'lock': threading.Lock()
+        }
+        state['measure_from'] = state['start'] + warmup
+        state['end'] = state['measure_from'] + duration
+
+        threads = [
+            threading.Thread(target=self._work, args=(index, stats[index], state, max_operations),
+                             name=f'load-{index}', daemon=True)
+            for index in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        pool_samples = self._monitor(threads, stats, state, report_interval, on_interval)
+        for thread in threads:
+            thread.join()
+
+        elapsed = max(1e-9, min(time.perf_counter(), state['end']) - state['measure_from'])
+        return self._summarize(stats, elapsed, pool_samples)
+
+    def _next_start(self, state: Dict[str, Any]) -> Optional[float]:
+        """Claim the next operation slot and return its scheduled start time."""
+        if not self.rate:
+            return None
+        with state['lock']:
+            slot = state['slot']
+            state['slot'] += 1
+        return state['start'] + slot / self.rate
+
+    def _work(self, index: int, stats: _WorkerStats, state: Dict[str, Any], max_operations: Optional[int]):
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        positions = range(len(self.test_cases))
+        while not state['stop'].is_set():
+            scheduled = self._next_start(state)
+            if scheduled is not None:
+                delay = scheduled - time.perf_counter()
+                if delay > 0 and state['stop'].wait(delay):
+                    return
+            if time.perf_counter() >= state['end']:
+                state['stop'].set()
+                return
+
+            position = rng.choices(positions, weights=self._weights)[0]
+            test_case = self.test_cases[position]
+            start = time.perf_counter()
+            error = None
+            rows = 0
+            try:
+                rows = self._execute(test_case, self._mutating[position])
+            except QueryTimeoutError as e:
+                error = 'timeout'
+                stats.last_error = str(e)
+            except Exception as e:
+                error = 'error'
+                stats.last_error = str(e)
+            finished = time.perf_counter()
+
+            if start < state['measure_from']:
+                continue
+            if max_operations is not None:
+                with state['lock']:
+                    state['measured'] += 1
+                    if state['measured'] >= max_operations:
+                        state['stop'].set()
+                    if state['measured'] > max_operations:
+                        return
+            # Open-loop latency includes any wait for a free worker
+            began = scheduled if self.mode == 'open' else start
+            stats.latency.record(finished - began)
+            stats.service_time.record(finished - start)
+            stats.per_case[test_case['name']].record(finished - began)
+            stats.rows += rows
+            if error == 'timeout':
+                stats.timeouts += 1
+            if error:
+                stats.errors[test_case['name']] += 1
+
+    def _execute(self, test_case: Dict[str, Any], mutating: bool) -> int:
+        """Run one operation and return the number of rows read or affected."""
+        if not mutating:
+            with closing(self.query_executor.execute_stream(test_case['query'],
+                                                           params=test_case.get('params'))) as batches:
+                return sum(len(batch) for batch in batches)
+        with self.query_executor.isolated() as connection:
+            if 'param_sets' in test_case:
+                return self.query_executor.execute_many(test_case['query'], test_case['param_sets'],
+                                                        connection)['affected_rows']
+            output = self.query_executor.execute(test_case['query'], connection, params=test_case.get('params'))
+            return len(output) if isinstance(output, list) else max(output.get('affected_rows', 0), 0)
+
+    def _monitor(self, threads: List[threading.Thread], stats: List[_WorkerStats], state: Dict[str, Any],
+                 report_interval: float, on_interval: Optional[Callable[[Dict[str, Any]], None]]
+                 ) -> List[Dict[str, Any]]:
+        """Sample pool occupancy and report progress until all workers have stopped."""
+        samples = []
+        previous_count = 0
+        previous_errors = 0
+        previous_time = time.perf_counter()
+        while any(thread.is_alive() for thread in threads):
+            state['stop'].wait(report_interval)
+            samples.append(self.query_executor.pool_status())
+            if on_interval is None:
+                continue
+            now = time.perf_counter()
+            # Worker stats are read without locking, so interval figures are approximate
+            count = sum(worker.latency.total_count for worker in stats)
+            errors = sum(sum(worker.errors.values()) for worker in stats)
+            on_interval({
+                'elapsed': now - state['start'],
+                'warmup': now < state['measure_from'],
+                'operations': count - previous_count,
+                'throughput': (count - previous_count) / max(1e-9, now - previous_time),
+                'errors': errors - previous_errors,
+                'pool_checked_out': samples[-1].get('checked_out'),
+                'pool_utilization': samples[-1].get('utilization')
+            })
+            previous_count, previous_errors, previous_time = count, errors, now
+        return samples
+
+    def _summarize(self, stats: List[_WorkerStats], elapsed: float,
+                   pool_samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+        latency = LatencyHistogram()
+        service_time = LatencyHistogram()
+        per_case: Dict[str, LatencyHistogram] = defaultdict(LatencyHistogram)
+        errors: Dict[str, int] = defaultdict(int)
+        for worker in stats:
+            latency.merge(worker.latency)
+            service_time.merge(worker.service_time)
+            for name, histogram in worker.per_case.items():
+                per_case[name].merge(histogram)
+            for name, count in worker.errors.items():
+                errors[name] += count
+
+        total_errors = sum(errors.values())
+        utilizations = [sample['utilization'] for sample in pool_samples if 'utilization' in sample]
+        final_pool = self.query_executor.pool_status()
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'target_rate': self.rate,
+            'duration': elapsed,
+            'operations': latency.total_count,
+            'throughput': latency.total_count / elapsed,
+            'rows_per_second': sum(worker.rows for worker in stats) / elapsed,
+            'errors': total_errors,
+            'timeouts': sum(worker.timeouts for worker in stats),
+            'error_rate': total_errors / latency.total_count if latency.total_count else 0.0,
+            'last_error': next((worker.last_error for worker in stats if worker.last_error), None),
+            'latency': latency.summary(),
+            'service_time': service_time.summary(),
+            'test_cases': {
+                name: dict(histogram.summary(), errors=errors.get(name, 0))
+                for name, histogram in sorted(per_case.items())
+            },
+            'pool': {
+                'pool_class': final_pool['pool_class'],
+                'size': final_pool.get('size'),
+                'max_overflow': final_pool.get('max_overflow'),
+                'peak_checked_out': final_pool.get('peak_checked_out'),
+                'mean_utilization': sum(utilizations) / len(utilizations) if utilizations else None,
+                'max_utilization': max(utilizations) if utilizations else None,
+                'checkout_timeouts': final_pool.get('checkout_timeouts'),
+                'average_wait_time': final_pool.get('average_wait_time'),
+                'max_wait_time': final_pool.get('max_wait_time')
+            }
+        }
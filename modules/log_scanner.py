@@ -0,0 +1,300 @@
+import gzip
+import hashlib
+import re
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+from .security import SecurityTester
+from .sql_lexer import fingerprint
+
+LOG_FORMATS = ('lines', 'sql', 'postgresql', 'mysql')
+
+# Statement text of a PostgreSQL log line (log_statement or log_min_duration_statement)
+_POSTGRESQL_STATEMENT = re.compile(r'(?:LOG|STATEMENT):\s+(?:duration: [\d.]+ ms\s+)?(?:statement|execute [^:]*):\s*(.*)$')
+# MySQL slow log lines that describe a statement rather than being part of it
+_MYSQL_METADATA = re.compile(r'^(?:#|SET timestamp=|use \S+;$|\S+, Version: |Tcp port: |Time\s+Id\s+Command)', re.IGNORECASE)
+
+# Security tester owned by a worker process of a parallel scan
+_worker_tester: Optional[SecurityTester] = None
+
+
+def _init_worker_process(injection_patterns: Optional[List[str]]):
+    """Create a dedicated security tester in a new worker process."""
+    global _worker_tester
+    _worker_tester = SecurityTester(injection_patterns=injection_patterns)
+
+
+def _scan_statements(tester: SecurityTester, chunk: List[Tuple[bytes, str]]
+                     ) -> List[Tuple[bytes, str, Optional[str], List[Dict[str, Any]]]]:
+    """
+    Fingerprint and scan (digest, statement) pairs.
+
+    Statements are only sent back when they have findings, to keep the
+    results of a chunk small.
+    """
+    results = []
+    for digest, statement in chunk:
+        vulnerabilities = tester.test_sql_injection(statement)
+        results.append((digest, fingerprint(statement),
+                        statement if vulnerabilities else None, vulnerabilities))
+    return results
+
+
+def _scan_chunk(chunk: List[Tuple[bytes, str]]) -> List[Tuple[bytes, str, Optional[str], List[Dict[str, Any]]]]:
+    """Scan a chunk of statements in a worker process."""
+    return _scan_statements(_worker_tester, chunk)
+
+
+def iter_statements(lines: Iterable[str], log_format: str = 'lines') -> Iterator[str]:
+    """
+    Extract SQL statements from the lines of a log or SQL file.
+
+    Args:
+        lines (Iterable[str]): Lines of the input, read lazily
+        log_format (str): 'lines' (one statement per line), 'sql'
+            (statements terminated by ``;`` at the end of a line),
+            'postgresql' (server log with logged statements) or 'mysql'
+            (slow query log)
+
+    Returns:
+        Iterator[str]: The statements in input order
+    """
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unsupported log format: {log_format}")
+
+    if log_format == 'lines':
+        for line in lines:
+            line = line.strip()
+            if line and not line.startswith('--'):
+                yield line
+        return
+
+    if log_format == 'postgresql':
+        statement = None
+        for line in lines:
+            line = line.rstrip('\r\n')
+            # Multi-line statements continue on indented lines
+            if statement is not None and line[:1] in ('\t', ' '):
+                statement.append(line.strip())
+                continue
+            if statement:
+                yield ' '.join(statement)
+            match = _POSTGRESQL_STATEMENT.search(line)
+            statement = [match.group(1)] if match and match.group(1) else None
+        if statement:
+            yield ' '.join(statement)
+        return
+
+    statement = []
+    for line in lines:
+        line = line.strip()
+        if not line or (not statement and line.startswith('--')):
+            continue
+        if log_format == 'mysql' and not statement and _MYSQL_METADATA.match(line):
+            continue
+        statement.append(line)
+        if line.endswith(';'):
+            yield ' '.join(statement)
+            statement = []
+    if statement:
+        yield ' '.join(statement)
+
+
+def open_log(path: str) -> Iterable[str]:
+    """Open a log file for lazy line-by-line reading, decompressing ``.gz`` files."""
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+class LogScanner:
+    def __init__(self, injection_patterns: Optional[List[str]] = None, workers: int = 1,
+                 chunk_size: int = 500, dedupe_cache_size: int = 100000,
+                 max_fingerprints: int = 100000):
+        """
+        Scan large query logs for injection patterns in bounded memory.
+
+        Statements are read lazily, identical statements are scanned only
+        once while they are in a bounded cache, and findings are aggregated
+        per statement fingerprint. With more than one worker, chunks of
+        statements are fingerprinted and scanned on a process pool with a
+        bounded number of chunks in flight.
+
+        A statement counts as unique when it is not among the last
+        ``dedupe_cache_size`` distinct statements read, so on logs with more
+        distinct statements than that, ``unique_statements`` may count a
+        statement more than once. The count depends only on the log, not on
+        the number of workers or the order in which chunks finish.
+
+        Args:
+            injection_patterns (Optional[List[str]]): Patterns for ``SecurityTester``
+            workers (int): Number of worker processes (1 scans in-process)
+            chunk_size (int): Statements sent to a worker at a time
+            dedupe_cache_size (int): Recently scanned statements remembered for deduplication
+            max_fingerprints (int): Fingerprints aggregated before new ones are
+                only counted in the totals
+        """
+        self.injection_patterns = injection_patterns
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.dedupe_cache_size = dedupe_cache_size
+        self.max_fingerprints = max_fingerprints
+
+    def scan(self, lines: Iterable[str], log_format: str = 'lines') -> Dict[str, Any]:
+        """
+        Scan the statements of a log.
+
+        Args:
+            lines (Iterable[str]): Lines of the log, read lazily
+            log_format (str): Input format, see ``iter_statements``
+
+        Returns:
+            Dict[str, Any]: Totals, the number of unique statements with each
+                finding and the fingerprints with findings, most frequent first
+        """
+        state = {
+            'statements': 0,
+            'unique_statements': 0,
+            'untracked_statements': 0,
+            # Fingerprints of recently read statements by statement digest,
+            # None until their scan has finished
+            'seen': OrderedDict(),
+            # Occurrences of statements whose scan has not finished yet
+            'pending': {},
+            'groups': {},
+            'findings': {}
+        }
+        chunks = self._chunks(iter_statements(lines, log_format), state)
+
+        if self.workers == 1:
+            tester = SecurityTester(injection_patterns=self.injection_patterns)
+            for chunk in chunks:
+                self._merge(state, _scan_statements(tester, chunk))
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker_process,
+                                     initargs=(self.injection_patterns,)) as pool:
+                in_flight = deque()
+                for chunk in chunks:
+                    # Bound the statements held in memory by the chunks in flight,
+                    # merging in log order so the summary does not depend on timing
+                    if len(in_flight) >= self.workers * 2:
+                        self._merge(state, in_flight.popleft().result())
+                    in_flight.append(pool.submit(_scan_chunk, chunk))
+                while in_flight:
+                    self._merge(state, in_flight.popleft().result())
+
+        return self._summarize(state)
+
+    def scan_file(self, path: str, log_format: str = 'lines') -> Dict[str, Any]:
+        """
+        Scan a log file, which may be gzip-compressed.
+
+        Args:
+            path (str): Path of the log file
+            log_format (str): Input format, see ``iter_statements``
+
+        Returns:
+            Dict[str, Any]: Scan summary, see ``scan``
+        """
+        with open_log(path) as lines:
+            return self.scan(lines, log_format)
+
+    def _chunks(self, statements: Iterator[str], state: Dict[str, Any]) -> Iterator[List[Tuple[bytes, str]]]:
+        """Group statements not seen recently into chunks, counting every occurrence."""
+        seen = state['seen']
+        pending = state['pending']
+        chunk = []
+        for statement in statements:
+            state['statements'] += 1
+            digest = hashlib.blake2b(statement.encode('utf-8', 'replace'), digest_size=16).digest()
+            if digest in seen:
+                seen.move_to_end(digest)
+                fingerprint = seen[digest]
+                if fingerprint is None:
+                    pending[digest] += 1
+                else:
+                    self._count(state, fingerprint, 1)
+                continue
+
+            # Evicting as statements are read keeps the cache independent of scan timing
+            seen[digest] = None
+            if len(seen) > self.dedupe_cache_size:
+                seen.popitem(last=False)
+            pending[digest] = pending.get(digest, 0) + 1
+            state['unique_statements'] += 1
+            chunk.append((digest, statement))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _merge(self, state: Dict[str, Any], results: List[Tuple[bytes, str, Optional[str], List[Dict[str, Any]]]]):
+        """Aggregate the scan results of a chunk of unique statements."""
+        seen = state['seen']
+        for digest, fingerprint, statement, vulnerabilities in results:
+            # A statement evicted and read again while being scanned is in two
+            # chunks; the first to finish takes all of its occurrences
+            group = self._count(state, fingerprint, state['pending'].pop(digest, 0))
+            if digest in seen:
+                seen[digest] = fingerprint
+            if vulnerabilities:
+                self._add_findings(state, group, statement, vulnerabilities)
+
+    def _count(self, state: Dict[str, Any], fingerprint: str, occurrences: int) -> Optional[Dict[str, Any]]:
+        """Add occurrences to the group of a fingerprint, creating it while under the limit."""
+        groups = state['groups']
+        group = groups.get(fingerprint)
+        if group is None and len(groups) < self.max_fingerprints:
+            group = groups[fingerprint] = {
+                'fingerprint': fingerprint,
+                'example': None,
+                'count': 0,
+                'findings': {}
+            }
+        if group is None:
+            state['untracked_statements'] += occurrences
+        else:
+            group['count'] += occurrences
+        return group
+
+    def _add_findings(self, state: Dict[str, Any], group: Optional[Dict[str, Any]], statement: str,
+                      vulnerabilities: List[Dict[str, Any]]):
+        """Aggregate the findings of one unique statement."""
+        if group is not None and group['example'] is None:
+            group['example'] = statement
+        for vulnerability in vulnerabilities:
+            key = (vulnerability['type'], vulnerability.get('pattern') or vulnerability.get('operation'))
+            finding = state['findings'].setdefault(key, {
+                'type': vulnerability['type'],
+                'match': key[1],
+                'description': vulnerability['description'],
+                'statements': 0
+            })
+            finding['statements'] += 1
+            if group is not None:
+                group['findings'][key] = group['findings'].get(key, 0) + 1
+
+    def _summarize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        flagged = [group for group in state['groups'].values() if group['findings']]
+        flagged.sort(key=lambda group: group['count'], reverse=True)
+        return {
+            'statements': state['statements'],
+            'unique_statements': state['unique_statements'],
+            'fingerprints': len(state['groups']),
+            'untracked_statements': state['untracked_statements'],
+            'flagged_fingerprints': len(flagged),
+            'findings': sorted(state['findings'].values(), key=lambda finding: finding['statements'], reverse=True),
+            'queries': [
+                {
+                    'fingerprint': group['fingerprint'],
+                    'example': group['example'],
+                    'count': group['count'],
+                    'findings': [
+                        {'type': key[0], 'match': key[1], 'statements': count}
+                        for key, count in group['findings'].items()
+                    ]
+                }
+                for group in flagged
+            ]
+        }
@@ -1,48 +1,617 @@
-from sqlalchemy import create_engine, text
-from typing import Any, Dict, List
-import pandas as pd
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.pool import QueuePool, StaticPool
+from sqlalchemy.sql.elements import TextClause
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .query_plan import (
+    normalize_mysql_plan,
+    normalize_postgresql_plan,
+    normalize_sqlite_plan,
+    plan_fingerprint
+)
+from .result_cache import ResultCache, copy_rows, create_result_cache
+from .sql_lexer import find_keywords, multirow_insert, statement_type, values_parameters
 import os
+import threading
+import time
+
+# SQLite virtual machine instructions between deadline checks
+SQLITE_PROGRESS_INTERVAL = 1000
+
+@lru_cache(maxsize=1024)
+def compile_statement(query: str) -> TextClause:
+    """
+    Build the statement for a query once and reuse it.
+    
+    Reusing the same clause skips parsing its bind parameters again and
+    lets SQLAlchemy's compiled statement cache serve every execution.
+    
+    Args:
+        query (str): The SQL query
+        
+    Returns:
+        TextClause: Statement with ``:name`` bind parameters
+    """
+    return text(query)
+
+def max_bind_parameters(dialect: str) -> int:
+    """Get the number of bind parameters a backend accepts in one statement."""
+    if dialect == 'sqlite':
+        import sqlite3
+        # Raised from 999 in SQLite 3.32
+        return 32766 if sqlite3.sqlite_version_info >= (3, 32, 0) else 999
+    if dialect == 'postgresql':
+        return 32767
+    if dialect == 'mysql':
+        return 65535
+    return 999
+
+def batch_statement(query: str, batch: List[Dict[str, Any]]) -> Tuple[TextClause, Any]:
+    """
+    Build the statement and parameters that execute one batch of parameter sets.
+    
+    A single-row INSERT ... VALUES is expanded into one statement inserting
+    every row of the batch; anything else is sent with ``executemany``.
+    
+    Args:
+        query (str): The SQL statement with ``:name`` bind parameters
+        batch (List[Dict[str, Any]]): Parameter sets of the batch
+        
+    Returns:
+        Tuple[TextClause, Any]: Statement and the parameters to execute it with
+    """
+    names = values_parameters(query)
+    if names is None or len(batch) == 1:
+        return compile_statement(query), batch
+    merged = {}
+    for index, params in enumerate(batch):
+        for name in names:
+            if name not in params:
+                raise ValueError(f"Parameter set {index + 1} of the batch has no value for '{name}'")
+            merged[f'{name}__{index}'] = params[name]
+    return compile_statement(multirow_insert(query, len(batch))), merged
+
+def rows_per_batch(query: str, batch_size: int, dialect: str) -> int:
+    """Limit a batch so an expanded multi-row INSERT stays within the backend's bind parameter limit."""
+    names = values_parameters(query)
+    if not names:
+        return batch_size
+    return max(1, min(batch_size, max_bind_parameters(dialect) // len(names)))
+
+class QueryTimeoutError(Exception):
+    """Raised when a query exceeds the executor's execution time limit."""
 
 class QueryExecutor:
-    def __init__(self, database_uri: str):
+    def __init__(self, database_uri: str, batch_size: int = 1000, pool_size: int = 5,
+                 max_overflow: int = 10, pool_timeout: float = 30, pool_recycle: int = -1,
+                 pool_pre_ping: bool = False, timeout: Optional[float] = None,
+                 result_cache: Optional[ResultCache] = None,
+                 creator: Optional[Callable[[], Any]] = None):
         # For SQLite, ensure the database file exists
-        if database_uri.startswith('sqlite'):
-            db_path = database_uri.replace('sqlite:///', '')
+        db_path = self._sqlite_path(database_uri)
+        if db_path and creator is None:
             if not os.path.exists(db_path):
                 # Create an empty file
                 with open(db_path, 'w') as f:
                     pass
         
-        self.engine = create_engine(database_uri)
-        self.connection = self.engine.connect()
+        self.database_uri = database_uri
+        self.batch_size = batch_size
+        self.timeout = timeout if timeout and timeout > 0 else None
+        self.result_cache = result_cache
+        if creator is not None:
+            # A single connection made by the caller, e.g. an in-memory clone of a fixture template
+            options = {'creator': creator, 'poolclass': StaticPool}
+        else:
+            options = self._pool_options(database_uri, pool_size, max_overflow, pool_timeout,
+                                         pool_recycle, pool_pre_ping)
+        self.engine = create_engine(database_uri, future=True, **options)
+        if self.engine.dialect.name == 'sqlite':
+            self._enable_sqlite_transactions(self.engine)
+        if self.timeout:
+            self._enable_server_timeouts()
+        
+        # Checkout statistics for sizing the pool under load
+        self._pool_stats_lock = threading.Lock()
+        self._pool_stats = {
+            'checkouts': 0,
+            'checkout_timeouts': 0,
+            'total_wait_time': 0.0,
+            'max_wait_time': 0.0,
+            'peak_checked_out': 0
+        }
 
-    def execute(self, query: str) -> Any:
+    @classmethod
+    def from_config(cls, config: Any, database_uri: Optional[str] = None) -> 'QueryExecutor':
+        """
+        Create an executor from the application configuration.
+        
+        Args:
+            config (Any): Configuration object such as ``config.Config``
+            database_uri (Optional[str]): Database to connect to instead of
+                ``config.DATABASE_URI``, with the same pool settings
+            
+        Returns:
+            QueryExecutor: Executor for the database
+        """
+        return cls(
+            database_uri or config.DATABASE_URI,
+            batch_size=config.QUERY_BATCH_SIZE,
+            pool_size=config.DB_POOL_SIZE,
+            max_overflow=config.DB_MAX_OVERFLOW,
+            pool_timeout=config.DB_POOL_TIMEOUT,
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+            timeout=config.MAX_QUERY_EXECUTION_TIME,
+            result_cache=create_result_cache(config)
+        )
+
+    @staticmethod
+    def _sqlite_path(database_uri: str) -> Optional[str]:
+        """Return the database file of a SQLite URI, or None for other URIs and in-memory databases."""
+        if not database_uri.startswith('sqlite') or ':///' not in database_uri:
+            return None
+        db_path = database_uri.split(':///', 1)[1].split('?', 1)[0]
+        if db_path in ('', ':memory:') or 'mode=memory' in database_uri:
+            return None
+        return db_path
+
+    @staticmethod
+    def _pool_options(database_uri: str, pool_size: int, max_overflow: int, pool_timeout: float,
+                      pool_recycle: int, pool_pre_ping: bool) -> Dict[str, Any]:
+        """
+        Build connection pool arguments for create_engine.
+        
+        In-memory SQLite databases exist only within a single connection, so
+        they keep SQLAlchemy's default pool. Everything else gets a sized
+        QueuePool shared by all threads.
+        """
+        options = {'pool_pre_ping': pool_pre_ping}
+        if database_uri.startswith('sqlite'):
+            if not QueryExecutor._sqlite_path(database_uri):
+                return options
+            # Pooled connections move between threads
+            options['connect_args'] = {'check_same_thread': False}
+        options.update({
+            'poolclass': QueuePool,
+            'pool_size': pool_size,
+            'max_overflow': max_overflow,
+            'pool_timeout': pool_timeout,
+            'pool_recycle': pool_recycle
+        })
+        return options
+
+    @staticmethod
+    def _enable_sqlite_transactions(engine: Engine):
+        """
+        Let SQLAlchemy control SQLite transactions.
+        
+        pysqlite only opens transactions implicitly before DML, so DDL escapes
+        rollback and SAVEPOINTs misbehave. Disabling its implicit handling and
+        emitting BEGIN ourselves makes every statement transactional. The
+        aiosqlite adapter behaves the same, so async engines register these
+        listeners on their ``sync_engine``.
+        """
+        @event.listens_for(engine, 'connect')
+        def _disable_implicit_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+        
+        @event.listens_for(engine, 'begin')
+        def _begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+    def _enable_server_timeouts(self):
+        """
+        Set a server-side statement timeout on every new connection.
+        
+        PostgreSQL cancels any statement running longer than
+        ``statement_timeout``; MySQL aborts SELECTs running longer than
+        ``MAX_EXECUTION_TIME``. SQLite has no such setting and is interrupted
+        from a progress handler instead (see ``_deadline``).
+        """
+        timeout_ms = int(self.timeout * 1000)
+        if self.engine.dialect.name == 'postgresql':
+            statement = f'SET statement_timeout = {timeout_ms}'
+        elif self.engine.dialect.name == 'mysql':
+            statement = f'SET SESSION MAX_EXECUTION_TIME = {timeout_ms}'
+        else:
+            return
+        
+        @event.listens_for(self.engine, 'connect')
+        def _set_statement_timeout(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            try:
+                cursor.execute(statement)
+            finally:
+                cursor.close()
+            # Keep the setting out of the driver's implicit transaction
+            dbapi_connection.commit()
+
+    @contextmanager
+    def _deadline(self, connection: Connection) -> Iterator[None]:
+        """Interrupt SQLite statements on the connection once the timeout elapses."""
+        if not self.timeout or self.engine.dialect.name != 'sqlite':
+            yield
+            return
+        
+        dbapi_connection = connection.connection.dbapi_connection
+        deadline = time.perf_counter() + self.timeout
+        dbapi_connection.set_progress_handler(
+            lambda: time.perf_counter() > deadline, SQLITE_PROGRESS_INTERVAL
+        )
+        try:
+            yield
+        finally:
+            dbapi_connection.set_progress_handler(None, 0)
+
+    def _is_timeout(self, error: Exception) -> bool:
+        """Check whether a database error was caused by the statement timeout."""
+        if not self.timeout or not isinstance(error, exc.DBAPIError):
+            return False
+        original = error.orig
+        dialect = self.engine.dialect.name
+        if dialect == 'sqlite':
+            return 'interrupted' in str(original)
+        if dialect == 'postgresql':
+            # query_canceled, raised when statement_timeout fires
+            return getattr(original, 'pgcode', None) == '57014'
+        if dialect == 'mysql':
+            # ER_QUERY_TIMEOUT, raised when MAX_EXECUTION_TIME is exceeded
+            return bool(original.args) and original.args[0] == 3024
+        return False
+
+    def connect(self) -> Connection:
+        """
+        Check a connection out of the engine's pool.
+        
+        The caller must close the connection to return it to the pool.
+        
+        Returns:
+            Connection: A pooled database connection
+        """
+        start = time.perf_counter()
+        try:
+            connection = self.engine.connect()
+        except exc.TimeoutError:
+            with self._pool_stats_lock:
+                self._pool_stats['checkout_timeouts'] += 1
+            raise
+        wait_time = time.perf_counter() - start
+        
+        with self._pool_stats_lock:
+            stats = self._pool_stats
+            stats['checkouts'] += 1
+            stats['total_wait_time'] += wait_time
+            stats['max_wait_time'] = max(stats['max_wait_time'], wait_time)
+            checked_out = getattr(self.engine.pool, 'checkedout', None)
+            if checked_out is not None:
+                stats['peak_checked_out'] = max(stats['peak_checked_out'], checked_out())
+        return connection
+
+    @contextmanager
+    def _checkout(self, connection: Optional[Connection] = None) -> Iterator[Connection]:
+        """Use the given connection, or check one out of the pool for the block."""
+        if connection is not None:
+            yield connection
+            return
+        with self.connect() as connection:
+            yield connection
+
+    def pool_status(self) -> Dict[str, Any]:
+        """
+        Report connection pool occupancy and checkout statistics.
+        
+        Returns:
+            Dict[str, Any]: Pool size, connections in use and idle, overflow,
+                and cumulative checkout wait statistics
+        """
+        pool = self.engine.pool
+        with self._pool_stats_lock:
+            stats = dict(self._pool_stats)
+        
+        status = {'pool_class': type(pool).__name__}
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + pool._max_overflow
+            status.update({
+                'size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': pool.overflow(),
+                'utilization': pool.checkedout() / capacity if capacity > 0 else 0
+            })
+        stats['average_wait_time'] = (
+            stats['total_wait_time'] / stats['checkouts'] if stats['checkouts'] else 0
+        )
+        status.update(stats)
+        return status
+
+    @contextmanager
+    def isolated(self, connection: Optional[Connection] = None) -> Iterator[Connection]:
+        """
+        Run statements in a transaction that is always rolled back.
+        
+        Opens a transaction on the connection, or a SAVEPOINT if one is
+        already in progress, so nothing executed inside the block is visible
+        to other connections or persists after it. Backends that commit DDL
+        implicitly (e.g. MySQL) cannot roll back schema changes.
+        
+        Args:
+            connection (Optional[Connection]): Connection to isolate,
+                defaults to a connection checked out for the block
+            
+        Yields:
+            Connection: The connection to execute statements on
+        """
+        with self._checkout(connection) as connection:
+            if connection.in_transaction():
+                transaction = connection.begin_nested()
+            else:
+                transaction = connection.begin()
+            try:
+                yield connection
+            finally:
+                if transaction.is_active:
+                    transaction.rollback()
+
+    def execute(self, query: str, connection: Optional[Connection] = None,
+                timings: Optional[Dict[str, float]] = None, use_cache: bool = False,
+                params: Optional[Dict[str, Any]] = None) -> Any:
         """
         Execute a SQL query and return the results.
         
+        The statement is committed immediately unless the connection is
+        already inside a transaction owned by the caller.
+        
+        With ``use_cache`` and a configured result cache, read-only queries
+        executed on a pooled connection are answered from the cache when
+        possible. Writes always invalidate cached results of the tables
+        they change.
+        
         Args:
             query (str): The SQL query to execute
+            connection (Optional[Connection]): Connection to execute on,
+                defaults to a connection checked out for this query
+            timings (Optional[Dict[str, float]]): If given, receives the
+                seconds spent executing the statement ('execute') and
+                fetching its rows ('fetch')
+            use_cache (bool): Serve and store the result through the result cache
+            params (Optional[Dict[str, Any]]): Values for the query's
+                ``:name`` bind parameters
             
         Returns:
             Any: Query results in a format suitable for comparison
         """
-        try:
-            # Execute the query
-            result = self.connection.execute(text(query))
+        cache = self.result_cache
+        cache_key = None
+        # A caller-owned connection may see uncommitted changes, so it bypasses the cache
+        if use_cache and cache is not None and connection is None and cache.is_cacheable(query):
+            cache_key = cache.make_key(query, params)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                if timings is not None:
+                    timings['execute'] = timings['fetch'] = 0.0
+                return copy_rows(cached)
+            generation = cache.generation
+        
+        with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                with self._deadline(connection):
+                    # Execute the query
+                    start = time.perf_counter()
+                    result = connection.execute(compile_statement(query), params or {})
+                    executed = time.perf_counter()
+                    
+                    # If the query returns rows, return them as dictionaries
+                    if result.returns_rows:
+                        output = [dict(row._mapping) for row in result]
+                    else:
+                        # For other queries, return affected row count
+                        output = {'affected_rows': result.rowcount}
+                    
+                    if timings is not None:
+                        timings['execute'] = executed - start
+                        timings['fetch'] = time.perf_counter() - executed
+                
+                if autocommit:
+                    connection.commit()
+                if cache_key is not None:
+                    cache.put(cache_key, query, copy_rows(output), generation)
+                elif cache is not None:
+                    cache.invalidate(query)
+                return output
+                
+            except Exception as e:
+                if autocommit and connection.in_transaction():
+                    connection.rollback()
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+
+    def execute_stream(self, query: str, batch_size: Optional[int] = None,
+                       connection: Optional[Connection] = None,
+                       timings: Optional[Dict[str, float]] = None,
+                       params: Optional[Dict[str, Any]] = None) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Execute a SQL query and yield its rows in batches.
+        
+        Rows are fetched through a server-side cursor where the backend
+        supports one, so at most one batch is held in memory at a time.
+        Queries that do not return rows are executed and yield nothing.
+        
+        Args:
+            query (str): The SQL query to execute
+            batch_size (Optional[int]): Rows per batch, defaults to the
+                executor's batch size
+            connection (Optional[Connection]): Connection to execute on,
+                defaults to a connection checked out until the stream ends
+            timings (Optional[Dict[str, float]]): If given, receives the
+                seconds spent executing the statement ('execute') and
+                fetching its rows ('fetch'), excluding time spent by the
+                consumer between batches
+            params (Optional[Dict[str, Any]]): Values for the query's
+                ``:name`` bind parameters
             
-            # If it's a SELECT query, return the results
-            if query.strip().upper().startswith('SELECT'):
-                # Convert to pandas DataFrame for easier manipulation
-                df = pd.DataFrame(result.fetchall())
-                if not df.empty:
-                    df.columns = result.keys()
-                return df.to_dict('records')
+        Yields:
+            List[Dict[str, Any]]: The next batch of rows
+        """
+        batch_size = batch_size or self.batch_size
+        with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                with self._deadline(connection):
+                    start = time.perf_counter()
+                    result = connection.execute(
+                        compile_statement(query),
+                        params or {},
+                        execution_options={'stream_results': True, 'yield_per': batch_size}
+                    )
+                    if timings is not None:
+                        timings['execute'] = time.perf_counter() - start
+                        timings['fetch'] = 0.0
+                    
+                    if result.returns_rows:
+                        partitions = result.partitions(batch_size)
+                        while True:
+                            fetch_start = time.perf_counter()
+                            partition = next(partitions, None)
+                            batch = [dict(row._mapping) for row in partition] if partition else None
+                            if timings is not None:
+                                timings['fetch'] += time.perf_counter() - fetch_start
+                            if batch is None:
+                                break
+                            yield batch
+                
+                if autocommit:
+                    connection.commit()
+                if self.result_cache is not None:
+                    self.result_cache.invalidate(query)
+                
+            except Exception as e:
+                if autocommit and connection.in_transaction():
+                    connection.rollback()
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+            finally:
+                # Stop early if the consumer abandons the stream
+                if autocommit and connection.in_transaction():
+                    connection.rollback()
+
+    def execute_many(self, query: str, param_sets: Iterable[Dict[str, Any]],
+                     connection: Optional[Connection] = None, batch_size: Optional[int] = None,
+                     timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Execute a statement once per parameter set, in batches.
+        
+        A single-row ``INSERT ... VALUES (:a, :b)`` is rewritten into one
+        multi-row INSERT per batch, so a batch costs one round trip instead
+        of one per row; batches are kept within the backend's bind parameter
+        limit. Other statements are sent with the driver's ``executemany``,
+        which most drivers (e.g. psycopg2) still run once per parameter set.
+        All batches run in one transaction, committed at the end unless the
+        connection is already inside a transaction owned by the caller.
+        
+        Args:
+            query (str): The SQL statement with ``:name`` bind parameters
+            param_sets (Iterable[Dict[str, Any]]): One parameter dict per
+                execution, consumed lazily
+            connection (Optional[Connection]): Connection to execute on,
+                defaults to a connection checked out for this call
+            batch_size (Optional[int]): Parameter sets per batch, defaults to
+                the executor's batch size
+            timings (Optional[Dict[str, float]]): If given, receives the
+                seconds spent executing all batches ('execute'); 'fetch' is 0
             
-            # For non-SELECT queries, return affected row count
-            return {'affected_rows': result.rowcount}
+        Returns:
+            Dict[str, Any]: Total affected rows, and the number of executions
+                and batches
+        """
+        batch_size = rows_per_batch(query, batch_size or self.batch_size, self.engine.dialect.name)
+        param_sets = iter(param_sets)
+        summary = {'affected_rows': 0, 'executions': 0, 'batches': 0}
+        with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                with self._deadline(connection):
+                    start = time.perf_counter()
+                    while True:
+                        batch = list(islice(param_sets, batch_size))
+                        if not batch:
+                            break
+                        result = connection.execute(*batch_statement(query, batch))
+                        # Drivers report -1 when they cannot count executemany rows
+                        if result.rowcount >= 0:
+                            summary['affected_rows'] += result.rowcount
+                        summary['executions'] += len(batch)
+                        summary['batches'] += 1
+                    if timings is not None:
+                        timings['execute'] = time.perf_counter() - start
+                        timings['fetch'] = 0.0
+                
+                if autocommit:
+                    connection.commit()
+                if self.result_cache is not None:
+                    self.result_cache.invalidate(query)
+                return summary
+                
+            except Exception as e:
+                if autocommit and connection.in_transaction():
+                    connection.rollback()
+                if self._is_timeout(e):
+                    raise QueryTimeoutError(f"Query exceeded the {self.timeout}s execution time limit")
+                raise Exception(f"Query execution failed: {str(e)}")
+
+    def explain(self, query: str, connection: Optional[Connection] = None,
+                params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Capture and normalize the backend's plan for a query.
+        
+        Uses ``EXPLAIN QUERY PLAN`` on SQLite, ``EXPLAIN (FORMAT JSON)`` on
+        PostgreSQL and ``EXPLAIN FORMAT=JSON`` on MySQL.
+        
+        Args:
+            query (str): The SQL query to explain
+            connection (Optional[Connection]): Connection to explain on,
+                defaults to a connection checked out for this call
+            params (Optional[Dict[str, Any]]): Values for the query's
+                ``:name`` bind parameters
             
-        except Exception as e:
-            raise Exception(f"Query execution failed: {str(e)}")
+        Returns:
+            Dict[str, Any]: Normalized plan nodes and their fingerprint
+        """
+        dialect = self.engine.dialect.name
+        statement = query.strip().rstrip(';')
+        with self._checkout(connection) as connection:
+            autocommit = not connection.in_transaction()
+            try:
+                if dialect == 'sqlite':
+                    # EXPLAIN programs never check the schema cookie, so a statement cached by the
+                    # driver keeps its old plan after DDL; the schema version keeps cache keys apart
+                    version = connection.exec_driver_sql('PRAGMA schema_version').scalar()
+                    rows = connection.execute(text(f'EXPLAIN QUERY PLAN /* schema {version} */ {statement}'),
+                                              params or {}).fetchall()
+                    nodes = normalize_sqlite_plan(rows)
+                elif dialect == 'postgresql':
+                    document = connection.execute(text(f'EXPLAIN (FORMAT JSON) {statement}'), params or {}).scalar()
+                    nodes = normalize_postgresql_plan(document)
+                elif dialect == 'mysql':
+                    document = connection.execute(text(f'EXPLAIN FORMAT=JSON {statement}'), params or {}).scalar()
+                    nodes = normalize_mysql_plan(document)
+                else:
+                    raise ValueError(f"Query plans are not supported for {dialect}")
+            finally:
+                if autocommit and connection.in_transaction():
+                    connection.rollback()
+        
+        return {
+            'fingerprint': plan_fingerprint(nodes),
+            'nodes': nodes
+        }
 
     def validate_query(self, query: str) -> Dict[str, Any]:
         """
@@ -61,21 +630,16 @@ class QueryExecutor:
         }
         
         try:
-            # Basic query type detection
-            query_upper = query.strip().upper()
-            if query_upper.startswith('SELECT'):
-                validation['query_type'] = 'SELECT'
-            elif query_upper.startswith('INSERT'):
-                validation['query_type'] = 'INSERT'
-            elif query_upper.startswith('UPDATE'):
-                validation['query_type'] = 'UPDATE'
-            elif query_upper.startswith('DELETE'):
-                validation['query_type'] = 'DELETE'
+            # Classify on tokens, so comments, CTEs and string literals
+            # cannot change the detected type
+            query_type = statement_type(query)
+            if query_type in ('SELECT', 'INSERT', 'UPDATE', 'DELETE'):
+                validation['query_type'] = query_type
             else:
                 validation['issues'].append('Unknown query type')
             
             # Check for common issues
-            if 'DROP' in query_upper or 'TRUNCATE' in query_upper:
+            if find_keywords(query, 'DROP') or find_keywords(query, 'TRUNCATE'):
                 validation['issues'].append('Query contains potentially dangerous operations')
             
             validation['is_valid'] = len(validation['issues']) == 0
@@ -87,8 +651,6 @@ class QueryExecutor:
         return validation
 
     def close(self):
-        """Close the database connection."""
-        if self.connection:
-            self.connection.close()
+        """Close all pooled database connections."""
         if self.engine:
             self.engine.dispose() 
\ No newline at end of file
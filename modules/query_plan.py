@@ -0,0 +1,153 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+# Matches the table and index named in a SQLite EXPLAIN QUERY PLAN step
+_SQLITE_STEP = re.compile(
+    r'^(?P<operation>SCAN|SEARCH)\s+(?:TABLE\s+)?(?P<relation>\S+)(?:\s+AS\s+\S+)?'
+    r'(?:\s+USING\s+(?:COVERING\s+)?(?:INDEX\s+(?P<index>\S+)|(?P<key>(?:INTEGER\s+)?PRIMARY\s+KEY)))?'
+)
+
+
+def plan_node(depth: int, operation: str, relation: Optional[str] = None,
+              index: Optional[str] = None, full_scan: bool = False) -> Dict[str, Any]:
+    """Build a normalized, backend-independent plan node."""
+    return {
+        'depth': depth,
+        'operation': operation,
+        'relation': relation,
+        'index': index,
+        'full_scan': full_scan
+    }
+
+
+def normalize_sqlite_plan(rows: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Normalize the rows of SQLite's ``EXPLAIN QUERY PLAN``.
+
+    Args:
+        rows (List[tuple]): (id, parent, notused, detail) rows
+
+    Returns:
+        List[Dict[str, Any]]: Plan nodes in execution order
+    """
+    depths = {0: -1}
+    nodes = []
+    for node_id, parent, _, detail in rows:
+        depth = depths.get(parent, -1) + 1
+        depths[node_id] = depth
+        match = _SQLITE_STEP.match(detail)
+        if match:
+            index = match.group('index') or match.group('key')
+            nodes.append(plan_node(
+                depth, match.group('operation'), match.group('relation'), index,
+                full_scan=match.group('operation') == 'SCAN' and index is None
+            ))
+        else:
+            nodes.append(plan_node(depth, detail))
+    return nodes
+
+
+def normalize_postgresql_plan(document: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize PostgreSQL's ``EXPLAIN (FORMAT JSON)`` output.
+
+    Costs, row estimates and widths vary between runs and are dropped.
+
+    Args:
+        document (Any): Parsed JSON plan document
+
+    Returns:
+        List[Dict[str, Any]]: Plan nodes in depth-first order
+    """
+    if isinstance(document, str):
+        document = json.loads(document)
+    nodes = []
+
+    def walk(plan: Dict[str, Any], depth: int):
+        node_type = plan.get('Node Type', '')
+        operation = ' '.join(part for part in (plan.get('Strategy'), plan.get('Join Type'), node_type) if part)
+        nodes.append(plan_node(
+            depth, operation, plan.get('Relation Name'), plan.get('Index Name'),
+            full_scan=node_type == 'Seq Scan'
+        ))
+        for child in plan.get('Plans', []):
+            walk(child, depth + 1)
+
+    for entry in document:
+        walk(entry['Plan'], 0)
+    return nodes
+
+
+def normalize_mysql_plan(document: Any) -> List[Dict[str, Any]]:
+    """
+    Normalize MySQL's ``EXPLAIN FORMAT=JSON`` output.
+
+    Args:
+        document (Any): Parsed JSON plan document
+
+    Returns:
+        List[Dict[str, Any]]: One node per table access, in document order
+    """
+    if isinstance(document, str):
+        document = json.loads(document)
+    nodes = []
+
+    def walk(value: Any, depth: int):
+        if isinstance(value, dict):
+            if 'table_name' in value:
+                access_type = value.get('access_type', '')
+                nodes.append(plan_node(
+                    depth, access_type, value['table_name'], value.get('key'),
+                    full_scan=access_type == 'ALL'
+                ))
+            for key, child in value.items():
+                if isinstance(child, (dict, list)):
+                    walk(child, depth + 1)
+        elif isinstance(value, list):
+            for child in value:
+                walk(child, depth)
+
+    walk(document, 0)
+    return nodes
+
+
+def plan_fingerprint(nodes: List[Dict[str, Any]]) -> str:
+    """
+    Fingerprint a normalized plan.
+
+    Args:
+        nodes (List[Dict[str, Any]]): Normalized plan nodes
+
+    Returns:
+        str: Hex digest that changes whenever the plan shape changes
+    """
+    canonical = json.dumps(nodes, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def describe_plan_change(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarize how a plan changed.
+
+    Args:
+        previous (List[Dict[str, Any]]): Previously recorded plan nodes
+        current (List[Dict[str, Any]]): Newly captured plan nodes
+
+    Returns:
+        Dict[str, Any]: Relations that became full scans, indexes that are
+            no longer used, and whether the change is likely a slowdown
+    """
+    previous_scans = {node['relation'] for node in previous if node['full_scan']}
+    current_scans = {node['relation'] for node in current if node['full_scan']}
+    previous_indexes = {node['index'] for node in previous if node['index']}
+    current_indexes = {node['index'] for node in current if node['index']}
+
+    new_full_scans = sorted(relation for relation in current_scans - previous_scans if relation)
+    dropped_indexes = sorted(previous_indexes - current_indexes)
+    return {
+        'new_full_scans': new_full_scans,
+        'dropped_indexes': dropped_indexes,
+        'likely_regression': bool(new_full_scans or dropped_indexes)
+    }
@@ -0,0 +1,264 @@
+import gzip
+import html
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from typing import Any, BinaryIO, Dict, Optional, TextIO
+
+REPORT_FORMATS = ('json', 'jsonl', 'yaml', 'html', 'msgpack')
+COMPRESSIONS = ('gzip', 'zstd')
+# File name extension of each report format and compression
+FORMAT_EXTENSIONS = {'json': 'json', 'jsonl': 'jsonl', 'yaml': 'yaml', 'html': 'html', 'msgpack': 'msgpack'}
+COMPRESSION_EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+# Result columns shown in HTML reports; other keys are shown as JSON details
+HTML_COLUMNS = ('name', 'status', 'execution_time', 'error', 'query')
+
+
+def open_output(path: str, compression: Optional[str] = None) -> BinaryIO:
+    """
+    Open a report file for binary writing, optionally compressed.
+
+    The file must not exist yet, so two reports can never write to the
+    same file.
+
+    Args:
+        path (str): File to create
+        compression (Optional[str]): None, 'gzip' or 'zstd' (requires zstandard)
+
+    Returns:
+        BinaryIO: Writable file object
+
+    Raises:
+        FileExistsError: If the file already exists
+    """
+    if not compression:
+        return open(path, 'xb')
+    if compression == 'gzip':
+        # Level 6 keeps compression fast enough to keep up with a running suite
+        return gzip.open(path, 'xb', compresslevel=6)
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression requires zstandard (pip install zstandard)")
+        return zstandard.ZstdCompressor().stream_writer(open(path, 'xb'), closefd=True)
+    raise ValueError(f"Unsupported report compression: {compression}")
+
+
+class ReportWriter(ABC):
+    """
+    Writes a report piece by piece: a header, each result as it arrives,
+    and the summary at the end, so no more than one result is held in
+    memory by the writer.
+    """
+
+    def __init__(self, output: BinaryIO):
+        self.output = output
+
+    def begin(self, timestamp: str):
+        """Write everything that comes before the first result."""
+
+    @abstractmethod
+    def write_result(self, result: Dict[str, Any]):
+        """Append one test result."""
+
+    def finish(self, summary: Dict[str, Any]):
+        """Write the summary and close the output."""
+        self.close()
+
+    def close(self):
+        """Close the output, e.g. when the run was aborted."""
+        self.output.close()
+
+
+class _TextReportWriter(ReportWriter):
+    def __init__(self, output: BinaryIO):
+        super().__init__(output)
+        self.text: TextIO = io.TextIOWrapper(output, encoding='utf-8', newline='\n', write_through=False)
+
+    def close(self):
+        self.text.close()
+
+
+class JsonLinesWriter(_TextReportWriter):
+    """One JSON object per line: a header, each result, and the summary last."""
+
+    def begin(self, timestamp: str):
+        self.text.write(json.dumps({'type': 'header', 'timestamp': timestamp}) + '\n')
+
+    def write_result(self, result: Dict[str, Any]):
+        self.text.write(json.dumps(dict(result, type='result'), default=str) + '\n')
+
+    def finish(self, summary: Dict[str, Any]):
+        self.text.write(json.dumps({'type': 'summary', 'summary': summary}) + '\n')
+        self.close()
+
+
+class JsonWriter(_TextReportWriter):
+    """A single JSON document with the summary after the results."""
+
+    def begin(self, timestamp: str):
+        self.text.write('{\n  "timestamp": %s,\n  "test_results": [' % json.dumps(timestamp))
+        self._separator = '\n    '
+
+    def write_result(self, result: Dict[str, Any]):
+        self.text.write(self._separator + json.dumps(result, default=str))
+        self._separator = ',\n    '
+
+    def finish(self, summary: Dict[str, Any]):
+        self.text.write('\n  ],\n  "summary": ')
+        self.text.write(json.dumps(summary, indent=2).replace('\n', '\n  '))
+        self.text.write('\n}\n')
+        self.close()
+
+
+class YamlWriter(_TextReportWriter):
+    """A YAML mapping whose ``test_results`` sequence is appended item by item."""
+
+    def __init__(self, output: BinaryIO):
+        super().__init__(output)
+        import yaml
+        self._yaml = yaml
+        # Use libyaml's C emitter when PyYAML was built with it
+        self._dumper = getattr(yaml, 'CDumper', yaml.Dumper)
+
+    def _dump(self, value: Any) -> str:
+        return self._yaml.dump(value, Dumper=self._dumper, default_flow_style=False)
+
+    def begin(self, timestamp: str):
+        self.text.write(self._dump({'timestamp': timestamp}))
+        self.text.write('test_results:\n')
+        self._empty = True
+
+    def write_result(self, result: Dict[str, Any]):
+        self._empty = False
+        self.text.write(self._dump([result]))
+
+    def finish(self, summary: Dict[str, Any]):
+        if self._empty:
+            self.text.write('  []\n')
+        self.text.write(self._dump({'summary': summary}))
+        self.close()
+
+
+class HtmlWriter(_TextReportWriter):
+    """An HTML page with one table row per result and the summary rendered above the table."""
+
+    def begin(self, timestamp: str):
+        header = ''.join(f'<th>{column}</th>' for column in HTML_COLUMNS + ('details',))
+        self.text.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <title>SQL Test Report</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .report {{ display: flex; flex-direction: column; }}
+        .summary {{ background-color: #f5f5f5; padding: 20px; border-radius: 5px; order: -1; }}
+        .test-results {{ margin-top: 20px; }}
+        table {{ border-collapse: collapse; width: 100%; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top; }}
+        th {{ background-color: #f2f2f2; }}
+        .pass {{ color: green; }}
+        .fail {{ color: red; }}
+        .error {{ color: orange; }}
+        .timeout {{ color: purple; }}
+        .regressed {{ color: darkred; }}
+    </style>
+</head>
+<body>
+    <h1>SQL Test Report</h1>
+    <p>{html.escape(timestamp)}</p>
+    <div class="report">
+    <div class="test-results">
+        <h2>Test Results</h2>
+        <table class="test-results-table">
+            <thead><tr>{header}</tr></thead>
+            <tbody>
+""")
+
+    def write_result(self, result: Dict[str, Any]):
+        cells = []
+        for column in HTML_COLUMNS:
+            value = result.get(column)
+            css = f' class="{html.escape(str(value).lower())}"' if column == 'status' else ''
+            cells.append(f'<td{css}>{html.escape("" if value is None else str(value))}</td>')
+        details = {key: value for key, value in result.items() if key not in HTML_COLUMNS}
+        cells.append(f'<td>{html.escape(json.dumps(details, default=str)) if details else ""}</td>')
+        self.text.write(f'            <tr>{"".join(cells)}</tr>\n')
+
+    def finish(self, summary: Dict[str, Any]):
+        self.text.write(f"""            </tbody>
+        </table>
+    </div>
+    <div class="summary">
+        <h2>Summary</h2>
+        <p>Total Tests: {summary['total_tests']}</p>
+        <p>Passed: {summary['passed_tests']}</p>
+        <p>Failed: {summary['failed_tests']}</p>
+        <p>Errors: {summary['error_tests']}</p>
+        <p>Timeouts: {summary['timeout_tests']}</p>
+        <p>Regressions: {summary['regressed_tests']}</p>
+        <p>Plan Changes: {summary['plan_changes']}</p>
+        <p>Success Rate: {summary['success_rate']:.2f}%</p>
+        <p>Average Execution Time: {summary['average_execution_time']:.4f}s</p>
+    </div>
+    </div>
+</body>
+</html>
+""")
+        self.close()
+
+
+class MsgpackWriter(ReportWriter):
+    """A stream of MessagePack maps laid out like JSON Lines reports (requires msgpack)."""
+
+    def __init__(self, output: BinaryIO):
+        super().__init__(output)
+        try:
+            import msgpack
+        except ImportError:
+            raise ValueError("MessagePack reports require msgpack (pip install msgpack)")
+        self._packer = msgpack.Packer(default=str)
+
+    def begin(self, timestamp: str):
+        self.output.write(self._packer.pack({'type': 'header', 'timestamp': timestamp}))
+
+    def write_result(self, result: Dict[str, Any]):
+        self.output.write(self._packer.pack(dict(result, type='result')))
+
+    def finish(self, summary: Dict[str, Any]):
+        self.output.write(self._packer.pack({'type': 'summary', 'summary': summary}))
+        self.close()
+
+
+WRITERS = {
+    'json': JsonWriter,
+    'jsonl': JsonLinesWriter,
+    'yaml': YamlWriter,
+    'html': HtmlWriter,
+    'msgpack': MsgpackWriter
+}
+
+
+def create_writer(path: str, format: str = 'json', compression: Optional[str] = None) -> ReportWriter:
+    """
+    Open a streaming writer for a report file.
+
+    Args:
+        path (str): File to create
+        format (str): One of ``REPORT_FORMATS``
+        compression (Optional[str]): None, 'gzip' or 'zstd'
+
+    Returns:
+        ReportWriter: Writer for the report
+    """
+    if format not in WRITERS:
+        raise ValueError(f"Unsupported report format: {format}")
+    output = open_output(path, compression)
+    try:
+        return WRITERS[format](output)
+    except Exception:
+        output.close()
+        os.remove(path)
+        raise
@@ -1,13 +1,22 @@
 import os
-import json
-import yaml
 from datetime import datetime
-from typing import List, Dict, Any
-import pandas as pd
+from itertools import count
+from typing import List, Dict, Any, Optional
+from .baseline import BaselineStore
+from .report_writers import (
+    COMPRESSION_EXTENSIONS,
+    COMPRESSIONS,
+    FORMAT_EXTENSIONS,
+    REPORT_FORMATS,
+    create_writer
+)
 
 class ReportGenerator:
-    def __init__(self, report_dir: str = 'reports'):
+    def __init__(self, report_dir: str = 'reports', baseline_store: Optional[BaselineStore] = None,
+                 compression: Optional[str] = None):
         self.report_dir = report_dir
+        self.baseline_store = baseline_store
+        self.compression = compression or None
         os.makedirs(report_dir, exist_ok=True)
 
     def generate_report(self, test_results: List[Dict[str, Any]], format: str = 'json') -> Dict[str, Any]:
@@ -16,117 +25,175 @@ class ReportGenerator:
         
         Args:
             test_results (List[Dict[str, Any]]): List of test results
-            format (str): Output format ('json', 'yaml', or 'html')
+            format (str): Output format ('json', 'jsonl', 'yaml', 'html' or 'msgpack')
             
         Returns:
             Dict[str, Any]: Generated report
         """
-        # Calculate summary statistics
-        total_tests = len(test_results)
-        passed_tests = sum(1 for r in test_results if r['status'] == 'PASS')
-        failed_tests = sum(1 for r in test_results if r['status'] == 'FAIL')
-        error_tests = sum(1 for r in test_results if r['status'] == 'ERROR')
+        report = self.begin_report(format)
+        for result in test_results:
+            report.add_result(result)
+        return dict(report.finish(), test_results=test_results)
+
+    def begin_report(self, format: str = 'json', compression: Optional[str] = None) -> 'IncrementalReport':
+        """
+        Start a report that receives test results as they complete.
         
-        # Calculate average execution time
-        execution_times = [r['execution_time'] for r in test_results if r['status'] != 'ERROR']
-        avg_execution_time = sum(execution_times) / len(execution_times) if execution_times else 0
+        The report file is written while the suite runs, one result at a
+        time, and the summary is appended when the report is finished.
         
-        # Generate report
-        report = {
-            'timestamp': datetime.now().isoformat(),
-            'summary': {
-                'total_tests': total_tests,
-                'passed_tests': passed_tests,
-                'failed_tests': failed_tests,
-                'error_tests': error_tests,
-                'success_rate': (passed_tests / total_tests * 100) if total_tests > 0 else 0,
-                'average_execution_time': avg_execution_time
-            },
-            'test_results': test_results
-        }
+        Args:
+            format (str): Output format ('json', 'jsonl', 'yaml', 'html' or 'msgpack')
+            compression (Optional[str]): 'gzip' or 'zstd', defaults to the
+                generator's compression
+            
+        Returns:
+            IncrementalReport: Report to add results to and finish
+        """
+        compression = compression or self.compression
+        if format not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported report format: {format}")
+        if compression and compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported report compression: {compression}")
         
-        # Save report to file
-        self._save_report(report, format)
+        timestamp = datetime.now()
+        stem = f"report_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}"
+        extension = f".{FORMAT_EXTENSIONS[format]}{COMPRESSION_EXTENSIONS[compression] if compression else ''}"
+        # Report files are created exclusively, so reports started at the
+        # same time, e.g. by concurrent jobs, get numbered instead of sharing a file
+        for attempt in count():
+            filename = f"{stem}_{attempt}{extension}" if attempt else f"{stem}{extension}"
+            try:
+                return IncrementalReport(self, os.path.join(self.report_dir, filename), format,
+                                         compression, timestamp.isoformat())
+            except FileExistsError:
+                continue
+
+    def _check_regression(self, result: Dict[str, Any]):
+        """
+        Mark a passing test that is significantly slower than its baseline.
         
-        return report
+        Regressed tests get the REGRESSED status and a ``regression`` entry.
+        
+        Args:
+            result (Dict[str, Any]): Test result, updated in place
+        """
+        if result['status'] != 'PASS':
+            return
+        regression = self.baseline_store.check(result)
+        if regression:
+            result['status'] = 'REGRESSED'
+            result['regression'] = regression
+            result['error'] = (
+                f"Latency {regression['current']:.6f}s exceeds baseline median "
+                f"{regression['baseline_median']:.6f}s (limit {regression['limit']:.6f}s)"
+            )
+
 
-    def _save_report(self, report: Dict[str, Any], format: str):
+class IncrementalReport:
+    def __init__(self, generator: ReportGenerator, path: str, format: str = 'json',
+                 compression: Optional[str] = None, timestamp: Optional[str] = None):
         """
-        Save the report to a file in the specified format.
+        Report written to disk as test results arrive.
+        
+        Each result is appended to the report file as soon as it is added,
+        and summary counters are updated along the way, so memory use does
+        not grow with the size of the results. Baseline regressions are
+        checked per result, and the latencies of the passing tests are
+        recorded when the report is finished.
         
         Args:
-            report (Dict[str, Any]): The report to save
-            format (str): Output format
+            generator (ReportGenerator): Generator holding the baseline store
+            path (str): Report file to write
+            format (str): Output format ('json', 'jsonl', 'yaml', 'html' or 'msgpack')
+            compression (Optional[str]): 'gzip' or 'zstd'
+            timestamp (Optional[str]): ISO timestamp of the report
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.generator = generator
+        self.path = path
+        self.format = format
+        self.timestamp = timestamp or datetime.now().isoformat()
+        self.total_tests = 0
+        self.counts = {status: 0 for status in ('PASS', 'FAIL', 'ERROR', 'TIMEOUT', 'REGRESSED', 'DIVERGED')}
+        self.plan_changes = 0
+        self.cached_tests = 0
+        self._timed_tests = 0
+        self._total_execution_time = 0.0
+        # Only what the baseline store needs of each passing test
+        self._passed: List[Dict[str, Any]] = []
+        self._writer = create_writer(path, format, compression)
+        self._writer.begin(self.timestamp)
+
+    def add_result(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Add a completed test result.
         
-        if format == 'json':
-            filename = f'report_{timestamp}.json'
-            filepath = os.path.join(self.report_dir, filename)
-            with open(filepath, 'w') as f:
-                json.dump(report, f, indent=2)
-                
-        elif format == 'yaml':
-            filename = f'report_{timestamp}.yaml'
-            filepath = os.path.join(self.report_dir, filename)
-            with open(filepath, 'w') as f:
-                yaml.dump(report, f, default_flow_style=False)
-                
-        elif format == 'html':
-            filename = f'report_{timestamp}.html'
-            filepath = os.path.join(self.report_dir, filename)
-            self._generate_html_report(report, filepath)
+        Args:
+            result (Dict[str, Any]): Test result, updated in place if it regressed
             
-        else:
-            raise ValueError(f"Unsupported report format: {format}")
+        Returns:
+            Dict[str, Any]: The result with its final status
+        """
+        # Flag tests that got slower than their baselines; reused results were checked when they ran
+        if self.generator.baseline_store and not result.get('cached'):
+            self.generator._check_regression(result)
+        
+        self._writer.write_result(result)
+        self.total_tests += 1
+        if result['status'] in self.counts:
+            self.counts[result['status']] += 1
+        if result.get('plan_changed'):
+            self.plan_changes += 1
+        if result.get('cached'):
+            self.cached_tests += 1
+        if result['status'] not in ('ERROR', 'TIMEOUT'):
+            self._timed_tests += 1
+            self._total_execution_time += result['execution_time']
+        if result['status'] == 'PASS' and self.generator.baseline_store and not result.get('cached'):
+            self._passed.append({key: result[key] for key in ('name', 'query', 'status', 'execution_time', 'benchmark')
+                                 if key in result})
+        return result
 
-    def _generate_html_report(self, report: Dict[str, Any], filepath: str):
+    def summary(self) -> Dict[str, Any]:
         """
-        Generate an HTML report.
+        Summarize the results added so far.
         
-        Args:
-            report (Dict[str, Any]): The report data
-            filepath (str): Path to save the HTML file
+        Returns:
+            Dict[str, Any]: Test counts per status, success rate and average execution time
+        """
+        return {
+            'total_tests': self.total_tests,
+            'passed_tests': self.counts['PASS'],
+            'failed_tests': self.counts['FAIL'],
+            'error_tests': self.counts['ERROR'],
+            'timeout_tests': self.counts['TIMEOUT'],
+            'regressed_tests': self.counts['REGRESSED'],
+            'diverged_tests': self.counts['DIVERGED'],
+            'plan_changes': self.plan_changes,
+            'cached_tests': self.cached_tests,
+            'success_rate': (self.counts['PASS'] / self.total_tests * 100) if self.total_tests > 0 else 0,
+            'average_execution_time': (self._total_execution_time / self._timed_tests
+                                       if self._timed_tests else 0)
+        }
+
+    def finish(self) -> Dict[str, Any]:
         """
-        # Convert test results to DataFrame for easier HTML generation
-        df = pd.DataFrame(report['test_results'])
+        Record baselines and write the summary to the report file.
         
-        # Generate HTML
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>SQL Test Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .summary {{ background-color: #f5f5f5; padding: 20px; border-radius: 5px; }}
-                .test-results {{ margin-top: 20px; }}
-                table {{ border-collapse: collapse; width: 100%; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #f2f2f2; }}
-                .pass {{ color: green; }}
-                .fail {{ color: red; }}
-                .error {{ color: orange; }}
-            </style>
-        </head>
-        <body>
-            <h1>SQL Test Report</h1>
-            <div class="summary">
-                <h2>Summary</h2>
-                <p>Total Tests: {report['summary']['total_tests']}</p>
-                <p>Passed: {report['summary']['passed_tests']}</p>
-                <p>Failed: {report['summary']['failed_tests']}</p>
-                <p>Errors: {report['summary']['error_tests']}</p>
-                <p>Success Rate: {report['summary']['success_rate']:.2f}%</p>
-                <p>Average Execution Time: {report['summary']['average_execution_time']:.2f}s</p>
-            </div>
-            <div class="test-results">
-                <h2>Test Results</h2>
-                {df.to_html(classes='test-results-table', index=False)}
-            </div>
-        </body>
-        </html>
+        Returns:
+            Dict[str, Any]: Timestamp, summary and path of the report file
         """
+        if self.generator.baseline_store:
+            self.generator.baseline_store.record(self._passed)
         
-        with open(filepath, 'w') as f:
-            f.write(html) 
\ No newline at end of file
+        summary = self.summary()
+        self._writer.finish(summary)
+        return {
+            'timestamp': self.timestamp,
+            'summary': summary,
+            'report_file': self.path
+        }
+
+    def close(self):
+        """Close the report file without a summary, e.g. when the run failed."""
+        self._writer.close()
@@ -0,0 +1,244 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Hashable, NamedTuple, Optional, Tuple
+from .sql_lexer import analyze, table_access
+
+# Functions whose result changes between calls, making a query uncacheable
+VOLATILE_FUNCTIONS = frozenset((
+    'RANDOM', 'RAND', 'NOW', 'CURRENT_TIMESTAMP', 'CURRENT_DATE', 'CURRENT_TIME',
+    'LOCALTIME', 'LOCALTIMESTAMP', 'SYSDATE', 'GETDATE', 'CLOCK_TIMESTAMP', 'UUID',
+    'GEN_RANDOM_UUID', 'NEWID', 'NEXTVAL', 'LAST_INSERT_ID', 'CHANGES'
+))
+
+
+class _Entry(NamedTuple):
+    value: Any
+    tables: FrozenSet[str]
+    size: int
+    expires_at: float
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory held by a query result.
+
+    Args:
+        value (Any): Rows as a list of dicts, or another result object
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    if isinstance(value, list):
+        return sys.getsizeof(value) + sum(estimate_size(row) for row in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0, max_bytes: int = 64 * 1024 * 1024):
+        """
+        In-memory cache of read-only query results.
+
+        Entries are keyed by the query's significant tokens, exactly as
+        written, together with its bound parameters, so queries differing
+        only in whitespace or comments share an entry. Words keep their case
+        because identifiers and column aliases name the result's columns,
+        and a query fingerprint would lowercase them. The least
+        recently used entries are evicted once ``max_entries`` or
+        ``max_bytes`` is exceeded, and entries expire ``ttl`` seconds after
+        they were stored. Writes invalidate every entry that reads one of
+        the written tables.
+
+        Args:
+            max_entries (int): Maximum number of cached results
+            ttl (float): Seconds a result stays valid (0 disables expiry)
+            max_bytes (int): Approximate memory limit for all cached results
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+        self._bytes = 0
+        # Incremented by every write, so results read before it are not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    @staticmethod
+    def make_key(query: str, params: Optional[Dict[str, Any]] = None) -> Tuple[Any, ...]:
+        """
+        Build the cache key of a query.
+
+        Args:
+            query (str): The SQL query
+            params (Optional[Dict[str, Any]]): Bound parameters
+
+        Returns:
+            Tuple[Any, ...]: Significant token values and sorted parameters
+        """
+        values = [token.value for token in analyze(query).significant]
+        while values and values[-1] == ';':
+            values.pop()
+        bound = tuple(sorted((name, repr(value)) for name, value in params.items())) if params else ()
+        return tuple(values), bound
+
+    @staticmethod
+    def is_cacheable(query: str) -> bool:
+        """
+        Check whether a query's result may be cached.
+
+        Args:
+            query (str): The SQL query
+
+        Returns:
+            bool: True for single SELECT statements without volatile functions
+        """
+        info = analyze(query)
+        if info.statement_type != 'SELECT':
+            return False
+        if any(token.value == ';' for token in info.significant[:-1]):
+            return False
+        return not VOLATILE_FUNCTIONS.intersection(info.keywords)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached result.
+
+        Args:
+            key (Hashable): Key from ``make_key``
+
+        Returns:
+            Optional[Any]: The cached result, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                entry = None
+            if entry is None:
+                self._stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return entry.value
+
+    @property
+    def generation(self) -> int:
+        """Write counter to read before executing a query whose result will be stored."""
+        return self._generation
+
+    def put(self, key: Hashable, query: str, value: Any, generation: Optional[int] = None):
+        """
+        Store a query result.
+
+        Results larger than the whole memory limit are not cached.
+
+        Args:
+            key (Hashable): Key from ``make_key``
+            query (str): The SQL query, used to find the tables it reads
+            value (Any): The query result
+            generation (Optional[int]): ``generation`` read before the query
+                was executed; the result is discarded if a write happened since
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        entry = _Entry(value, table_access(query).read, size, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats['evictions'] += 1
+
+    def invalidate(self, query: str):
+        """
+        Drop the cached results a write may have changed.
+
+        Args:
+            query (str): The SQL statement that was executed
+        """
+        access = table_access(query)
+        if access.unknown_writes:
+            self.clear()
+            return
+        if not access.written:
+            return
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.tables & access.written]
+            for key in stale:
+                self._remove(key)
+            self._stats['invalidations'] += len(stale)
+
+    def clear(self):
+        """Drop all cached results."""
+        with self._lock:
+            self._generation += 1
+            self._stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report cache occupancy and hit/miss counters.
+
+        Returns:
+            Dict[str, Any]: Entry count, memory use, hits, misses, hit ratio,
+                evictions, expirations and invalidations
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes
+            })
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0
+        return stats
+
+
+def copy_rows(rows: Any) -> Any:
+    """Copy cached rows so callers cannot modify the cached result."""
+    if isinstance(rows, list):
+        return [dict(row) if isinstance(row, dict) else row for row in rows]
+    return rows
+
+
+def create_result_cache(config: Any) -> Optional[ResultCache]:
+    """
+    Create the result cache described by the application configuration.
+
+    Args:
+        config (Any): Configuration object such as ``config.Config``
+
+    Returns:
+        Optional[ResultCache]: The cache, or None if result caching is disabled
+    """
+    if not config.RESULT_CACHE_ENABLED:
+        return None
+    return ResultCache(
+        max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+        ttl=config.RESULT_CACHE_TTL,
+        max_bytes=config.RESULT_CACHE_MAX_BYTES
+    )
@@ -1,7 +1,195 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Hashable, Optional, Tuple
 import re
+from .sql_lexer import analyze, find_keywords, has_parameters, is_unterminated
+
+# Characters that give a regular expression rule a meaning beyond its literal text
+_REGEX_META = frozenset('.^$*+?{}[]\\|()')
+
+
+def _unescape_literal(pattern: str) -> Optional[str]:
+    """Return the text a regex matches literally, or None if it is not a plain literal."""
+    chars = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\':
+            if i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+                chars.append(pattern[i + 1])
+                i += 2
+                continue
+            return None
+        if char in _REGEX_META:
+            return None
+        chars.append(char)
+        i += 1
+    return ''.join(chars)
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Return the literal text every match of a regex has to start with."""
+    chars = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == '\\' and i + 1 < len(pattern) and not pattern[i + 1].isalnum():
+            literal, width = pattern[i + 1], 2
+        elif char in _REGEX_META:
+            break
+        else:
+            literal, width = char, 1
+        if i + width < len(pattern) and pattern[i + width] in '*?{+':
+            break
+        chars.append(literal)
+        i += width
+    return ''.join(chars)
+
+
+class PatternScanner:
+    def __init__(self, rules: List[Tuple[Hashable, str, bool, bool]]):
+        """
+        Match many literal and regex rules against a query in a single pass.
+
+        Every rule is reduced to literal text where possible: plain literals,
+        regexes made of literals joined by ``.*`` (matched as an ordered
+        sequence of literals on one line) and regexes starting with a literal
+        (verified with the regex at each position the literal occurs). All
+        literals are compiled into one case-insensitive alternation that is
+        searched once per query, and each match position is checked against
+        every literal it starts. Rules that cannot be reduced fall back to a
+        regex search of their own.
+
+        Args:
+            rules (List[Tuple[Hashable, str, bool, bool]]): (key, pattern,
+                is_regex, case_sensitive) for each rule
+        """
+        self.keys = [rule[0] for rule in rules]
+        self._steps = []
+        self._consumers = {}
+        self._fallbacks = []
+        for index, (key, pattern, is_regex, case_sensitive) in enumerate(rules):
+            flags = 0 if case_sensitive else re.IGNORECASE
+            steps = [pattern] if not is_regex else self._regex_steps(pattern)
+            if steps:
+                self._steps.append(len(steps))
+                for step, literal in enumerate(steps):
+                    self._add_consumer(literal, index, step, case_sensitive, None)
+                continue
+
+            self._steps.append(1)
+            prefix = _literal_prefix(pattern) if is_regex else ''
+            if prefix:
+                self._add_consumer(prefix, index, 0, case_sensitive, re.compile(pattern, flags))
+            else:
+                self._fallbacks.append((index, re.compile(pattern, flags)))
+
+        # '.' does not match a newline, so sequences restart on every line
+        self._consumers.setdefault('\n', [])
+
+        # Alternatives are tried in order, so the longest literal wins at each
+        # position; shorter literals matching there are always its prefixes
+        literals = sorted(self._consumers, key=len, reverse=True)
+        self._implied = {
+            literal: [other for other in literals if other != literal and literal.startswith(other)]
+            for literal in literals
+        }
+        alternation = '|'.join(re.escape(literal) for literal in literals)
+        self._pattern = re.compile(alternation)
+        self._folding_pattern = re.compile(alternation, re.IGNORECASE)
+
+    @staticmethod
+    def _regex_steps(pattern: str) -> Optional[List[str]]:
+        """Split a regex of literals joined by ``.*`` into its literals."""
+        steps = []
+        for piece in pattern.split('.*'):
+            literal = _unescape_literal(piece)
+            if literal is None:
+                return None
+            if literal:
+                steps.append(literal)
+        return steps or None
+
+    def _add_consumer(self, literal: str, index: int, step: int, case_sensitive: bool,
+                      verifier: Optional[re.Pattern]):
+        exact = literal if case_sensitive else None
+        self._consumers.setdefault(literal.lower(), []).append((index, step, len(literal), exact, verifier))
+
+    def scan(self, query: str) -> Dict[Hashable, int]:
+        """
+        Scan a query for all rules at once.
+
+        Args:
+            query (str): The SQL query to scan
+
+        Returns:
+            Dict[Hashable, int]: Hit count of every matching rule, by rule key.
+                Single-literal rules count each occurrence; other rules count 1.
+        """
+        counts = [0] * len(self.keys)
+        progress = [0] * len(self.keys)
+        resume_at = [0] * len(self.keys)
+        in_progress = set()
+
+        # Matching the lowercased query is much faster than a case-insensitive
+        # pattern, but only valid while lowercasing keeps every offset
+        text, pattern = query.lower(), self._pattern
+        if len(text) != len(query):
+            text, pattern = query, self._folding_pattern
+
+        match = pattern.search(text)
+        while match:
+            position = match.start()
+            literal = match.group().lower()
+            # Searching again from the next character also finds overlapping matches
+            match = pattern.search(text, position + 1)
+            if literal not in self._implied:
+                continue
+            for token in [literal] + self._implied[literal]:
+                if token == '\n':
+                    for index in in_progress:
+                        progress[index] = 0
+                    in_progress.clear()
+                    continue
+                for index, step, length, exact, verifier in self._consumers[token]:
+                    if exact is not None and not query.startswith(exact, position):
+                        continue
+                    if verifier is not None:
+                        if not counts[index] and verifier.match(query, position):
+                            counts[index] = 1
+                        continue
+                    total = self._steps[index]
+                    if total == 1:
+                        counts[index] += 1
+                    elif not counts[index] and progress[index] == step and position >= resume_at[index]:
+                        progress[index] += 1
+                        resume_at[index] = position + length
+                        if progress[index] == total:
+                            counts[index] = 1
+                            in_progress.discard(index)
+                        else:
+                            in_progress.add(index)
+
+        for index, pattern in self._fallbacks:
+            if pattern.search(query):
+                counts[index] = 1
+
+        return {self.keys[index]: count for index, count in enumerate(counts) if count}
+
 
 class SecurityTester:
+    # Keyword sequences matched against the tokens of a query, outside
+    # string literals and comments
+    dangerous_operations = ['DROP', 'TRUNCATE', 'DELETE FROM', 'UPDATE']
+    # Words that mark an identifier as holding sensitive data
+    sensitive_patterns = [
+        'password',
+        'credit_card',
+        'ssn',
+        'social_security',
+        'secret',
+        'api_key',
+        'token',
+    ]
+
     def __init__(self, injection_patterns: List[str] = None):
         self.injection_patterns = injection_patterns or [
             "' OR '1'='1",
@@ -22,6 +210,40 @@ class SecurityTester:
             r"'.*WAITFOR.*DELAY",
             r"'.*SLEEP.*",
         ]
+        self._scanner = None
+        self._scanner_patterns = None
+        self._last_scan = None
+
+    def _get_scanner(self) -> PatternScanner:
+        """Get the compiled scanner, recompiling it if the configured patterns changed."""
+        patterns = (tuple(self.injection_patterns), tuple(self.common_vulnerabilities))
+        if self._scanner is None or patterns != self._scanner_patterns:
+            rules = [(('injection', pattern), pattern, False, True) for pattern in self.injection_patterns]
+            rules += [(('vulnerability', pattern), pattern, True, False) for pattern in self.common_vulnerabilities]
+            self._scanner = PatternScanner(rules)
+            self._scanner_patterns = patterns
+        return self._scanner
+
+    def scan(self, query: str) -> Dict[Tuple[str, str], int]:
+        """
+        Match every injection pattern against a query's raw text in one pass.
+
+        The hits for the last query scanned are kept, so checking the same
+        query again does not scan it twice.
+
+        Args:
+            query (str): The SQL query to scan
+
+        Returns:
+            Dict[Tuple[str, str], int]: Hit counts keyed by (rule group, pattern)
+        """
+        scanner = self._get_scanner()
+        # test_query and test_sql_injection usually check the same query in turn
+        if self._last_scan is not None and self._last_scan[0] is scanner and self._last_scan[1] == query:
+            return self._last_scan[2]
+        hits = scanner.scan(query)
+        self._last_scan = (scanner, query, hits)
+        return hits
 
     def test_sql_injection(self, query: str) -> List[Dict[str, Any]]:
         """
@@ -33,11 +255,12 @@ class SecurityTester:
         Returns:
             List[Dict[str, Any]]: List of found vulnerabilities
         """
+        hits = self.scan(query)
         vulnerabilities = []
         
         # Check for common SQL injection patterns
         for pattern in self.injection_patterns:
-            if pattern in query:
+            if ('injection', pattern) in hits:
                 vulnerabilities.append({
                     'type': 'SQL_INJECTION',
                     'pattern': pattern,
@@ -45,16 +268,15 @@ class SecurityTester:
                 })
         
         # Check for unescaped quotes
-        if query.count("'") % 2 != 0:
+        if is_unterminated(query):
             vulnerabilities.append({
                 'type': 'UNESCAPED_QUOTES',
                 'description': 'Query contains unescaped quotes'
             })
         
         # Check for dangerous operations
-        dangerous_operations = ['DROP', 'TRUNCATE', 'DELETE FROM', 'UPDATE']
-        for operation in dangerous_operations:
-            if operation in query.upper():
+        for operation in self.dangerous_operations:
+            if find_keywords(query, operation):
                 vulnerabilities.append({
                     'type': 'DANGEROUS_OPERATION',
                     'operation': operation,
@@ -73,11 +295,12 @@ class SecurityTester:
         Returns:
             List[Dict[str, Any]]: List of found vulnerabilities
         """
+        hits = self.scan(query)
         vulnerabilities = []
         
         # Test for SQL injection patterns
         for pattern in self.injection_patterns:
-            if pattern in query:
+            if ('injection', pattern) in hits:
                 vulnerabilities.append({
                     'type': 'SQL_INJECTION',
                     'pattern': pattern,
@@ -87,7 +310,7 @@ class SecurityTester:
         
         # Test for common vulnerabilities using regex
         for pattern in self.common_vulnerabilities:
-            if re.search(pattern, query, re.IGNORECASE):
+            if ('vulnerability', pattern) in hits:
                 vulnerabilities.append({
                     'type': 'SQL_INJECTION',
                     'pattern': pattern,
@@ -123,15 +346,8 @@ class SecurityTester:
         Returns:
             bool: True if the query uses parameterized statements
         """
-        # Look for common parameterization patterns
-        param_patterns = [
-            r':\w+',  # Named parameters
-            r'\?',    # Positional parameters
-            r'%s',    # Python-style parameters
-            r'@\w+',  # SQL Server parameters
-        ]
-        
-        return any(re.search(pattern, query) for pattern in param_patterns)
+        # Named (:name, @name), positional (?, $1) and Python-style (%s) markers
+        return has_parameters(query)
 
     def _contains_sensitive_data(self, query: str) -> bool:
         """
@@ -143,17 +359,15 @@ class SecurityTester:
         Returns:
             bool: True if the query might expose sensitive data
         """
-        sensitive_patterns = [
-            r'password',
-            r'credit_card',
-            r'ssn',
-            r'social_security',
-            r'secret',
-            r'api_key',
-            r'token',
-        ]
-        
-        return any(re.search(pattern, query, re.IGNORECASE) for pattern in sensitive_patterns)
+        lowered = query.lower()
+        if not any(word in lowered for word in self.sensitive_patterns):
+            return False
+        # Only identifiers count; a sensitive word inside a string literal is data
+        identifiers = (
+            token.value.strip('"`').lower() for token in analyze(query).significant
+            if token.type in ('word', 'quoted_identifier')
+        )
+        return any(word in identifier for identifier in identifiers for word in self.sensitive_patterns)
 
     def get_security_report(self, vulnerabilities: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
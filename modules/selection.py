@@ -0,0 +1,141 @@
+import heapq
+import statistics
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from .baseline import query_hash
+
+# Assumed duration of a test case with no recorded timings and no timed
+# cases to estimate from; only the relative sizes matter when scheduling
+DEFAULT_DURATION = 1.0
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification.
+
+    Args:
+        spec (str): ``k/n`` selecting shard ``k`` (from 1) of ``n``
+
+    Returns:
+        Tuple[int, int]: Shard index (from 1) and shard count
+    """
+    index, separator, count = spec.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}', expected k/n, e.g. 3/8")
+    if not separator or count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{spec}', expected k/n with 1 <= k <= n")
+    return index, count
+
+
+def estimate_durations(test_cases: Sequence[Dict[str, Any]],
+                       timings: Dict[Tuple[str, str], float]) -> List[float]:
+    """
+    Estimate how long each test case runs from recorded timings.
+
+    Cases without recorded timings are assumed to take as long as the
+    median timed case.
+
+    Args:
+        test_cases (Sequence[Dict[str, Any]]): Test cases
+        timings (Dict[Tuple[str, str], float]): Recorded duration by test
+            name and query hash, see ``BaselineStore.median_timings``
+
+    Returns:
+        List[float]: Estimated seconds per test case
+    """
+    known = [timings.get((test_case['name'], query_hash(test_case['query']))) for test_case in test_cases]
+    timed = [duration for duration in known if duration is not None]
+    default = statistics.median(timed) if timed else DEFAULT_DURATION
+    return [default if duration is None else duration for duration in known]
+
+
+def assign_shards(durations: Sequence[float], count: int) -> List[int]:
+    """
+    Split work items into shards of about equal total duration.
+
+    Items are assigned longest first, each to the shard with the least work
+    so far (longest processing time first). Ties are broken by position and
+    shard number, so the same inputs always give the same split.
+
+    Args:
+        durations (Sequence[float]): Estimated duration of each item
+        count (int): Number of shards
+
+    Returns:
+        List[int]: Shard number (from 0) of each item
+    """
+    shards = [0] * len(durations)
+    loads = [(0.0, shard) for shard in range(count)]
+    for position in sorted(range(len(durations)), key=lambda position: (-durations[position], position)):
+        load, shard = heapq.heappop(loads)
+        shards[position] = shard
+        heapq.heappush(loads, (load + durations[position], shard))
+    return shards
+
+
+class TestSelection:
+    def __init__(self, names: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+                 files: Optional[List[str]] = None, shard: Optional[Tuple[int, int]] = None):
+        """
+        Choose which test cases of a suite to run.
+
+        Each filter is a list of alternatives; a case is selected when it
+        matches every filter that is set. Sharding then splits the selected
+        cases by their recorded durations.
+
+        Args:
+            names (Optional[List[str]]): Test name patterns, e.g. ``'orders *'``
+            tags (Optional[List[str]]): Tags, any of which the case must have
+            files (Optional[List[str]]): Test file name patterns, e.g. ``'smoke_*.yaml'``
+            shard (Optional[Tuple[int, int]]): Shard index (from 1) and count
+        """
+        self.names = names or []
+        self.tags = tags or []
+        self.files = files or []
+        self.shard = shard
+
+    def __bool__(self) -> bool:
+        return bool(self.names or self.tags or self.files or self.shard)
+
+    def matches(self, test_case: Dict[str, Any]) -> bool:
+        """
+        Check whether a test case passes the name, tag and file filters.
+
+        Args:
+            test_case (Dict[str, Any]): Parsed test case
+
+        Returns:
+            bool: Whether the case is selected
+        """
+        if self.names and not any(fnmatchcase(test_case['name'], pattern) for pattern in self.names):
+            return False
+        if self.tags and not set(self.tags) & set(test_case.get('tags', [])):
+            return False
+        if self.files and not any(fnmatchcase(test_case.get('source_file', ''), pattern) for pattern in self.files):
+            return False
+        return True
+
+    def apply(self, test_cases: List[Dict[str, Any]],
+              timings: Optional[Dict[Tuple[str, str], float]] = None) -> List[Dict[str, Any]]:
+        """
+        Select test cases, keeping their suite order.
+
+        Every node running a shard must see the same test files and the same
+        timings, or the shards will overlap and leave cases out.
+
+        Args:
+            test_cases (List[Dict[str, Any]]): All test cases in suite order
+            timings (Optional[Dict[Tuple[str, str], float]]): Recorded
+                durations used to balance shards
+
+        Returns:
+            List[Dict[str, Any]]: Selected test cases
+        """
+        selected = [test_case for test_case in test_cases if self.matches(test_case)]
+        if not self.shard:
+            return selected
+        index, count = self.shard
+        shards = assign_shards(estimate_durations(selected, timings or {}), count)
+        return [test_case for test_case, shard in zip(selected, shards) if shard == index - 1]
@@ -0,0 +1,178 @@
+import os
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Arrow IPC files are memory-mapped and read without copying; Parquet files
+# are smaller on disk but decoded batch by batch
+SNAPSHOT_EXTENSIONS = ('.arrow', '.parquet')
+# Rows per record batch written to a snapshot
+SNAPSHOT_BATCH_SIZE = 10000
+
+
+def _pyarrow(path: str):
+    """Import pyarrow, which is only needed for test cases with snapshots."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise ValueError(f"Snapshot {path} requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+def is_snapshot_path(path: str) -> bool:
+    """Check whether a file name has a supported snapshot extension."""
+    return path.lower().endswith(SNAPSHOT_EXTENSIONS)
+
+
+def read_snapshot(path: str, batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the rows of an expected-result snapshot.
+
+    Arrow IPC files are memory-mapped, so only the record batch being
+    compared is converted to Python objects; the rest of the file stays in
+    the page cache. Parquet files are decoded one batch at a time.
+
+    Args:
+        path (str): Path of a ``.arrow`` or ``.parquet`` snapshot
+        batch_size (int): Rows decoded at a time from Parquet files
+
+    Yields:
+        Dict[str, Any]: The next expected row
+    """
+    pa = _pyarrow(path)
+    if not os.path.exists(path):
+        raise ValueError(f"Snapshot {path} not found; record it with --update-snapshots")
+    if path.lower().endswith('.parquet'):
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        try:
+            for batch in parquet_file.iter_batches(batch_size=batch_size):
+                yield from batch.to_pylist()
+        finally:
+            parquet_file.close()
+        return
+    with pa.memory_map(path, 'r') as source:
+        reader = pa.ipc.open_file(source)
+        for index in range(reader.num_record_batches):
+            yield from reader.get_batch(index).to_pylist()
+
+
+def write_snapshot(path: str, rows: Iterable[Dict[str, Any]], batch_size: int = SNAPSHOT_BATCH_SIZE) -> int:
+    """
+    Record rows as an expected-result snapshot.
+
+    Rows are written in record batches as they arrive, so the result is
+    never held in memory as a whole. Column types are inferred from the
+    first batch; a column that only held NULLs so far takes the type of
+    its first values, rewriting the batches already written. Rows may
+    leave out columns, which are stored as NULL, but a column first seen
+    after the first batch is an error rather than being dropped. The
+    snapshot is written to a temporary file and moved into place once
+    complete, so a failed run leaves the previous snapshot intact.
+
+    Args:
+        path (str): Path of the ``.arrow`` or ``.parquet`` snapshot to create
+        rows (Iterable[Dict[str, Any]]): Rows as dictionaries
+        batch_size (int): Rows per record batch
+
+    Returns:
+        int: Number of rows written
+    """
+    if not is_snapshot_path(path):
+        raise ValueError(f"Unsupported snapshot format: {path}")
+    pa = _pyarrow(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    rows = iter(rows)
+    temp_path = f'{path}.tmp'
+    writer = None
+    schema = None
+    count = 0
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch and writer is not None:
+                break
+            try:
+                if schema is None:
+                    record_batch = _infer_batch(pa, batch)
+                    # An empty result still gets a (column-less) snapshot
+                    schema = record_batch.schema
+                    writer = _open_writer(pa, path, temp_path, schema)
+                else:
+                    unknown = set().union(*batch) - set(schema.names)
+                    if unknown:
+                        raise ValueError(f"columns {', '.join(sorted(map(str, unknown)))} are not in earlier rows")
+                    if any(pa.types.is_null(field.type) for field in schema):
+                        widened = _widen_nulls(pa, schema, batch)
+                        if widened != schema:
+                            # Forgotten first, so a failed rewrite does not close it twice
+                            writer.close()
+                            writer = None
+                            writer = _rewrite_snapshot(pa, path, temp_path, widened)
+                            schema = widened
+                    record_batch = pa.RecordBatch.from_pylist(batch, schema=schema)
+            except (pa.ArrowTypeError, TypeError, ValueError) as e:
+                raise ValueError(f"Cannot store rows {count + 1}-{count + len(batch)} in snapshot {path}: {e}")
+            if batch:
+                writer.write_batch(record_batch)
+                count += len(batch)
+            if len(batch) < batch_size:
+                break
+        writer.close()
+        writer = None
+        os.replace(temp_path, path)
+    except Exception:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+
+def _infer_batch(pa, batch: List[Dict[str, Any]]):
+    """Convert rows to a record batch with every column any of them has, in order of appearance."""
+    names = list(dict.fromkeys(name for row in batch for name in row))
+    return pa.RecordBatch.from_pydict({name: [row.get(name) for row in batch] for name in names})
+
+
+def _widen_nulls(pa, schema, batch: List[Dict[str, Any]]):
+    """Give columns that only held NULLs so far the type of their values in a batch."""
+    inferred = _infer_batch(pa, batch).schema
+    return pa.schema([
+        inferred.field(field.name) if pa.types.is_null(field.type) and field.name in inferred.names else field
+        for field in schema
+    ])
+
+
+def _open_writer(pa, path: str, temp_path: str, schema):
+    """Open a writer for the format of a snapshot path."""
+    if path.lower().endswith('.parquet'):
+        return pa.parquet.ParquetWriter(temp_path, schema)
+    return pa.ipc.new_file(temp_path, schema)
+
+
+def _rewrite_snapshot(pa, path: str, temp_path: str, schema):
+    """Copy the batches written so far into a new temporary snapshot with a wider schema."""
+    previous_path = f'{temp_path}.previous'
+    os.replace(temp_path, previous_path)
+    try:
+        writer = _open_writer(pa, path, temp_path, schema)
+        if path.lower().endswith('.parquet'):
+            parquet_file = pa.parquet.ParquetFile(previous_path)
+            try:
+                for batch in parquet_file.iter_batches():
+                    writer.write_table(pa.Table.from_batches([batch]).cast(schema))
+            finally:
+                parquet_file.close()
+        else:
+            with pa.memory_map(previous_path, 'r') as source:
+                reader = pa.ipc.open_file(source)
+                for index in range(reader.num_record_batches):
+                    writer.write_table(pa.Table.from_batches([reader.get_batch(index)]).cast(schema))
+    finally:
+        os.remove(previous_path)
+    return writer
@@ -0,0 +1,523 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, List, NamedTuple, Optional, Tuple
+
+# Token types whose value varies between executions of the same statement
+LITERAL_TOKEN_TYPES = ('string', 'number', 'parameter')
+# Keywords that start a statement following a WITH clause
+STATEMENT_KEYWORDS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE', 'VALUES')
+
+# Whitespace matches none of the alternatives, so finditer skips it
+# without building a token for it
+_TOKEN_PATTERN = re.compile(r'''
+    (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<string>
+        [NnEeBbXx]?'(?:[^'\\]|\\.|'')*'         # backslash or doubled quote escapes
+      | [NnEeBbXx]?'(?:[^']|'')*'               # standard strings ending in a backslash
+      | \$(?P<tag>(?:[^\W\d]\w*)?)\$.*?\$(?P=tag)\$ # PostgreSQL dollar quoting
+    )
+  | (?P<quoted_identifier>"(?:[^"]|"")*"|`(?:[^`]|``)*`)
+  | (?P<unterminated>['"`].*)
+  | (?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+  | (?P<parameter>[:@][^\W\d]\w*|\?|%s|%\([^)]*\)s|\$\d+)
+  | (?P<word>[^\W\d]\w*)
+  | (?P<operator>::|<>|!=|<=|>=|\|\||[-+*/%=<>!~^&|])
+  | (?P<punctuation>[(),;.\[\]{}])
+  | (?P<other>\S)
+''', re.VERBOSE | re.DOTALL)
+# A query starting with a plain word; a single letter followed by a quote
+# is a string prefix such as N'...' instead
+_LEADING_WORD = re.compile(r"\s*([^\W\d]\w*)\b(?!')")
+# Characters every parameter marker starts with
+_PARAMETER_CHARS = frozenset(':@?%$')
+# Text that can change how a single quote is read; without any of it,
+# quotes pair up and a query is unterminated exactly when their count is odd
+_QUOTING_HAZARDS = ('"', '`', '\\', '$', '--', '/*')
+# The alternatives of _TOKEN_PATTERN left in a query free of quoting
+# hazards, without groups so that findall returns the token values
+_PLAIN_TOKEN_PATTERN = re.compile(r'''
+    [NnEeBbXx]?'(?:[^']|'')*'
+  | (?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?
+  | [:@][^\W\d]\w*|\?|%s|%\([^)]*\)s
+  | [^\W\d]\w*
+  | ::|<>|!=|<=|>=|\|\|
+  | \S
+''', re.VERBOSE)
+# First characters of the numbers and parameter markers it matches, and
+# the operators and punctuation starting with one of them
+_PLAIN_LITERAL_STARTS = frozenset('0123456789.:@%?')
+_PLAIN_OPERATORS = frozenset(('.', ':', '::', '@', '%'))
+# A list of literals in a fingerprint, as _collapse_value_list collapses it
+_PLAIN_VALUE_LIST = re.compile(r'\( \?(?: , \?)*(?: ,)? \)')
+
+
+class Token(NamedTuple):
+    type: str
+    value: str
+    start: int
+
+
+_new_tuple = tuple.__new__
+
+
+class QueryInfo(NamedTuple):
+    # Tokens that are neither whitespace nor comments
+    significant: Tuple[Token, ...]
+    # Uppercased value of each significant token that is a word, '' otherwise
+    keywords: Tuple[str, ...]
+    # Type of the statement, looking past leading comments and WITH clauses
+    statement_type: Optional[str]
+    # Whether a string or quoted identifier is never closed
+    unterminated: bool
+
+
+def tokenize(query: str) -> Tuple[Token, ...]:
+    """
+    Split a SQL query into tokens, skipping whitespace.
+
+    Strings may escape quotes by doubling them or with a backslash, and
+    PostgreSQL dollar-quoted strings are recognised. A string or quoted
+    identifier that is never closed becomes a single ``unterminated`` token
+    running to the end of the query.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        Tuple[Token, ...]: Comments and significant tokens, in order
+    """
+    return tuple([_new_tuple(Token, (match.lastgroup, match.group(), match.start()))
+                  for match in _TOKEN_PATTERN.finditer(query)])
+
+
+@lru_cache(maxsize=4096)
+def analyze(query: str) -> QueryInfo:
+    """
+    Tokenize a query and derive the facts shared by validation and security checks.
+
+    Results are cached by query text, so repeated checks of the same query
+    tokenize it only once. Checks that can often be answered from the raw
+    text, such as ``find_keywords`` and ``has_parameters``, try that first.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        QueryInfo: Tokens, keywords and statement type of the query
+    """
+    # Building the named tuples directly skips a Python-level __new__ per token
+    significant = tuple([
+        _new_tuple(Token, (match.lastgroup, match.group(), match.start()))
+        for match in _TOKEN_PATTERN.finditer(query) if match.lastgroup != 'comment'
+    ])
+    keywords = tuple([token.value.upper() if token.type == 'word' else '' for token in significant])
+    return QueryInfo(
+        significant=significant,
+        keywords=keywords,
+        statement_type=_statement_type(significant, keywords),
+        unterminated=bool(significant) and significant[-1].type == 'unterminated'
+    )
+
+
+def _statement_type(significant: Tuple[Token, ...], keywords: Tuple[str, ...]) -> Optional[str]:
+    """Find the keyword that starts the statement, skipping parentheses and CTEs."""
+    index = 0
+    while index < len(significant) and significant[index].value == '(':
+        index += 1
+    if index == len(significant) or not keywords[index]:
+        return None
+    if keywords[index] != 'WITH':
+        return keywords[index]
+
+    # CTE bodies are parenthesized, so the statement is the first statement
+    # keyword back at the outermost level
+    depth = 0
+    for token, keyword in zip(significant[index + 1:], keywords[index + 1:]):
+        if token.value == '(':
+            depth += 1
+        elif token.value == ')':
+            depth -= 1
+        elif depth == 0 and keyword in STATEMENT_KEYWORDS:
+            return keyword
+    return None
+
+
+def statement_type(query: str) -> Optional[str]:
+    """
+    Get the type of a query, e.g. 'SELECT' for ``WITH t AS (...) SELECT ...``.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        Optional[str]: Uppercased leading keyword, or None if there is none
+    """
+    match = _LEADING_WORD.match(query)
+    if match and match.group(1).upper() != 'WITH':
+        return match.group(1).upper()
+    return analyze(query).statement_type
+
+
+def is_unterminated(query: str) -> bool:
+    """
+    Check whether a string or quoted identifier in a query is never closed.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        bool: True if the query ends inside a string or quoted identifier
+    """
+    if any(hazard in query for hazard in _QUOTING_HAZARDS):
+        return analyze(query).unterminated
+    return query.count("'") % 2 == 1
+
+
+def has_parameters(query: str) -> bool:
+    """
+    Check whether a query has bind parameter markers outside literals and comments.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        bool: True for named (:name, @name), positional (?, $1) and
+            Python-style (%s) markers
+    """
+    if _PARAMETER_CHARS.isdisjoint(query):
+        return False
+    return any(token.type == 'parameter' for token in analyze(query).significant)
+
+
+def find_keywords(query: str, sequence: str) -> bool:
+    """
+    Check whether a keyword sequence such as ``'DELETE FROM'`` occurs in a query.
+
+    Only words outside string literals, quoted identifiers and comments are
+    matched, and each word has to match a whole token.
+
+    Args:
+        query (str): The SQL query
+        sequence (str): Space separated keywords
+
+    Returns:
+        bool: True if the keywords occur as consecutive tokens
+    """
+    words = sequence.upper().split()
+    # Every keyword is part of the query text, so most queries are ruled out without tokenizing
+    if words[0] not in query.upper():
+        return False
+    if _is_plain(query):
+        # Only word tokens can equal a keyword, so the other values need no type
+        keywords = tuple([value.upper() for value in _PLAIN_TOKEN_PATTERN.findall(query)])
+    else:
+        keywords = analyze(query).keywords
+    if len(words) == 1:
+        return words[0] in keywords
+    last_start = len(keywords) - len(words)
+    return any(
+        keywords[start:start + len(words)] == tuple(words)
+        for start in range(last_start + 1)
+        if keywords[start] == words[0]
+    )
+
+
+def fingerprint(query: str) -> str:
+    """
+    Normalize a query to the shape shared by all its executions.
+
+    Comments are dropped, literals and parameters are replaced by ``?``,
+    lists of them are collapsed, and words are lowercased.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        str: The normalized query
+    """
+    if _is_plain(query):
+        return _fingerprint_plain(query)
+    # Log scans fingerprint mostly distinct statements, so the matches are
+    # consumed directly instead of going through the cached token tuples
+    parts: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(query):
+        kind = match.lastgroup
+        if kind == 'comment':
+            continue
+        if kind in LITERAL_TOKEN_TYPES:
+            parts.append('?')
+        elif kind == 'word':
+            parts.append(match.group().lower())
+        else:
+            value = match.group()
+            parts.append(value)
+            if value == ')':
+                _collapse_value_list(parts)
+    while parts and parts[-1] == ';':
+        parts.pop()
+    return ' '.join(parts)
+
+
+def _is_plain(query: str) -> bool:
+    """Check whether a query is ASCII, free of quoting hazards and has paired single quotes."""
+    return query.isascii() and not any(hazard in query for hazard in _QUOTING_HAZARDS) and not query.count("'") % 2
+
+
+def _fingerprint_plain(query: str) -> str:
+    """
+    Fingerprint an ASCII query free of quoting hazards, see ``fingerprint``.
+
+    With every single quote paired and no comments, quoted identifiers,
+    dollar quoting or backslashes, whether a token is a literal follows
+    from its first and last characters, and value lists can be collapsed
+    in the joined text.
+    """
+    parts = ['?' if value[-1] == "'" or (value[0] in _PLAIN_LITERAL_STARTS and value not in _PLAIN_OPERATORS)
+             else value.lower()
+             for value in _PLAIN_TOKEN_PATTERN.findall(query)]
+    while parts and parts[-1] == ';':
+        parts.pop()
+    return _PLAIN_VALUE_LIST.sub('(?+)', ' '.join(parts))
+
+
+def _collapse_value_list(parts: List[str]):
+    """Collapse a ``( ?, ?, ... )`` list just closed by the last part into ``(?+)``."""
+    index = len(parts) - 2
+    while index > 0 and parts[index] in ('?', ',') and parts[index] != parts[index + 1]:
+        index -= 1
+    if parts[index] == '(' and parts[index + 1] == '?' and index < len(parts) - 2:
+        del parts[index:]
+        parts.append('(?+)')
+
+
+@lru_cache(maxsize=256)
+def _values_row(query: str) -> Optional[Tuple[str, str, Tuple[int, ...], Tuple[str, ...]]]:
+    """
+    Split a single-row ``INSERT ... VALUES (...)`` statement at its row.
+
+    Returns the text before the row, the row's text with its parentheses,
+    the offset in the row just after each parameter, and the distinct
+    parameter names; or None unless the row is the last clause of the only
+    statement and every parameter is a ``:name`` marker inside it.
+    """
+    info = analyze(query)
+    if info.statement_type != 'INSERT' or info.unterminated:
+        return None
+    significant, keywords = info.significant, info.keywords
+    end = len(significant)
+    while end and significant[end - 1].value == ';':
+        end -= 1
+    if end < 2 or significant[end - 1].value != ')':
+        return None
+
+    # Walk back to the parenthesis opening the last row
+    depth = 0
+    index = end - 1
+    while index >= 0:
+        if significant[index].value == ')':
+            depth += 1
+        elif significant[index].value == '(':
+            depth -= 1
+            if depth == 0:
+                break
+        index -= 1
+    if index < 1 or keywords[index - 1] != 'VALUES':
+        return None
+    for position, token in enumerate(significant[:end]):
+        if token.value == ';':
+            return None
+        if token.type == 'parameter' and (position < index or not token.value.startswith(':')):
+            return None
+
+    start = significant[index].start
+    parameters = [token for token in significant[index:end] if token.type == 'parameter']
+    return (
+        query[:start],
+        query[start:significant[end - 1].start + 1],
+        tuple(token.start + len(token.value) - start for token in parameters),
+        tuple(dict.fromkeys(token.value[1:] for token in parameters))
+    )
+
+
+def values_parameters(query: str) -> Optional[Tuple[str, ...]]:
+    """
+    Get the parameter names of a single-row ``INSERT ... VALUES (:a, :b)`` statement.
+
+    Args:
+        query (str): The SQL statement
+
+    Returns:
+        Optional[Tuple[str, ...]]: Distinct parameter names in order, or
+            None if the statement cannot be expanded by ``multirow_insert``
+    """
+    split = _values_row(query)
+    return split[3] if split else None
+
+
+@lru_cache(maxsize=256)
+def multirow_insert(query: str, rows: int) -> Optional[str]:
+    """
+    Expand a single-row ``INSERT ... VALUES (:a, :b)`` into one inserting several rows.
+
+    The parameters of row ``i`` are renamed ``:a__i``, ``:b__i`` and so on,
+    so one execution with the merged parameters replaces ``rows``
+    executions of the original statement.
+
+    Args:
+        query (str): The SQL statement
+        rows (int): Number of rows to insert
+
+    Returns:
+        Optional[str]: The multi-row statement, or None if the statement
+            is not a single-row INSERT ... VALUES with ``:name`` parameters
+    """
+    split = _values_row(query)
+    if split is None:
+        return None
+    prefix, row, ends, _ = split
+    pieces = [row[start:end] for start, end in zip((0,) + ends, ends + (len(row),))]
+    return prefix + ', '.join(
+        ''.join(piece + f'__{index}' for piece in pieces[:-1]) + pieces[-1]
+        for index in range(rows)
+    )
+
+
+class TableAccess(NamedTuple):
+    # Tables the query reads from
+    read: FrozenSet[str]
+    # Tables the query inserts into, updates, deletes from or changes the schema of
+    written: FrozenSet[str]
+    # Whether the query may change data in ways the written tables do not capture
+    unknown_writes: bool
+
+
+# Statements that change the table named after them
+_WRITE_KEYWORDS = ('INSERT', 'UPDATE', 'DELETE', 'MERGE', 'TRUNCATE', 'DROP', 'ALTER', 'CREATE', 'REPLACE')
+# Statements known not to write anything
+_READ_ONLY_KEYWORDS = ('SELECT', 'VALUES', 'EXPLAIN', 'SHOW', 'DESCRIBE', 'PRAGMA')
+# Words that can follow a table name without being its alias
+_CLAUSE_KEYWORDS = frozenset((
+    'WHERE', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'OFFSET', 'UNION', 'INTERSECT', 'EXCEPT',
+    'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'OUTER', 'CROSS', 'NATURAL', 'ON', 'USING',
+    'SET', 'VALUES', 'SELECT', 'RETURNING', 'WINDOW', 'FOR', 'DEFAULT', 'AS'
+))
+
+
+@lru_cache(maxsize=4096)
+def table_access(query: str) -> TableAccess:
+    """
+    Find the tables a query reads and writes.
+
+    Table names are lowercased, unquoted and stripped of any schema
+    prefix. Names defined by WITH clauses are not reported as tables.
+    Statements whose effects cannot be attributed to tables, such as
+    procedure calls, are reported with ``unknown_writes``.
+
+    Args:
+        query (str): The SQL query
+
+    Returns:
+        TableAccess: Tables read and written by the query
+    """
+    info = analyze(query)
+    significant, keywords = info.significant, info.keywords
+    read, written, ctes = set(), set(), set()
+    unknown_writes = False
+
+    statement_keyword = None
+    statement_writes = 0
+    for index, keyword in enumerate(keywords + (';',)):
+        if index == len(keywords) or significant[index].value == ';':
+            # A write whose target was not found, e.g. DROP VIEW, may affect anything
+            if statement_keyword in _WRITE_KEYWORDS and len(written) == statement_writes:
+                unknown_writes = True
+            statement_keyword = None
+            statement_writes = len(written)
+            continue
+        if statement_keyword is None:
+            # Parenthesized queries such as (SELECT ...) UNION (SELECT ...)
+            if significant[index].value == '(':
+                continue
+            statement_keyword = keyword
+            if keyword not in _READ_ONLY_KEYWORDS + _WRITE_KEYWORDS + ('WITH',):
+                unknown_writes = True
+
+        if keyword == 'AS' and _next_value(significant, index + 1) == '(':
+            name = _table_name(significant, keywords, index - 1, backwards=True)
+            if name:
+                ctes.add(name)
+        elif keyword in ('FROM', 'JOIN'):
+            target = written if keyword == 'FROM' and _previous_keyword(keywords, index) == 'DELETE' else read
+            position = index + 1
+            while True:
+                name = _table_name(significant, keywords, position)
+                if not name:
+                    break
+                target.add(name)
+                position = _skip_alias(significant, keywords, position + 1)
+                if keyword != 'FROM' or _next_value(significant, position) != ',':
+                    break
+                position += 1
+        elif keyword in ('INTO', 'UPDATE', 'TABLE', 'TRUNCATE'):
+            name = _table_name(significant, keywords, index + 1, column_list=True)
+            if name and (keyword != 'TABLE' or _previous_keyword(keywords, index) in _WRITE_KEYWORDS):
+                written.add(name)
+
+    return TableAccess(
+        read=frozenset(read - ctes),
+        written=frozenset(written - ctes),
+        unknown_writes=unknown_writes
+    )
+
+
+def _next_value(significant: Tuple[Token, ...], index: int) -> Optional[str]:
+    return significant[index].value if index < len(significant) else None
+
+
+def _previous_keyword(keywords: Tuple[str, ...], index: int) -> str:
+    return keywords[index - 1] if index > 0 else ''
+
+
+def _table_name(significant: Tuple[Token, ...], keywords: Tuple[str, ...], index: int,
+                backwards: bool = False, column_list: bool = False) -> Optional[str]:
+    """
+    Read a possibly schema-qualified table name starting (or, backwards, ending) at index.
+
+    Unless ``column_list`` is set, a name followed by parentheses is taken
+    to be a function call rather than a table.
+    """
+    if not backwards:
+        # Skip modifiers such as IF [NOT] EXISTS, ONLY and LATERAL
+        while index < len(keywords) and keywords[index] in ('IF', 'NOT', 'EXISTS', 'ONLY', 'LATERAL', 'TABLE'):
+            index += 1
+        # Follow schema qualifiers to the last name
+        while (index + 2 < len(significant) and significant[index + 1].value == '.'
+               and significant[index + 2].type in ('word', 'quoted_identifier')):
+            index += 2
+    elif index >= 0 and significant[index].value == ')':
+        # A CTE with a column list: name (a, b) AS (...)
+        while index >= 0 and significant[index].value != '(':
+            index -= 1
+        index -= 1
+    if index < 0 or index >= len(significant):
+        return None
+    token = significant[index]
+    if token.type == 'quoted_identifier':
+        return token.value[1:-1].lower()
+    if token.type != 'word' or keywords[index] in _CLAUSE_KEYWORDS:
+        return None
+    if not backwards and not column_list and _next_value(significant, index + 1) == '(':
+        return None
+    return token.value.lower()
+
+
+def _skip_alias(significant: Tuple[Token, ...], keywords: Tuple[str, ...], index: int) -> int:
+    """Skip schema qualifiers and an optional alias after a table name."""
+    while index + 1 < len(significant) and significant[index].value == '.':
+        index += 2
+    if index < len(keywords) and keywords[index] == 'AS':
+        index += 1
+    if index < len(significant) and significant[index].type in ('word', 'quoted_identifier') \
+            and keywords[index] not in _CLAUSE_KEYWORDS:
+        index += 1
+    return index
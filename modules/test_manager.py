@@ -1,72 +1,770 @@
+import asyncio
 import os
-import yaml
-import json
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from contextlib import closing
 from datetime import datetime
-from typing import List, Dict, Any
-from .query_executor import QueryExecutor
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Tuple
+from sqlalchemy.engine import Connection
+from .baseline import BaselineStore
+from .benchmark import summarize_latencies
+from .comparator import ResultComparator
+from .differential import normalize_output, summarize_divergences
+from .impact import ImpactAnalyzer
+from .query_executor import QueryExecutor, QueryTimeoutError
+from .query_plan import describe_plan_change
+from .selection import TestSelection, estimate_durations
+from .snapshots import is_snapshot_path, read_snapshot, write_snapshot
+
+# Result statuses counted towards ``max_failures``
+FAILED_STATUSES = ('FAIL', 'ERROR', 'TIMEOUT', 'DIVERGED')
+
+# Query executor owned by a worker process of a multiprocess test run
+_worker_executor: Optional[QueryExecutor] = None
+
+
+def _yaml_module():
+    """Import PyYAML on first use, so worker processes that never read test files skip it."""
+    import yaml
+    return yaml
+
+
+def _init_worker_process(database_uri: str, batch_size: int, timeout: Optional[float]):
+    """Open a dedicated query executor in a new worker process."""
+    global _worker_executor
+    _worker_executor = QueryExecutor(database_uri, batch_size=batch_size, timeout=timeout)
+
+
+def _run_in_worker_process(test_manager: 'TestManager', options: Dict[str, Any],
+                           test_case: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a test case in a worker process using its own executor."""
+    return test_manager._run_test_case(_worker_executor, test_case, options=options)
+
 
 class TestManager:
-    def __init__(self, test_cases_dir: str):
+    # Bump when the layout of the persisted test case cache changes
+    CACHE_VERSION = 2
+
+    def __init__(self, test_cases_dir: str, cache_file: Optional[str] = None,
+                 baseline_store: Optional[BaselineStore] = None):
         self.test_cases_dir = test_cases_dir
+        self.cache_file = cache_file
+        self.baseline_store = baseline_store
         if not os.path.exists(test_cases_dir):
             os.makedirs(test_cases_dir)
+        
+        # Parsed test cases per file path, tagged with the file's mtime and size
+        self._case_cache: Dict[str, Tuple[int, int, List[Dict[str, Any]]]] = {}
+        self._cache_lock = threading.Lock()
+        if cache_file:
+            self._case_cache = self._read_cache_file()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Worker processes only run test cases, so leave the cache behind
+        state = self.__dict__.copy()
+        state['_case_cache'] = {}
+        del state['_cache_lock']
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
 
     def load_test_cases(self) -> List[Dict[str, Any]]:
         """
         Load all test cases from YAML files in the test cases directory.
         
+        Files are read in name order, so every machine loads the same suite
+        in the same order. Parsed files are cached by path, modification time and size, so only
+        new or changed files are parsed again. The cache is also written to
+        ``cache_file`` when one is configured.
+        
         Returns:
             List[Dict[str, Any]]: List of test cases
         """
         test_cases = []
-        for filename in os.listdir(self.test_cases_dir):
-            if filename.endswith('.yaml') or filename.endswith('.yml'):
-                file_path = os.path.join(self.test_cases_dir, filename)
-                with open(file_path, 'r') as f:
-                    test_cases.extend(yaml.safe_load(f)['test_cases'])
+        with self._cache_lock:
+            cache = {}
+            changed = False
+            for filename in sorted(os.listdir(self.test_cases_dir)):
+                if filename.endswith('.yaml') or filename.endswith('.yml'):
+                    file_path = os.path.join(self.test_cases_dir, filename)
+                    stat = os.stat(file_path)
+                    entry = self._case_cache.get(file_path)
+                    if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+                        entry = (stat.st_mtime_ns, stat.st_size, self._parse_test_file(file_path))
+                        changed = True
+                    cache[file_path] = entry
+                    test_cases.extend(entry[2])
+            
+            changed = changed or len(cache) != len(self._case_cache)
+            self._case_cache = cache
+            if changed and self.cache_file:
+                self._write_cache_file()
+        return test_cases
+
+    def _parse_test_file(self, file_path: str) -> List[Dict[str, Any]]:
+        """
+        Parse and validate the test cases in a YAML file.
+        
+        Args:
+            file_path (str): Path to the YAML file
+            
+        Returns:
+            List[Dict[str, Any]]: Test cases defined in the file
+        """
+        yaml = _yaml_module()
+        with open(file_path, 'r') as f:
+            # Use libyaml's C loader when PyYAML was built with it
+            data = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+        
+        # Files written by save_test_case hold a bare list of test cases
+        test_cases = data.get('test_cases') if isinstance(data, dict) else data
+        if not isinstance(test_cases, list):
+            raise ValueError(f"Invalid test case file {file_path}: expected a list of test cases")
+        
+        for index, test_case in enumerate(test_cases):
+            if not isinstance(test_case, dict):
+                raise ValueError(f"Invalid test case #{index + 1} in {file_path}: expected a mapping")
+            missing = [key for key in ('name', 'query') if key not in test_case]
+            if 'expected_output' not in test_case and 'expected_snapshot' not in test_case:
+                missing.append('expected_output')
+            if missing:
+                raise ValueError(
+                    f"Invalid test case #{index + 1} in {file_path}: missing {', '.join(missing)}"
+                )
+            if 'expected_snapshot' in test_case:
+                self._resolve_snapshot(test_case, index, file_path)
+            tags = test_case.get('tags', [])
+            if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+                raise ValueError(f"Invalid test case #{index + 1} in {file_path}: tags must be a list of strings")
+            if not isinstance(test_case.get('params', {}), dict):
+                raise ValueError(f"Invalid test case #{index + 1} in {file_path}: params must be a mapping")
+            param_sets = test_case.get('param_sets', [])
+            if not isinstance(param_sets, list) or not all(isinstance(params, dict) for params in param_sets):
+                raise ValueError(
+                    f"Invalid test case #{index + 1} in {file_path}: param_sets must be a list of mappings"
+                )
+            test_case['source_file'] = os.path.basename(file_path)
         return test_cases
 
-    def run_tests(self, query_executor: QueryExecutor) -> List[Dict[str, Any]]:
+    def _resolve_snapshot(self, test_case: Dict[str, Any], index: int, file_path: str):
+        """Validate a test case's ``expected_snapshot`` and make it relative to the working directory."""
+        snapshot = test_case['expected_snapshot']
+        if not isinstance(snapshot, str) or not is_snapshot_path(snapshot):
+            raise ValueError(
+                f"Invalid test case #{index + 1} in {file_path}: expected_snapshot must be an .arrow or .parquet file"
+            )
+        if 'expected_output' in test_case or 'param_sets' in test_case:
+            raise ValueError(
+                f"Invalid test case #{index + 1} in {file_path}: "
+                f"expected_snapshot cannot be combined with expected_output or param_sets"
+            )
+        # Snapshot paths in a test file are relative to that file
+        test_case['expected_snapshot'] = os.path.normpath(os.path.join(os.path.dirname(file_path), snapshot))
+
+    def _read_cache_file(self) -> Dict[str, Tuple[int, int, List[Dict[str, Any]]]]:
+        """Load the persisted test case cache, ignoring stale or unreadable files."""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                version, cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return {}
+        return cache if version == self.CACHE_VERSION else {}
+
+    def _write_cache_file(self):
+        """Persist the test case cache atomically."""
+        temp_path = f'{self.cache_file}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump((self.CACHE_VERSION, self._case_cache), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.cache_file)
+
+    def run_tests(self, query_executor: QueryExecutor, workers: int = 1,
+                  worker_mode: str = 'thread', isolated: bool = False,
+                  capture_plans: bool = False,
+                  on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  update_snapshots: bool = False,
+                  selection: Optional[TestSelection] = None,
+                  max_failures: Optional[int] = None,
+                  impact: Optional[ImpactAnalyzer] = None) -> List[Dict[str, Any]]:
         """
         Run all test cases using the provided query executor.
         
+        With more than one worker, consecutive read-only cases are spread over
+        a pool of threads or processes, each with its own connection. Mutating
+        cases act as barriers and run one at a time, so every case sees the
+        same database state as in a serial run. Results are always returned in test case order.
+        
+        Isolated cases run inside a transaction that is rolled back when the
+        case finishes, so they never change the database and need no barrier.
+        A test case can override the run-wide setting with its own
+        ``isolated`` key.
+        
+        With ``capture_plans``, the plan of every SELECT is captured and its
+        fingerprint added to the result. If a baseline store is configured,
+        plans that differ from the previously recorded plan are flagged with
+        ``plan_changed`` even when the output still matches.
+        
+        Test cases with an ``expected_snapshot`` compare their rows with an
+        external Arrow IPC or Parquet file, read lazily while the actual rows
+        stream in. With ``update_snapshots``, those files are rewritten from
+        the actual rows instead and the cases pass.
+        
+        ``selection`` limits the run to cases matching names, tags or files,
+        or to one shard of the suite. Shards and parallel batches are
+        scheduled longest first from the timings recorded in the baseline
+        store, so shards and workers finish at about the same time. Results
+        are still reported in test case order.
+        
+        ``on_result`` is called with each result, in test case order, as soon
+        as it and all results before it are complete. Once ``cancel`` is set,
+        no further test cases are started and the results so far are
+        returned; in process mode, a batch of read-only cases that already
+        started runs to completion. ``max_failures`` stops the run the same
+        way once that many cases have failed, errored or timed out.
+        
+        With an ``impact`` analyzer, only the cases affected by changed
+        tables or changed test definitions since their last green run are
+        executed; the other cases report their recorded result, marked
+        ``cached``. A green run is recorded for the next incremental run.
+        Snapshot updates always run every case.
+        
         Args:
             query_executor (QueryExecutor): The query executor to use
+            workers (int): Number of parallel workers (1 runs serially)
+            worker_mode (str): Worker pool type ('thread' or 'process')
+            isolated (bool): Roll back each test case after it runs
+            capture_plans (bool): Capture query plans and detect plan changes
+            on_result (Optional[Callable]): Called with each completed result
+            cancel (Optional[threading.Event]): Stops the run when set
+            update_snapshots (bool): Record snapshots from the actual rows
+            selection (Optional[TestSelection]): Test cases to run
+            max_failures (Optional[int]): Stop after this many failed cases
+            impact (Optional[ImpactAnalyzer]): Skip cases unaffected by changes
             
         Returns:
             List[Dict[str, Any]]: Test results
         """
+        timings = self._recorded_timings() if (selection and selection.shard) or workers > 1 else {}
+        test_cases = self.select_test_cases(selection, timings)
+        options = {'isolated': isolated, 'capture_plans': capture_plans, 'update_snapshots': update_snapshots}
+        hooks = {'on_result': on_result, 'cancel': cancel, 'max_failures': max_failures, 'failures': 0}
+        plan = impact.plan(test_cases, query_executor, isolated) if impact and not update_snapshots else None
+        # Cases left out by the plan report their recorded result instead of running
+        cases_to_run = test_cases if plan is None else [
+            dict(test_case, cached_result=plan.cached[position]) if position in plan.cached else test_case
+            for position, test_case in enumerate(test_cases)
+        ]
+        if workers > 1 and timings:
+            hooks['durations'] = [0.0 if 'cached_result' in test_case else duration for test_case, duration
+                                  in zip(cases_to_run, estimate_durations(test_cases, timings))]
+        if workers <= 1:
+            results = []
+            for test_case in cases_to_run:
+                if self._is_cancelled(hooks):
+                    break
+                self._collect(results, [self._run_test_case(query_executor, test_case, options=options)], hooks)
+        elif worker_mode == 'thread':
+            results = self._run_tests_threaded(query_executor, cases_to_run, workers, options, hooks)
+        elif worker_mode == 'process':
+            results = self._run_tests_multiprocess(query_executor, cases_to_run, workers, options, hooks)
+        else:
+            raise ValueError(f"Unsupported worker mode: {worker_mode}")
+        
+        if plan is not None:
+            impact.record(plan, test_cases, results, query_executor, isolated)
+        return results
+
+    def select_test_cases(self, selection: Optional[TestSelection] = None,
+                          timings: Optional[Dict[Tuple[str, str], float]] = None) -> List[Dict[str, Any]]:
+        """
+        Load the test cases chosen by a selection.
+        
+        Args:
+            selection (Optional[TestSelection]): Filters and shard; None selects all
+            timings (Optional[Dict[Tuple[str, str], float]]): Recorded
+                durations for balancing shards, read from the baseline store
+                if not given
+            
+        Returns:
+            List[Dict[str, Any]]: Selected test cases in suite order
+        """
         test_cases = self.load_test_cases()
+        if not selection:
+            return test_cases
+        if timings is None and selection.shard:
+            timings = self._recorded_timings()
+        return selection.apply(test_cases, timings)
+
+    def _recorded_timings(self) -> Dict[Tuple[str, str], float]:
+        """Median recent duration of each test case, used to schedule long cases first."""
+        return self.baseline_store.median_timings() if self.baseline_store else {}
+
+    def _is_cancelled(self, hooks: Dict[str, Any]) -> bool:
+        """Check whether the run was cancelled or hit its failure limit."""
+        if hooks.get('max_failures') and hooks['failures'] >= hooks['max_failures']:
+            return True
+        return hooks.get('cancel') is not None and hooks['cancel'].is_set()
+
+    def _collect(self, results: List[Dict[str, Any]], new_results: Iterable[Optional[Dict[str, Any]]],
+                 hooks: Dict[str, Any]):
+        """Append completed results and report each of them, skipping cases left out after cancellation."""
+        for result in new_results:
+            if result is None:
+                continue
+            results.append(result)
+            if result['status'] in FAILED_STATUSES:
+                hooks['failures'] = hooks.get('failures', 0) + 1
+            if hooks.get('on_result'):
+                hooks['on_result'](result)
+
+    def _run_tests_threaded(self, query_executor: QueryExecutor,
+                            test_cases: List[Dict[str, Any]], workers: int,
+                            options: Dict[str, Any], hooks: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run test cases on a thread pool with one connection per worker thread."""
+        local = threading.local()
+        connections = []
+        lock = threading.Lock()
+        
+        def run(test_case: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            if self._is_cancelled(hooks):
+                return None
+            connection = getattr(local, 'connection', None)
+            if connection is None:
+                connection = local.connection = query_executor.connect()
+                with lock:
+                    connections.append(connection)
+            return self._run_test_case(query_executor, test_case, connection, options)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                return self._run_batches(query_executor, test_cases, options,
+                                         lambda batch: pool.map(run, batch), hooks)
+        finally:
+            for connection in connections:
+                connection.close()
+
+    def _run_tests_multiprocess(self, query_executor: QueryExecutor,
+                                test_cases: List[Dict[str, Any]], workers: int,
+                                options: Dict[str, Any], hooks: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Run test cases on a process pool with one executor per worker process."""
+        run = partial(_run_in_worker_process, self, options)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker_process,
+                                 initargs=(query_executor.database_uri, query_executor.batch_size,
+                                           query_executor.timeout)) as pool:
+            return self._run_batches(query_executor, test_cases, options,
+                                     lambda batch: pool.map(run, batch), hooks)
+
+    def _run_batches(self, query_executor: QueryExecutor, test_cases: List[Dict[str, Any]], options: Dict[str, Any],
+                     run_batch: Callable[[List[Dict[str, Any]]], Iterable[Optional[Dict[str, Any]]]],
+                     hooks: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Split test cases into read-only batches separated by mutating cases.
+        
+        Args:
+            query_executor (QueryExecutor): Executor used for mutating cases
+            test_cases (List[Dict[str, Any]]): Test cases in suite order
+            options (Dict[str, Any]): Run-wide options
+            run_batch (Callable): Runs a batch of read-only cases in parallel,
+                yielding results in batch order (None for skipped cases)
+            hooks (Dict[str, Any]): ``on_result`` callback, ``cancel`` event,
+                failure limit and estimated ``durations``
+            
+        Returns:
+            List[Dict[str, Any]]: Test results in test case order
+        """
         results = []
+        batch = []
+        for position, test_case in enumerate(test_cases):
+            if (self._is_isolated(test_case, options)
+                    or not self._is_mutating(query_executor, test_case)):
+                batch.append(position)
+                continue
+            if batch and not self._is_cancelled(hooks):
+                self._collect(results, self._run_batch(test_cases, batch, run_batch, hooks), hooks)
+            batch = []
+            if self._is_cancelled(hooks):
+                return results
+            self._collect(results, [self._run_test_case(query_executor, test_case, options=options)], hooks)
+        if batch and not self._is_cancelled(hooks):
+            self._collect(results, self._run_batch(test_cases, batch, run_batch, hooks), hooks)
+        return results
+
+    def _run_batch(self, test_cases: List[Dict[str, Any]], positions: List[int],
+                   run_batch: Callable[[List[Dict[str, Any]]], Iterable[Optional[Dict[str, Any]]]],
+                   hooks: Dict[str, Any]) -> Iterator[Optional[Dict[str, Any]]]:
+        """Run a read-only batch with its longest cases started first, yielding results in suite order."""
+        durations = hooks.get('durations')
+        order = sorted(positions, key=lambda position: -durations[position]) if durations else positions
+        pending: Dict[int, Optional[Dict[str, Any]]] = {}
+        remaining = iter(positions)
+        expected = next(remaining, None)
+        for position, result in zip(order, run_batch([test_cases[position] for position in order])):
+            pending[position] = result
+            while expected in pending:
+                yield pending.pop(expected)
+                expected = next(remaining, None)
+
+    def run_differential(self, executors: Dict[str, QueryExecutor], isolated: bool = False,
+                         relative_tolerance: float = 0.0,
+                         on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+                         cancel: Optional[threading.Event] = None) -> List[Dict[str, Any]]:
+        """
+        Run every test case against several databases and report where they disagree.
         
-        for test_case in test_cases:
-            result = {
-                'name': test_case['name'],
-                'query': test_case['query'],
-                'status': 'PENDING',
-                'error': None,
-                'execution_time': 0
-            }
-            
-            try:
-                # Execute the query
-                actual_output = query_executor.execute(test_case['query'])
-                
-                # Compare with expected output using robust comparison
-                if self._compare_outputs(actual_output, test_case['expected_output']):
-                    result['status'] = 'PASS'
-                else:
-                    result['status'] = 'FAIL'
-                    result['error'] = f'Expected {test_case["expected_output"]}, got {actual_output}'
-                
-            except Exception as e:
-                result['status'] = 'ERROR'
-                result['error'] = str(e)
+        Each case runs on all targets at the same time, one thread per
+        target, and the next case starts once all targets are done, so every
+        target sees the same sequence of statements. Outputs are normalized
+        across dialects (column name case, numeric and date types) and
+        compared with the first target's output, using the test case's
+        ``ordered`` and tolerance options. Each target is also checked
+        against ``expected_output`` or ``expected_snapshot``.
+        
+        A case is DIVERGED when a target's output differs from the
+        reference, or when it fails to produce one while the reference does
+        (or the other way round). Otherwise its status is the worst target
+        status.
+        
+        Args:
+            executors (Dict[str, QueryExecutor]): Executor by target name;
+                the first target is the reference
+            isolated (bool): Roll back each test case after it runs
+            relative_tolerance (float): Minimum relative tolerance for
+                numeric values, absorbing float rounding differences between
+                backends
+            on_result (Optional[Callable]): Called with each completed result
+            cancel (Optional[threading.Event]): Stops the run when set
             
-            results.append(result)
+        Returns:
+            List[Dict[str, Any]]: Test results with per-target outcomes and
+                divergences
+        """
+        test_cases = self.load_test_cases()
+        options = {'isolated': isolated}
+        hooks = {'on_result': on_result, 'cancel': cancel}
+        names = list(executors)
+        results = []
+        with ThreadPoolExecutor(max_workers=max(1, len(names))) as pool:
+            for test_case in test_cases:
+                if self._is_cancelled(hooks):
+                    break
+                outcomes = pool.map(
+                    lambda name: self._run_on_target(executors[name], test_case, options), names
+                )
+                result = self._merge_outcomes(test_case, dict(zip(names, outcomes)), relative_tolerance)
+                self._collect(results, [result], hooks)
+        return results
+
+    def _run_on_target(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                       options: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a test case on one target and keep its normalized output for comparison."""
+        outcome = {'status': 'PENDING', 'error': None, 'execution_time': 0, 'output': None}
+        timings = {'execute': 0.0, 'fetch': 0.0}
+        try:
+            if self._is_isolated(test_case, options):
+                with query_executor.isolated() as connection:
+                    output = self._capture_output(query_executor, test_case, connection, timings)
+            else:
+                output = self._capture_output(query_executor, test_case, None, timings)
+            outcome['execution_time'] = timings['execute'] + timings['fetch']
+            outcome['output'] = normalize_output(output)
+            
+            diff = self._compare_expected(output, test_case)
+            if diff is None:
+                outcome['status'] = 'PASS'
+            else:
+                outcome['status'] = 'FAIL'
+                outcome['error'] = self._describe_diff(diff)
+        except QueryTimeoutError as e:
+            outcome['status'] = 'TIMEOUT'
+            outcome['error'] = str(e)
+        except Exception as e:
+            outcome['status'] = 'ERROR'
+            outcome['error'] = str(e)
+        return outcome
+
+    def _capture_output(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                        connection: Optional[Connection], timings: Dict[str, float]) -> Any:
+        """Execute a test case's query and return its whole output."""
+        if 'param_sets' in test_case:
+            summary = query_executor.execute_many(test_case['query'], test_case['param_sets'],
+                                                  connection, timings=timings)
+            return {'affected_rows': summary['affected_rows']}
+        return query_executor.execute(test_case['query'], connection, timings,
+                                      params=test_case.get('params'))
+
+    def _merge_outcomes(self, test_case: Dict[str, Any], outcomes: Dict[str, Dict[str, Any]],
+                        relative_tolerance: float) -> Dict[str, Any]:
+        """Compare the targets' outputs with the reference target and build the case result."""
+        comparator = ResultComparator(
+            ordered=test_case.get('ordered', True),
+            tolerance=float(test_case.get('tolerance', 0.0)),
+            relative_tolerance=max(float(test_case.get('relative_tolerance', 0.0)), relative_tolerance)
+        )
+        names = list(outcomes)
+        reference = outcomes[names[0]]
+        divergences = []
+        for name in names[1:]:
+            outcome = outcomes[name]
+            if (outcome['output'] is None) != (reference['output'] is None):
+                divergences.append({
+                    'target': name,
+                    'reference': names[0],
+                    'reason': 'status_mismatch',
+                    'status': outcome['status'],
+                    'reference_status': reference['status'],
+                    'error': outcome['error'] or reference['error']
+                })
+            elif outcome['output'] is not None:
+                actual, expected = outcome['output'], reference['output']
+                diff = comparator.compare(actual if isinstance(actual, list) else [actual],
+                                          expected if isinstance(expected, list) else [expected])
+                if diff is not None:
+                    divergences.append({'target': name, 'reference': names[0], 'reason': 'output_mismatch',
+                                        'diff': diff})
+        
+        statuses = [outcome['status'] for outcome in outcomes.values()]
+        if divergences:
+            status = 'DIVERGED'
+            error = summarize_divergences(divergences)
+        else:
+            status = next((status for status in ('ERROR', 'TIMEOUT', 'FAIL') if status in statuses), 'PASS')
+            error = next((f"{name}: {outcome['error']}" for name, outcome in outcomes.items()
+                          if outcome['error']), None)
+        return {
+            'name': test_case['name'],
+            'query': test_case['query'],
+            'status': status,
+            'error': error,
+            'execution_time': max(outcome['execution_time'] for outcome in outcomes.values()),
+            'targets': {
+                name: {key: outcome[key] for key in ('status', 'error', 'execution_time')}
+                for name, outcome in outcomes.items()
+            },
+            'divergences': divergences
+        }
+
+    async def run_tests_async(self, async_executor: Any, concurrency: int = 10,
+                              isolated: bool = False) -> List[Dict[str, Any]]:
+        """
+        Run all test cases concurrently on an asyncio event loop.
+        
+        Consecutive read-only (or isolated) cases run together, with at most
+        ``concurrency`` queries in flight, and mutating cases act as barriers
+        exactly as in ``run_tests``. Benchmarks and plan capture are only
+        supported by ``run_tests``.
         
+        Args:
+            async_executor (AsyncQueryExecutor): The async query executor to use
+            concurrency (int): Maximum number of test cases running at once
+            isolated (bool): Roll back each test case after it runs
+            
+        Returns:
+            List[Dict[str, Any]]: Test results in test case order
+        """
+        # Parsing the test files is blocking I/O, kept off the event loop
+        test_cases = await asyncio.to_thread(self.load_test_cases)
+        options = {'isolated': isolated}
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(test_case: Dict[str, Any]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._run_test_case_async(async_executor, test_case, options)
+        
+        results = []
+        batch = []
+        for test_case in test_cases:
+            if (self._is_isolated(test_case, options)
+                    or not self._is_mutating(async_executor, test_case)):
+                batch.append(test_case)
+                continue
+            if batch:
+                results.extend(await asyncio.gather(*(run(case) for case in batch)))
+                batch = []
+            results.append(await self._run_test_case_async(async_executor, test_case, options))
+        if batch:
+            results.extend(await asyncio.gather(*(run(case) for case in batch)))
         return results
 
+    async def _run_test_case_async(self, async_executor: Any, test_case: Dict[str, Any],
+                                   options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run a single test case on an async query executor.
+        
+        Args:
+            async_executor (AsyncQueryExecutor): The async query executor to use
+            test_case (Dict[str, Any]): The test case to run
+            options (Dict[str, Any]): Run-wide options
+            
+        Returns:
+            Dict[str, Any]: Test result
+        """
+        result = {
+            'name': test_case['name'],
+            'query': test_case['query'],
+            'status': 'PENDING',
+            'error': None,
+            'execution_time': 0
+        }
+        timings = {'execute': 0.0, 'fetch': 0.0, 'compare': 0.0}
+        
+        try:
+            start = time.perf_counter()
+            if self._is_isolated(test_case, options):
+                async with async_executor.isolated() as connection:
+                    actual_output = await self._execute_async(async_executor, test_case, connection, timings)
+            else:
+                actual_output = await self._execute_async(async_executor, test_case, None, timings)
+            
+            compare_start = time.perf_counter()
+            diff = self._compare_expected(actual_output, test_case)
+            timings['compare'] = time.perf_counter() - compare_start
+            
+            result['execution_time'] = timings['execute'] + timings['fetch']
+            result['timings'] = dict(timings, total=time.perf_counter() - start)
+            if diff is None:
+                result['status'] = 'PASS'
+            else:
+                result['status'] = 'FAIL'
+                result['error'] = self._describe_diff(diff)
+                result['diff'] = diff
+            
+        except QueryTimeoutError as e:
+            result['status'] = 'TIMEOUT'
+            result['error'] = str(e)
+        except Exception as e:
+            result['status'] = 'ERROR'
+            result['error'] = str(e)
+        
+        return result
+
+    async def _execute_async(self, async_executor: Any, test_case: Dict[str, Any],
+                             connection: Any, timings: Dict[str, float]) -> Any:
+        """Execute a test case's query and return the output to compare."""
+        if 'param_sets' in test_case:
+            summary = await async_executor.execute_many(test_case['query'], test_case['param_sets'],
+                                                        connection, timings=timings)
+            return {'affected_rows': summary['affected_rows']}
+        return await async_executor.execute(test_case['query'], connection, timings,
+                                            params=test_case.get('params'))
+
+    def _is_mutating(self, query_executor: QueryExecutor, test_case: Dict[str, Any]) -> bool:
+        """Check whether a test case may modify the database."""
+        # Anything validate_query does not recognise as a SELECT (including
+        # DDL, which it reports as an unknown type) is treated as mutating
+        return query_executor.validate_query(test_case['query'])['query_type'] != 'SELECT'
+
+    def _is_isolated(self, test_case: Dict[str, Any], options: Dict[str, Any]) -> bool:
+        """Resolve whether a test case runs in a rolled-back transaction."""
+        return bool(test_case.get('isolated', options.get('isolated', False)))
+
+    def _run_test_case(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                       connection: Optional[Connection] = None,
+                       options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run a single test case.
+        
+        Args:
+            query_executor (QueryExecutor): The query executor to use
+            test_case (Dict[str, Any]): The test case to run
+            connection (Optional[Connection]): Connection to run the query on,
+                defaults to one checked out from the executor's pool
+            options (Optional[Dict[str, Any]]): Run-wide options
+            
+        Returns:
+            Dict[str, Any]: Test result
+        """
+        options = options or {}
+        if 'cached_result' in test_case:
+            return dict(test_case['cached_result'], cached=True)
+        result = {
+            'name': test_case['name'],
+            'query': test_case['query'],
+            'status': 'PENDING',
+            'error': None,
+            'execution_time': 0
+        }
+        timings = {'execute': 0.0, 'fetch': 0.0, 'compare': 0.0}
+        
+        try:
+            # Execute the query, rolling back its changes if isolated
+            start = time.perf_counter()
+            if options.get('update_snapshots') and 'expected_snapshot' in test_case:
+                execute = self._update_snapshot
+            else:
+                execute = self._execute_test_case
+            if self._is_isolated(test_case, options):
+                with query_executor.isolated(connection) as isolated_connection:
+                    diff = execute(query_executor, test_case, isolated_connection, timings)
+            else:
+                diff = execute(query_executor, test_case, connection, timings)
+            total_time = time.perf_counter() - start
+            
+            result['execution_time'] = timings['execute'] + timings['fetch']
+            result['timings'] = dict(timings, total=total_time)
+            
+            if diff is None:
+                result['status'] = 'PASS'
+                if execute == self._update_snapshot:
+                    result['snapshot_updated'] = test_case['expected_snapshot']
+                if test_case.get('benchmark'):
+                    result['benchmark'] = self._benchmark_test_case(query_executor, test_case, connection)
+            else:
+                result['status'] = 'FAIL'
+                result['error'] = self._describe_diff(diff)
+                result['diff'] = diff
+            
+            if options.get('capture_plans') and not self._is_mutating(query_executor, test_case):
+                self._check_plan(query_executor, test_case, result, connection)
+            
+        except QueryTimeoutError as e:
+            result['status'] = 'TIMEOUT'
+            result['error'] = str(e)
+        except Exception as e:
+            result['status'] = 'ERROR'
+            result['error'] = str(e)
+        
+        return result
+
+    def _check_plan(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                    result: Dict[str, Any], connection: Optional[Connection] = None):
+        """
+        Capture a test case's query plan and compare it with the recorded one.
+        
+        Adds ``plan_fingerprint`` to the result, and ``plan_changed`` with a
+        summary of the change when the plan differs from the last recorded
+        plan. Failing to capture a plan is reported as ``plan_error`` without
+        affecting the test status.
+        
+        Args:
+            query_executor (QueryExecutor): The query executor to use
+            test_case (Dict[str, Any]): The test case whose plan to capture
+            result (Dict[str, Any]): Test result, updated in place
+            connection (Optional[Connection]): Connection to explain on
+        """
+        try:
+            plan = query_executor.explain(test_case['query'], connection, params=test_case.get('params'))
+        except Exception as e:
+            result['plan_error'] = str(e)
+            return
+        
+        result['plan_fingerprint'] = plan['fingerprint']
+        if not self.baseline_store:
+            return
+        
+        previous = self.baseline_store.last_plan(test_case['name'], test_case['query'])
+        if previous and previous['fingerprint'] != plan['fingerprint']:
+            result['plan_changed'] = dict(
+                describe_plan_change(previous['nodes'], plan['nodes']),
+                previous_fingerprint=previous['fingerprint']
+            )
+        if not previous or previous['fingerprint'] != plan['fingerprint']:
+            self.baseline_store.record_plan(test_case['name'], test_case['query'], plan)
+
     def save_test_case(self, test_case: Dict[str, Any]) -> str:
         """Save a new test case to a YAML file."""
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -74,23 +772,172 @@ class TestManager:
         file_path = os.path.join(self.test_cases_dir, filename)
         
         with open(file_path, 'w') as f:
-            yaml.dump([test_case], f, default_flow_style=False)
+            _yaml_module().dump([test_case], f, default_flow_style=False)
         
         return filename
 
-    def _execute_test_case(self, test_case: Dict[str, Any]) -> Any:
-        """Execute a single test case and return the result."""
-        # This method should be implemented to actually execute the query
-        # For now, we'll return a mock result
-        return {'mock': 'result'}
+    def _execute_test_case(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                           connection: Optional[Connection] = None,
+                           timings: Optional[Dict[str, float]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Execute a single test case and compare its output.
+        
+        Row results are streamed batch by batch into the comparison, so the
+        full actual result is never materialized. The query is bound to the
+        test case's ``params``, or executed once per entry of ``param_sets``
+        in ``executemany`` batches, in which case the total affected row
+        count is compared.
+        
+        Args:
+            query_executor (QueryExecutor): The query executor to use
+            test_case (Dict[str, Any]): The test case to execute
+            connection (Optional[Connection]): Connection to execute on
+            timings (Optional[Dict[str, float]]): Receives execute, fetch and
+                compare times
+            
+        Returns:
+            Optional[Dict[str, Any]]: Compact diff, or None if the output matched
+        """
+        timings = timings if timings is not None else {}
+        expected_output = test_case.get('expected_output')
+        if 'param_sets' in test_case:
+            summary = query_executor.execute_many(test_case['query'], test_case['param_sets'],
+                                                  connection, timings=timings)
+            actual_output = {'affected_rows': summary['affected_rows']}
+            start = time.perf_counter()
+            diff = self._compare_outputs(actual_output, expected_output, test_case)
+            timings['compare'] = time.perf_counter() - start
+            return diff
+        if 'expected_snapshot' not in test_case and not isinstance(expected_output, list):
+            actual_output = query_executor.execute(test_case['query'], connection, timings,
+                                                   params=test_case.get('params'))
+            start = time.perf_counter()
+            diff = self._compare_outputs(actual_output, expected_output, test_case)
+            timings['compare'] = time.perf_counter() - start
+            return diff
+        
+        with closing(query_executor.execute_stream(test_case['query'], connection=connection,
+                                                   timings=timings, params=test_case.get('params'))) as batches:
+            # Rows are fetched while comparing, so leave the fetch time out
+            start = time.perf_counter()
+            diff = self._compare_expected((row for batch in batches for row in batch), test_case)
+            timings['compare'] = time.perf_counter() - start - timings.get('fetch', 0.0)
+        return diff
 
-    def _compare_outputs(self, actual: Any, expected: Any) -> bool:
-        """Compare actual and expected outputs."""
+    def _update_snapshot(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                         connection: Optional[Connection] = None,
+                         timings: Optional[Dict[str, float]] = None) -> None:
+        """
+        Execute a test case and record its rows as its expected snapshot.
+        
+        Rows are streamed from the database into the snapshot file, so the
+        result is never held in memory as a whole.
+        
+        Args:
+            query_executor (QueryExecutor): The query executor to use
+            test_case (Dict[str, Any]): Test case with an ``expected_snapshot``
+            connection (Optional[Connection]): Connection to execute on
+            timings (Optional[Dict[str, float]]): Receives execute and fetch times
+            
+        Returns:
+            None: The case always matches the snapshot it just wrote
+        """
+        with closing(query_executor.execute_stream(test_case['query'], connection=connection,
+                                                   timings=timings, params=test_case.get('params'))) as batches:
+            write_snapshot(test_case['expected_snapshot'], (row for batch in batches for row in batch))
+        return None
+
+    def _benchmark_test_case(self, query_executor: QueryExecutor, test_case: Dict[str, Any],
+                             connection: Optional[Connection] = None) -> Dict[str, Any]:
+        """
+        Measure the latency of a test case's query over repeated runs.
+        
+        The ``benchmark`` key of the test case may set ``warmup`` (untimed
+        runs, default 1) and ``iterations`` (timed runs, default 10). Every
+        run is rolled back, so write queries can be benchmarked safely.
+        
+        Args:
+            query_executor (QueryExecutor): The query executor to use
+            test_case (Dict[str, Any]): The test case to benchmark
+            connection (Optional[Connection]): Connection to execute on
+            
+        Returns:
+            Dict[str, Any]: Latency statistics in seconds and rows per second
+        """
+        options = test_case['benchmark'] if isinstance(test_case['benchmark'], dict) else {}
+        warmup = int(options.get('warmup', 1))
+        iterations = int(options.get('iterations', 10))
+        returns_rows = (('expected_snapshot' in test_case or isinstance(test_case.get('expected_output'), list))
+                        and 'param_sets' not in test_case)
+        params = test_case.get('params')
+        
+        latencies = []
+        rows = 0
+        for iteration in range(warmup + iterations):
+            with query_executor.isolated(connection) as isolated_connection:
+                start = time.perf_counter()
+                if 'param_sets' in test_case:
+                    count = query_executor.execute_many(test_case['query'], test_case['param_sets'],
+                                                        isolated_connection)['affected_rows']
+                elif returns_rows:
+                    count = sum(len(batch) for batch in
+                                query_executor.execute_stream(test_case['query'], connection=isolated_connection,
+                                                              params=params))
+                else:
+                    output = query_executor.execute(test_case['query'], isolated_connection, params=params)
+                    count = max(output.get('affected_rows', 0), 0) if isinstance(output, dict) else len(output)
+                elapsed = time.perf_counter() - start
+            
+            if iteration >= warmup:
+                latencies.append(elapsed)
+                rows += count
+        
+        return summarize_latencies(latencies, rows)
+
+    def _compare_expected(self, actual: Any, test_case: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Compare an output with a test case's expected output or snapshot."""
+        if 'expected_snapshot' not in test_case:
+            return self._compare_outputs(actual, test_case['expected_output'], test_case)
+        with closing(read_snapshot(test_case['expected_snapshot'])) as expected:
+            return self._compare_outputs(actual, expected, test_case)
+
+    def _compare_outputs(self, actual: Any, expected: Any,
+                         test_case: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Compare actual and expected outputs.
+        
+        Args:
+            actual (Any): Actual rows (any iterable) or a single result dict
+            expected (Any): Expected rows (any iterable) or a single result dict
+            test_case (Optional[Dict[str, Any]]): Test case providing the
+                ``ordered``, ``tolerance`` and ``relative_tolerance`` options
+            
+        Returns:
+            Optional[Dict[str, Any]]: Compact diff, or None if the outputs match
+        """
         if actual is None or expected is None:
-            return actual == expected
+            if actual == expected:
+                return None
+            return {'reason': 'value_mismatch', 'expected': expected, 'actual': actual}
         
-        # Convert both to JSON-serializable format for comparison
-        actual_json = json.dumps(actual, sort_keys=True)
-        expected_json = json.dumps(expected, sort_keys=True)
+        if isinstance(actual, dict):
+            actual = [actual]
+        if isinstance(expected, dict):
+            expected = [expected]
         
-        return actual_json == expected_json 
\ No newline at end of file
+        return ResultComparator.from_test_case(test_case or {}).compare(actual, expected)
+
+    def _describe_diff(self, diff: Dict[str, Any]) -> str:
+        """Summarize a comparison diff in one line."""
+        reason = diff['reason']
+        if reason == 'row_mismatch':
+            return (f"Row {diff['row']} differs in {', '.join(map(str, diff['columns']))}: "
+                    f"expected {diff['expected']}, got {diff['actual']}")
+        if reason == 'missing_row':
+            return f"Missing row {diff['row']}: expected {diff['expected']}"
+        if reason == 'unexpected_row':
+            return f"Unexpected row {diff['row']}: got {diff['actual']}"
+        if reason == 'multiset_mismatch':
+            return (f"{diff['missing_rows']} expected rows missing, "
+                    f"{diff['unexpected_rows']} unexpected rows")
+        return f"Expected {diff['expected']}, got {diff['actual']}"
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the application modules the same way cli.py and app.py do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,107 @@
+import asyncio
+import time
+import pytest
+from modules.async_executor import AsyncQueryExecutor, to_async_uri
+from modules.query_executor import QueryTimeoutError
+
+UNBOUNDED = 'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c'
+
+
+def run(coroutine_function, *args):
+    return asyncio.run(coroutine_function(*args))
+
+
+@pytest.fixture
+def database_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'async.db'}"
+
+
+def test_to_async_uri():
+    assert to_async_uri('sqlite:///test.db') == 'sqlite+aiosqlite:///test.db'
+    assert to_async_uri('postgresql://u:p@host/db') == 'postgresql+asyncpg://u:p@host/db'
+    assert to_async_uri('postgresql+asyncpg://u:p@host/db') == 'postgresql+asyncpg://u:p@host/db'
+    with pytest.raises(ValueError):
+        to_async_uri('oracle://host/db')
+
+
+def test_execute_returns_rows_and_counts(database_uri):
+    async def scenario():
+        executor = AsyncQueryExecutor(database_uri)
+        try:
+            await executor.execute('CREATE TABLE items (id INTEGER, name TEXT)')
+            written = await executor.execute_many(
+                'INSERT INTO items (id, name) VALUES (:id, :name)',
+                [{'id': i, 'name': f'item {i}'} for i in range(5)], batch_size=2
+            )
+            rows = await executor.execute('SELECT id FROM items WHERE id < :limit ORDER BY id', params={'limit': 2})
+            batches = [batch async for batch in executor.execute_stream('SELECT id FROM items', batch_size=2)]
+            return written, rows, batches
+        finally:
+            await executor.close()
+
+    written, rows, batches = run(scenario)
+    assert written == {'affected_rows': 5, 'executions': 5, 'batches': 3}
+    assert rows == [{'id': 0}, {'id': 1}]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+def test_sqlite_timeout_interrupts_the_statement(database_uri):
+    async def scenario():
+        executor = AsyncQueryExecutor(database_uri, timeout=0.5)
+        try:
+            start = time.perf_counter()
+            with pytest.raises(QueryTimeoutError):
+                await executor.execute(UNBOUNDED)
+            elapsed = time.perf_counter() - start
+            # The connection is usable again once the statement is interrupted
+            return elapsed, await executor.execute('SELECT 1 AS one')
+        finally:
+            await executor.close()
+
+    elapsed, rows = run(scenario)
+    assert elapsed < 5
+    assert rows == [{'one': 1}]
+
+
+def test_sqlite_interrupt_never_outlives_the_statement(database_uri, monkeypatch):
+    import aiosqlite
+    original = aiosqlite.Connection.interrupt
+    calls = []
+    state = {'released': False}
+
+    async def interrupt(self):
+        calls.append(state['released'])
+        return await original(self)
+
+    monkeypatch.setattr(aiosqlite.Connection, 'interrupt', interrupt)
+
+    async def scenario():
+        executor = AsyncQueryExecutor(database_uri, timeout=0.05)
+        try:
+            async with executor.engine.connect() as connection:
+                async with executor._deadline(connection):
+                    # The statement finishes late, just as the timer fires
+                    time.sleep(0.1)
+                    await asyncio.sleep(0)
+                    await asyncio.sleep(0)
+                state['released'] = True
+                await asyncio.sleep(0.1)
+        finally:
+            await executor.close()
+
+    run(scenario)
+    assert True not in calls
+
+
+def test_isolated_rolls_back_ddl(database_uri):
+    async def scenario():
+        executor = AsyncQueryExecutor(database_uri)
+        try:
+            async with executor.isolated() as connection:
+                await executor.execute('CREATE TABLE leak_async (id INTEGER)', connection=connection)
+                await executor.execute('INSERT INTO leak_async VALUES (1)', connection=connection)
+            return await executor.execute("SELECT name FROM sqlite_master WHERE name = 'leak_async'")
+        finally:
+            await executor.close()
+
+    assert run(scenario) == []
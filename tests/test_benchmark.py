@@ -0,0 +1,60 @@
+import random
+import statistics
+import pytest
+from modules import test_manager
+from modules.benchmark import percentile, summarize_latencies
+from modules.query_executor import QueryExecutor
+
+
+def test_percentile_interpolates_between_ranks():
+    assert percentile([], 0.5) == 0.0
+    assert percentile([3.0], 0.99) == 3.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == 2.5
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.0) == 1.0
+    assert percentile([1.0, 2.0, 3.0, 4.0], 1.0) == 4.0
+    assert percentile([0.0, 10.0], 0.95) == pytest.approx(9.5)
+
+
+def test_percentile_matches_inclusive_quantiles():
+    generator = random.Random(0)
+    values = sorted(generator.expovariate(1.0) for _ in range(37))
+    cut_points = statistics.quantiles(values, n=100, method='inclusive')
+    for index, expected in enumerate(cut_points):
+        assert percentile(values, (index + 1) / 100) == pytest.approx(expected)
+
+
+def test_summarize_latencies():
+    summary = summarize_latencies([0.4, 0.1, 0.3, 0.2], rows=20)
+    assert summary['iterations'] == 4
+    assert (summary['min'], summary['max']) == (0.1, 0.4)
+    assert summary['mean'] == pytest.approx(0.25)
+    assert summary['median'] == pytest.approx(0.25)
+    assert summary['p95'] == pytest.approx(0.385)
+    assert summary['p99'] == pytest.approx(0.397)
+    assert summary['rows_per_second'] == pytest.approx(20)
+
+    empty = summarize_latencies([])
+    assert empty['iterations'] == 0
+    assert all(empty[key] == 0.0 for key in ('min', 'max', 'mean', 'median', 'p95', 'p99', 'rows_per_second'))
+
+
+def test_benchmarked_writes_are_rolled_back(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}")
+    executor.execute('CREATE TABLE items (id INTEGER)')
+    executor.execute('INSERT INTO items VALUES (1), (2)')
+    manager = test_manager.TestManager(str(tmp_path / 'cases'))
+
+    summary = manager._benchmark_test_case(executor, {
+        'query': 'DELETE FROM items', 'expected_output': {'affected_rows': 2},
+        'benchmark': {'warmup': 2, 'iterations': 3}
+    })
+    assert summary['iterations'] == 3
+    assert summary['min'] <= summary['median'] <= summary['p99'] <= summary['max']
+    assert summary['rows_per_second'] > 0
+
+    summary = manager._benchmark_test_case(executor, {
+        'query': 'SELECT id FROM items', 'expected_output': [{'id': 1}, {'id': 2}], 'benchmark': True
+    })
+    assert summary['iterations'] == 10
+    assert executor.execute('SELECT count(*) AS n FROM items') == [{'n': 2}]
+    executor.engine.dispose()
@@ -0,0 +1,111 @@
+import random
+from datetime import date
+from itertools import permutations
+from decimal import Decimal
+import pytest
+from modules.comparator import ResultComparator, normalize_value
+
+
+def compare(actual, expected, **options):
+    return ResultComparator(**options).compare(actual, expected)
+
+
+def test_ordered_reports_first_differing_row():
+    diff = compare([{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}],
+                   [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'c'}])
+    assert diff == {'row': 1, 'reason': 'row_mismatch', 'columns': ['name'],
+                    'expected': {'name': 'c'}, 'actual': {'name': 'b'}}
+
+
+def test_ordered_reports_missing_and_unexpected_rows():
+    assert compare([{'id': 1}], [{'id': 1}, {'id': 2}])['reason'] == 'missing_row'
+    assert compare([{'id': 1}, {'id': 2}], [{'id': 1}])['reason'] == 'unexpected_row'
+
+
+def test_ordered_rejects_reordered_rows():
+    assert compare([{'id': 2}, {'id': 1}], [{'id': 1}, {'id': 2}]) is not None
+
+
+def test_unordered_accepts_reordered_rows_and_counts_duplicates():
+    assert compare([{'id': 2}, {'id': 1}], [{'id': 1}, {'id': 2}], ordered=False) is None
+    diff = compare([{'id': 1}, {'id': 1}], [{'id': 1}, {'id': 2}], ordered=False)
+    assert diff['reason'] == 'multiset_mismatch'
+    assert diff['unexpected'] == [{'id': 1}] and diff['missing'] == [{'id': 2}]
+
+
+def test_equivalent_driver_types_compare_equal():
+    actual = [{'total': Decimal('2.0'), 'day': date(2024, 1, 2), 'flag': True}]
+    expected = [{'flag': 1, 'day': '2024-01-02', 'total': 2}]
+    assert compare(actual, expected) is None
+    assert compare(actual, expected, ordered=False) is None
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_tolerance_applies_in_both_modes(ordered):
+    actual = [{'x': 1.9999999}, {'x': 15}]
+    expected = [{'x': 2}, {'x': 15}]
+    assert compare(actual, expected, ordered=ordered, tolerance=0.001) is None
+    assert compare(actual, expected, ordered=ordered) is not None
+
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_relative_tolerance(ordered):
+    assert compare([{'x': 1000.5}], [{'x': 1000}], ordered=ordered, relative_tolerance=0.001) is None
+    assert compare([{'x': 1002}], [{'x': 1000}], ordered=ordered, relative_tolerance=0.001) is not None
+
+
+def test_unordered_tolerance_matches_rows_sorting_differently():
+    # Sorted by value or by text, the first column puts these rows in different orders
+    actual = [{'a': 1.9999999, 'b': 2}, {'a': 2, 'b': 1}]
+    expected = [{'a': 2, 'b': 1}, {'a': 2, 'b': 2}]
+    assert compare(actual, expected, ordered=False, tolerance=0.001) is None
+    assert compare(actual, expected, ordered=True, tolerance=0.001) is not None
+
+
+def test_unordered_tolerance_reports_unmatched_rows():
+    diff = compare([{'x': 1, 'tag': 'a'}, {'x': 5, 'tag': 'b'}],
+                   [{'x': 1.0001, 'tag': 'a'}, {'x': 5, 'tag': 'c'}],
+                   ordered=False, tolerance=0.001)
+    assert diff['unexpected_rows'] == 1 and diff['missing_rows'] == 1
+    assert diff['unexpected'] == [{'x': 5, 'tag': 'b'}]
+    assert diff['missing'] == [{'x': 5, 'tag': 'c'}]
+
+
+def test_unordered_tolerance_uses_each_expected_row_once():
+    actual = [{'x': 1.0}, {'x': 1.0001}]
+    expected = [{'x': 1.0}, {'x': 3.0}]
+    diff = compare(actual, expected, ordered=False, tolerance=0.001)
+    assert diff['unexpected_rows'] == 1 and diff['missing'] == [{'x': 3.0}]
+
+
+def test_unordered_tolerance_finds_pairing_greedy_matching_misses():
+    # Pairing rows by their first column first would leave both sides with a row
+    assert compare([{'x': 0, 'y': 1}, {'x': 0.5, 'y': 2.5}],
+                   [{'x': 0.1, 'y': 1.9}, {'x': 0.6, 'y': 0.5}], ordered=False, tolerance=1) is None
+
+
+def test_unordered_tolerance_matches_exhaustive_pairing():
+    generator = random.Random(0)
+    for _ in range(300):
+        size = generator.randint(1, 5)
+        actual = [{'x': generator.randint(0, 4) / 2, 'y': generator.randint(0, 4) / 2} for _ in range(size)]
+        expected = [{'x': generator.randint(0, 4) / 2, 'y': generator.randint(0, 4) / 2} for _ in range(size)]
+        pairable = any(
+            all(abs(row['x'] - other['x']) <= 0.5 and abs(row['y'] - other['y']) <= 0.5
+                for row, other in zip(actual, ordering))
+            for ordering in permutations(expected)
+        )
+        diff = compare(actual, expected, ordered=False, tolerance=0.5)
+        assert (diff is None) == pairable, (actual, expected)
+        if diff:
+            assert diff['unexpected_rows'] == diff['missing_rows'] > 0
+
+
+def test_digest_ignores_column_order():
+    assert ResultComparator.digest({'a': 1, 'b': 2}) == ResultComparator.digest({'b': 2, 'a': Decimal('1.0')})
+
+
+def test_normalize_value():
+    assert normalize_value(Decimal('3.00')) == 3
+    assert normalize_value(2.5) == 2.5
+    assert normalize_value(b'\x01') == '01'
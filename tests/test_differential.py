@@ -0,0 +1,60 @@
+from decimal import Decimal
+import pytest
+import yaml
+from modules import test_manager
+from modules.differential import normalize_output, parse_targets, summarize_divergences
+from modules.query_executor import QueryExecutor
+
+
+def test_parse_targets():
+    assert parse_targets('a=sqlite:///a.db, b=sqlite:///b.db,') == {'a': 'sqlite:///a.db', 'b': 'sqlite:///b.db'}
+    for spec in ('a', 'a=', '=uri', 'a=x,a=y'):
+        with pytest.raises(ValueError):
+            parse_targets(spec)
+
+
+def test_normalize_output_folds_names_and_numbers():
+    assert normalize_output([{'ID': 1, 'Total': Decimal('1.50')}]) == normalize_output([{'id': 1, 'total': 1.5}])
+    assert normalize_output({'affected_rows': 2}) == {'affected_rows': 2}
+    assert normalize_output(None) is None
+
+
+def test_summarize_divergences():
+    assert summarize_divergences([]) is None
+    summary = summarize_divergences([
+        {'target': 'pg', 'reference': 'sqlite', 'reason': 'output_mismatch', 'diff': {'reason': 'row_mismatch'}},
+        {'target': 'mysql', 'reference': 'sqlite', 'reason': 'status_mismatch', 'status': 'ERROR',
+         'reference_status': 'PASS', 'error': 'boom'},
+    ])
+    assert summary == 'Targets diverge: pg differs from sqlite (row_mismatch); mysql ERROR vs sqlite PASS'
+
+
+@pytest.fixture
+def executors(tmp_path):
+    executors = {}
+    for name, total in (('reference', 1.5), ('same', 1.5), ('other', 2.5)):
+        executor = QueryExecutor(f"sqlite:///{tmp_path / name}.db")
+        executor.execute('CREATE TABLE orders (id INTEGER PRIMARY KEY, total REAL)')
+        executor.execute(f'INSERT INTO orders (total) VALUES ({total})')
+        executors[name] = executor
+    yield executors
+    for executor in executors.values():
+        executor.engine.dispose()
+
+
+def test_run_differential_flags_the_divergent_target(tmp_path, executors):
+    cases_dir = tmp_path / 'cases'
+    cases_dir.mkdir()
+    (cases_dir / 'orders.yaml').write_text(yaml.safe_dump([
+        {'name': 'totals', 'query': 'SELECT total FROM orders', 'expected_output': [{'total': 1.5}]},
+        {'name': 'ids', 'query': 'SELECT id FROM orders', 'expected_output': [{'id': 1}]},
+    ]))
+    manager = test_manager.TestManager(str(cases_dir))
+
+    totals, ids = manager.run_differential(executors)
+    assert totals['status'] == 'DIVERGED'
+    assert [divergence['target'] for divergence in totals['divergences']] == ['other']
+    assert totals['error'].startswith('Targets diverge: other differs from reference')
+    assert totals['targets']['other']['status'] == 'FAIL'
+    assert ids['status'] == 'PASS'
+    assert ids['divergences'] == []
@@ -0,0 +1,83 @@
+import os
+import pytest
+from modules.fixtures import FixtureLoader
+from modules.query_executor import QueryExecutor
+
+
+@pytest.fixture
+def fixture_files(tmp_path):
+    schema = tmp_path / 'schema.sql'
+    schema.write_text('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT);\n'
+                      'CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER, total REAL);\n'
+                      "INSERT INTO users VALUES (1, 'inline');\n")
+    seeds = tmp_path / 'seeds'
+    seeds.mkdir()
+    (seeds / 'users.csv').write_text('id,name\n2,b\n3,\n')
+    (seeds / 'notes.txt').write_text('ignored')
+    return str(schema), str(seeds)
+
+
+def test_template_loads_schema_and_seeds(fixture_files):
+    loader = FixtureLoader(*fixture_files, batch_size=1)
+    assert [os.path.basename(path) for path in loader.seed_files()] == ['users.csv']
+    rows = loader.template().execute('SELECT id, name FROM users ORDER BY id').fetchall()
+    assert rows == [(1, 'inline'), (2, 'b'), (3, None)]
+
+
+def test_parquet_seeds(fixture_files):
+    pyarrow = pytest.importorskip('pyarrow')
+    from pyarrow import parquet
+    schema_file, seed_dir = fixture_files
+    parquet.write_table(pyarrow.table({'id': [1, 2], 'user_id': [2, 3], 'total': [1.5, None]}),
+                        os.path.join(seed_dir, 'orders.parquet'))
+    loader = FixtureLoader(schema_file, seed_dir)
+    assert loader.template().execute('SELECT user_id, total FROM orders ORDER BY id').fetchall() == \
+        [(2, 1.5), (3, None)]
+
+
+def test_clones_are_independent(fixture_files):
+    loader = FixtureLoader(*fixture_files)
+    first, second = loader.clone(), loader.clone()
+    first.execute('DELETE FROM users')
+    first.commit()
+    assert first.execute('SELECT count(*) FROM users').fetchone() == (0,)
+    assert second.execute('SELECT count(*) FROM users').fetchone() == (3,)
+    assert loader.template().execute('SELECT count(*) FROM users').fetchone() == (3,)
+
+
+def test_create_executor_runs_on_a_private_clone(fixture_files):
+    loader = FixtureLoader(*fixture_files)
+    executor = loader.create_executor(timeout=5)
+    assert executor.execute("INSERT INTO users (name) VALUES ('d')") == {'affected_rows': 1}
+    assert executor.execute('SELECT count(*) AS n FROM users') == [{'n': 4}]
+    with executor.isolated() as connection:
+        executor.execute('DELETE FROM users', connection)
+    assert executor.execute('SELECT count(*) AS n FROM users') == [{'n': 4}]
+    assert loader.create_executor().execute('SELECT count(*) AS n FROM users') == [{'n': 3}]
+
+
+def test_clone_to_file(tmp_path, fixture_files):
+    uri = FixtureLoader(*fixture_files).clone_to_file(str(tmp_path / 'copy.db'))
+    executor = QueryExecutor(uri)
+    assert executor.execute('SELECT count(*) AS n FROM users') == [{'n': 3}]
+    executor.engine.dispose()
+
+
+def test_cached_templates_follow_the_fixture_files(tmp_path, fixture_files):
+    cache_dir = tmp_path / 'cache'
+    loader = FixtureLoader(*fixture_files, cache_dir=str(cache_dir))
+    loader.template()
+    fingerprint = loader.fingerprint()
+    assert (cache_dir / f'template-{fingerprint}.db').exists()
+
+    # A fresh loader reads the cached file instead of rebuilding it
+    cached_loader = FixtureLoader(*fixture_files, cache_dir=str(cache_dir))
+    cached_loader.load_seed = None
+    assert cached_loader.template().execute('SELECT count(*) FROM users').fetchone() == (3,)
+
+    schema_file, seed_dir = fixture_files
+    with open(os.path.join(seed_dir, 'users.csv'), 'a') as f:
+        f.write('4,d\n')
+    changed = FixtureLoader(schema_file, seed_dir, cache_dir=str(cache_dir))
+    assert changed.fingerprint() != fingerprint
+    assert changed.template().execute('SELECT count(*) FROM users').fetchone() == (4,)
@@ -0,0 +1,92 @@
+import pytest
+from modules.impact import ImpactAnalyzer
+from modules.query_executor import QueryExecutor
+
+
+@pytest.fixture
+def executor(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}")
+    executor.execute('CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)')
+    executor.execute('CREATE TABLE orders (id INTEGER PRIMARY KEY, total REAL, updated_at TEXT)')
+    executor.execute('CREATE TABLE "Events" (id INTEGER)')
+    executor.execute("INSERT INTO users (name) VALUES ('a')")
+    executor.execute("INSERT INTO orders (total, updated_at) VALUES (1.5, '2024-01-01')")
+    yield executor
+    executor.engine.dispose()
+
+
+CASES = [
+    {'name': 'users', 'query': 'SELECT * FROM users'},
+    {'name': 'orders', 'query': 'SELECT * FROM orders'},
+    {'name': 'events', 'query': 'SELECT * FROM "Events"'},
+]
+
+
+def run(analyzer, executor, test_cases=CASES):
+    """Plan a run, record it as green and return the positions that ran."""
+    plan = analyzer.plan(test_cases, executor)
+    results = [{'status': 'PASS', 'name': test_case['name']} for test_case in test_cases]
+    assert analyzer.record(plan, test_cases, results, executor)
+    return plan.run
+
+
+def test_unchanged_tables_reuse_results(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    assert run(analyzer, executor) == [0, 1, 2]
+    # "Events" is only reachable case-insensitively and is reused as well
+    assert run(analyzer, executor) == []
+
+
+def test_inserts_and_deletes_rerun_dependent_cases(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    run(analyzer, executor)
+    executor.execute("INSERT INTO users (name) VALUES ('b')")
+    plan = analyzer.plan(CASES, executor)
+    assert plan.run == [0]
+    assert plan.changed_tables == {'users'}
+    run(analyzer, executor)
+
+    executor.execute('DELETE FROM users WHERE id = 1')
+    assert run(analyzer, executor) == [0]
+
+    # Replacing a row keeps the count but not the highest key
+    executor.execute('DELETE FROM users WHERE id = 2')
+    executor.execute("INSERT INTO users (name) VALUES ('c')")
+    assert run(analyzer, executor) == [0]
+
+
+def test_update_marker_columns_reveal_updates(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    run(analyzer, executor)
+    executor.execute("UPDATE orders SET total = 2.5, updated_at = '2024-01-02'")
+    assert run(analyzer, executor) == [1]
+
+
+def test_schema_changes_rerun_dependent_cases(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    run(analyzer, executor)
+    executor.execute('ALTER TABLE users ADD COLUMN email TEXT')
+    assert run(analyzer, executor) == [0]
+
+
+def test_unresolvable_tables_always_run(tmp_path, executor):
+    test_cases = CASES + [{'name': 'missing', 'query': 'SELECT * FROM missing'}]
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    assert set(analyzer.fingerprint_tables(executor, {'users', 'events', 'missing'})) == {'users', 'events'}
+    run(analyzer, executor, test_cases)
+    assert run(analyzer, executor, test_cases) == [3]
+
+
+def test_changed_definition_reruns_only_that_case(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    run(analyzer, executor)
+    changed = [dict(CASES[0], expected=[{'id': 1}])] + CASES[1:]
+    assert run(analyzer, executor, changed) == [0]
+
+
+def test_failed_runs_are_not_recorded(tmp_path, executor):
+    analyzer = ImpactAnalyzer(str(tmp_path / 'state.json'))
+    plan = analyzer.plan(CASES, executor)
+    results = [{'status': 'PASS'}, {'status': 'FAIL'}, {'status': 'PASS'}]
+    assert not analyzer.record(plan, CASES, results, executor)
+    assert analyzer.plan(CASES, executor).run == [0, 1, 2]
@@ -0,0 +1,100 @@
+import threading
+import app
+from modules.job_queue import Job, JobManager
+
+
+def test_events_resume_after_the_last_seen_id():
+    job = Job('a', total=2)
+    job.publish('result', {'n': 1}, item=True)
+    job.publish('note')
+    job.publish('result', {'n': 2}, item=True)
+    assert [event['id'] for event in job.events()] == [0, 1, 2]
+    assert [event['data'] for event in job.events(1)] == [{'n': 2}]
+    assert job.events(2) == []
+    assert job.completed == 2
+
+
+def test_finished_jobs_drop_item_events_but_keep_ids():
+    manager = JobManager()
+
+    def run(job):
+        for n in range(3):
+            job.publish('result', n, item=True)
+        return {'report_file': 'report.json'}
+
+    job = manager.submit(run, total=3)
+    manager.shutdown()
+    assert job.status == 'completed'
+    assert job.result == {'report_file': 'report.json'}
+    assert job.completed == 3
+    # running (0), three results (1-3), completed (4)
+    events = job.events()
+    assert [(event['id'], event['event']) for event in events] == [(0, 'status'), (4, 'status')]
+    assert events[-1]['data']['status'] == 'completed'
+    assert [event['id'] for event in job.events(2)] == [4]
+    assert job.events(4) == []
+
+
+def test_failed_jobs_keep_their_results():
+    manager = JobManager()
+
+    def run(job):
+        job.publish('result', 1, item=True)
+        raise RuntimeError('boom')
+
+    job = manager.submit(run)
+    manager.shutdown()
+    assert job.status == 'failed'
+    assert job.error == 'boom'
+    assert [event['event'] for event in job.events()] == ['status', 'result', 'status']
+
+
+def test_cancel_queued_and_running_jobs():
+    manager = JobManager(workers=1)
+    started = threading.Event()
+
+    def run(job):
+        started.set()
+        job.cancel_event.wait(5)
+        return 'partial'
+
+    running = manager.submit(run)
+    queued = manager.submit(run)
+    assert started.wait(5)
+    assert manager.cancel(queued.id) is queued
+    assert manager.cancel(running.id) is running
+    manager.shutdown()
+    assert running.status == 'cancelled'
+    assert running.result == 'partial'
+    assert queued.status == 'cancelled'
+    assert queued.started_at is None
+    assert manager.cancel('unknown') is None
+
+
+def test_forgets_oldest_finished_jobs():
+    manager = JobManager(max_jobs=2)
+    jobs = []
+    for _ in range(3):
+        jobs.append(manager.submit(lambda job: None))
+        manager._pool.submit(lambda: None).result()
+    assert manager.get(jobs[0].id) is None
+    assert [job['job_id'] for job in manager.list_jobs()] == [jobs[1].id, jobs[2].id]
+    manager.shutdown()
+
+
+def test_event_stream_resumes_from_last_event_id():
+    job = Job('a')
+    job.publish('result', {'n': 1}, item=True)
+    job.publish('result', {'n': 2}, item=True)
+    job._set_status('failed', error='boom')
+    stream = list(app._job_events(job, 0))
+    assert stream[0] == 'id: 1\nevent: result\ndata: {"n": 2}\n\n'
+    assert [chunk.split('\n')[0] for chunk in stream] == ['id: 1', 'id: 2']
+
+    with app.app.test_client() as client:
+        app.job_manager._jobs[job.id] = job
+        try:
+            response = client.get(f'/api/tests/jobs/{job.id}/events', headers={'Last-Event-ID': '1'})
+            assert response.get_data(as_text=True).startswith('id: 2\nevent: status\n')
+        finally:
+            del app.job_manager._jobs[job.id]
@@ -0,0 +1,114 @@
+import math
+import random
+import time
+import pytest
+from modules.load_generator import LatencyHistogram, LoadGenerator
+from modules.query_executor import QueryExecutor
+
+
+def exact_percentile(values, percent):
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(len(ordered) * percent / 100)) - 1]
+
+
+def test_histogram_is_exact_for_small_values():
+    histogram = LatencyHistogram()
+    for microseconds in (5, 1, 3, 2, 4):
+        histogram.record(microseconds / 1_000_000)
+    assert histogram.percentile(0) == 1e-6
+    assert histogram.percentile(50) == 3e-6
+    assert histogram.percentile(100) == 5e-6
+    assert LatencyHistogram().percentile(99) == 0.0
+
+
+def test_histogram_percentiles_keep_their_precision():
+    generator = random.Random(0)
+    values = [int(generator.lognormvariate(8, 2)) for _ in range(5000)]
+    histogram = LatencyHistogram(significant_figures=2)
+    for value in values:
+        histogram.record(value / 1_000_000)
+    for percent in (1, 50, 90, 99, 99.9, 100):
+        expected = exact_percentile(values, percent)
+        assert histogram.percentile(percent) * 1_000_000 == pytest.approx(expected, rel=0.01, abs=1)
+    summary = histogram.summary()
+    assert summary['count'] == 5000
+    assert summary['max'] * 1_000_000 == max(values)
+    assert set(summary) >= {'p50', 'p99', 'p99_9'}
+
+
+def test_merged_histograms_equal_one_histogram():
+    generator = random.Random(1)
+    values = [generator.expovariate(200) for _ in range(2000)]
+    whole, parts = LatencyHistogram(), [LatencyHistogram(), LatencyHistogram()]
+    for index, value in enumerate(values):
+        whole.record(value)
+        parts[index % 2].record(value)
+    merged = LatencyHistogram()
+    for part in parts:
+        merged.merge(part)
+    assert merged.summary() == whole.summary()
+    with pytest.raises(ValueError):
+        merged.merge(LatencyHistogram(significant_figures=3))
+
+
+@pytest.fixture
+def executor(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}", pool_size=2)
+    executor.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+    executor.execute("INSERT INTO items (name) VALUES ('a'), ('b')")
+    yield executor
+    executor.engine.dispose()
+
+
+CASES = [
+    {'name': 'read', 'query': 'SELECT * FROM items', 'load_weight': 3},
+    {'name': 'write', 'query': "INSERT INTO items (name) VALUES ('c')"},
+    {'name': 'broken', 'query': 'SELECT missing FROM items'},
+    {'name': 'skipped', 'query': 'SELECT 1', 'load_weight': 0},
+]
+
+
+def test_closed_loop_replays_the_mix_without_changing_data(executor):
+    summary = LoadGenerator(executor, CASES, workers=2, seed=1).run(duration=5, max_operations=60)
+    assert summary['operations'] == 60
+    assert set(summary['test_cases']) == {'read', 'write', 'broken'}
+    assert summary['test_cases']['read']['count'] > summary['test_cases']['write']['count']
+    assert summary['errors'] == summary['test_cases']['broken']['errors'] == summary['test_cases']['broken']['count']
+    assert summary['last_error']
+    assert summary['pool']['pool_class'] == 'QueuePool'
+    assert executor.execute('SELECT count(*) AS n FROM items') == [{'n': 2}]
+
+
+def slow_execute(generator):
+    def execute(test_case, mutating):
+        time.sleep(0.01)
+        return 1
+    generator._execute = execute
+    return generator
+
+
+def test_open_loop_latency_includes_queueing(executor):
+    # One worker taking 10 ms per operation cannot keep up with 200 per second
+    generator = slow_execute(LoadGenerator(executor, CASES[:1], workers=1, rate=200, mode='open'))
+    summary = generator.run(duration=0.5)
+    assert summary['latency']['p99'] > 5 * summary['service_time']['p99']
+
+    generator = slow_execute(LoadGenerator(executor, CASES[:1], workers=1, rate=200, mode='closed'))
+    summary = generator.run(duration=0.5)
+    assert summary['latency'] == summary['service_time']
+
+
+def test_paced_runs_keep_to_the_rate(executor):
+    intervals = []
+    summary = LoadGenerator(executor, CASES[:1], workers=2, rate=100, mode='open').run(
+        duration=0.5, report_interval=0.1, on_interval=intervals.append)
+    assert 30 <= summary['operations'] <= 51
+    assert intervals and all('throughput' in interval for interval in intervals)
+
+
+@pytest.mark.parametrize('options', [{'mode': 'burst'}, {'mode': 'open'}])
+def test_invalid_load_settings(executor, options):
+    with pytest.raises(ValueError):
+        LoadGenerator(executor, CASES, **options)
+    with pytest.raises(ValueError):
+        LoadGenerator(executor, CASES[3:])
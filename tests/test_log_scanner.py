@@ -0,0 +1,62 @@
+import pytest
+from modules.log_scanner import LogScanner, iter_statements
+
+
+def test_iter_statements_formats():
+    assert list(iter_statements(['SELECT 1', '', '-- note', 'SELECT 2 '])) == ['SELECT 1', 'SELECT 2']
+    assert list(iter_statements(['SELECT *', 'FROM t;', 'SELECT 2;'], 'sql')) == ['SELECT * FROM t;', 'SELECT 2;']
+    postgresql = [
+        '2024-01-01 00:00:00 UTC [1] LOG:  duration: 1.5 ms  statement: SELECT *',
+        '\tFROM t',
+        '2024-01-01 00:00:01 UTC [1] LOG:  checkpoint starting',
+        '2024-01-01 00:00:02 UTC [1] LOG:  execute S_1: DELETE FROM t',
+    ]
+    assert list(iter_statements(postgresql, 'postgresql')) == ['SELECT * FROM t', 'DELETE FROM t']
+    mysql = [
+        '# Time: 2024-01-01T00:00:00',
+        '# Query_time: 2.0  Lock_time: 0.0',
+        'SET timestamp=1704067200;',
+        'SELECT * FROM t',
+        'WHERE id = 1;',
+    ]
+    assert list(iter_statements(mysql, 'mysql')) == ['SELECT * FROM t WHERE id = 1;']
+    with pytest.raises(ValueError):
+        list(iter_statements([], 'oracle'))
+
+
+def test_scan_groups_statements_by_fingerprint():
+    lines = [
+        "SELECT * FROM users WHERE name = '' OR '1'='1'",
+        "SELECT * FROM users WHERE name = '' OR '1'='1'",
+        "SELECT * FROM users WHERE name = 'x' OR '1'='1'",
+        'SELECT * FROM users WHERE id = 1',
+        'SELECT * FROM users WHERE id = 2',
+    ]
+    summary = LogScanner().scan(lines)
+    assert summary['statements'] == 5
+    assert summary['unique_statements'] == 4
+    assert summary['fingerprints'] == 2
+    assert summary['flagged_fingerprints'] == 1
+    flagged = summary['queries'][0]
+    assert flagged['count'] == 3
+    assert flagged['example'] == lines[0]
+    assert {finding['type'] for finding in flagged['findings']} == {'SQL_INJECTION'}
+
+
+def test_fingerprint_limit_counts_untracked_statements():
+    summary = LogScanner(max_fingerprints=1).scan(['SELECT 1 FROM a', 'SELECT 1 FROM b', 'SELECT 2 FROM b'])
+    assert summary['fingerprints'] == 1
+    assert summary['untracked_statements'] == 2
+
+
+def test_unique_statements_do_not_depend_on_workers():
+    # Enough distinct statements to evict repeated ones from a small cache
+    lines = [f'SELECT * FROM t WHERE id = {i % 37} AND k = {i % 11}' for i in range(3000)]
+    summaries = [
+        LogScanner(workers=workers, chunk_size=50, dedupe_cache_size=100).scan(lines)
+        for workers in (1, 2, 3)
+    ]
+    assert summaries[0]['statements'] == 3000
+    assert summaries[0]['unique_statements'] > 407
+    assert summaries[1] == summaries[0]
+    assert summaries[2] == summaries[0]
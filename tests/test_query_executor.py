@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import event, exc
+from modules.query_executor import QueryExecutor, QueryTimeoutError, batch_statement, rows_per_batch
+from modules.sql_lexer import multirow_insert, values_parameters
+
+
+@pytest.fixture
+def executor(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}", timeout=1)
+    executor.execute('CREATE TABLE items (id INTEGER, name TEXT)')
+    yield executor
+    executor.engine.dispose()
+
+
+def count_statements(executor):
+    statements = []
+    event.listen(executor.engine, 'before_cursor_execute',
+                 lambda connection, cursor, statement, *args: statements.append(statement))
+    return statements
+
+
+def test_multirow_insert_renames_parameters_per_row():
+    assert multirow_insert('INSERT INTO t (a, b) VALUES (:a, lower(:b));', 2) == \
+        'INSERT INTO t (a, b) VALUES (:a__0, lower(:b__0)), (:a__1, lower(:b__1))'
+    assert values_parameters('INSERT INTO t VALUES (:a, :b, :a)') == ('a', 'b')
+
+
+@pytest.mark.parametrize('query', [
+    'INSERT INTO t VALUES (:a), (:b)',
+    'INSERT INTO t SELECT :a',
+    'INSERT INTO t VALUES (:a) ON CONFLICT DO NOTHING',
+    'INSERT INTO t VALUES (?)',
+    'INSERT INTO t VALUES (:a); DELETE FROM t',
+    'UPDATE t SET a = :a',
+])
+def test_other_statements_are_not_expanded(query):
+    assert multirow_insert(query, 2) is None
+    statement, params = batch_statement(query, [{'a': 1}, {'a': 2}])
+    assert params == [{'a': 1}, {'a': 2}]
+
+
+def test_batches_stay_within_the_bind_parameter_limit():
+    assert rows_per_batch('INSERT INTO t VALUES (:a, :b, :c)', 100000, 'unknown') == 333
+    assert rows_per_batch('UPDATE t SET a = :a', 100000, 'unknown') == 100000
+
+
+def test_execute_many_inserts_one_statement_per_batch(executor):
+    statements = count_statements(executor)
+    summary = executor.execute_many('INSERT INTO items (id, name) VALUES (:id, :name)',
+                                    ({'id': i, 'name': f'item {i}'} for i in range(2500)), batch_size=1000)
+    assert summary == {'affected_rows': 2500, 'executions': 2500, 'batches': 3}
+    assert sum(statement.startswith('INSERT') for statement in statements) == 3
+    assert executor.execute('SELECT count(*) AS n, sum(id) AS total FROM items') == [{'n': 2500, 'total': 3123750}]
+
+
+def test_execute_many_runs_other_statements_per_parameter_set(executor):
+    executor.execute_many('INSERT INTO items (id, name) VALUES (:id, :name)', [{'id': i, 'name': 'a'} for i in range(5)])
+    summary = executor.execute_many('UPDATE items SET name = :name WHERE id = :id',
+                                    [{'id': 1, 'name': 'b'}, {'id': 2, 'name': 'c'}, {'id': 9, 'name': 'd'}])
+    assert summary['affected_rows'] == 2
+    assert executor.execute('SELECT name FROM items WHERE id IN (1, 2) ORDER BY id') == [{'name': 'b'}, {'name': 'c'}]
+
+
+def test_execute_many_rolls_back_the_whole_call(executor):
+    with pytest.raises(Exception, match="no value for 'name'"):
+        executor.execute_many('INSERT INTO items (id, name) VALUES (:id, :name)', [{'id': 1, 'name': 'a'}, {'id': 2}])
+    assert executor.execute('SELECT count(*) AS n FROM items') == [{'n': 0}]
+
+
+def test_bound_parameters(executor):
+    executor.execute('INSERT INTO items VALUES (:id, :name)', params={'id': 1, 'name': "O'Brien"})
+    assert executor.execute('SELECT name FROM items WHERE id = :id', params={'id': 1}) == [{'name': "O'Brien"}]
+
+
+def test_isolated_rolls_back_ddl_and_dml(executor):
+    with executor.isolated() as connection:
+        executor.execute('CREATE TABLE scratch (id INTEGER)', connection=connection)
+        executor.execute("INSERT INTO items VALUES (1, 'a')", connection=connection)
+    assert executor.execute("SELECT name FROM sqlite_master WHERE name = 'scratch'") == []
+    assert executor.execute('SELECT count(*) AS n FROM items') == [{'n': 0}]
+
+
+def test_sqlite_timeout(executor):
+    with pytest.raises(QueryTimeoutError):
+        executor.execute('WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c')
+
+
+def test_execute_stream_yields_batches(executor):
+    executor.execute_many('INSERT INTO items (id, name) VALUES (:id, :name)', [{'id': i, 'name': 'a'} for i in range(5)])
+    batches = list(executor.execute_stream('SELECT id FROM items ORDER BY id', batch_size=2))
+    assert [[row['id'] for row in batch] for batch in batches] == [[0, 1], [2, 3], [4]]
+
+
+def test_pool_status_tracks_occupancy_and_checkout_timeouts(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=1, pool_timeout=0.05)
+    first = executor.connect()
+    second = executor.connect()
+    status = executor.pool_status()
+    assert status['pool_class'] == 'QueuePool'
+    assert (status['size'], status['max_overflow']) == (1, 1)
+    assert (status['checked_out'], status['overflow'], status['utilization']) == (2, 1, 1.0)
+    with pytest.raises(exc.TimeoutError):
+        executor.connect()
+    first.close()
+    second.close()
+
+    executor.execute('SELECT 1')
+    status = executor.pool_status()
+    assert status['checked_out'] == 0
+    assert status['checkouts'] == 3
+    assert status['checkout_timeouts'] == 1
+    assert status['peak_checked_out'] == 2
+    assert status['average_wait_time'] == pytest.approx(status['total_wait_time'] / 3)
+    assert status['max_wait_time'] <= status['total_wait_time']
+    executor.engine.dispose()
+
+
+def test_pool_status_without_a_queue_pool():
+    executor = QueryExecutor('sqlite:///:memory:')
+    executor.execute('SELECT 1')
+    status = executor.pool_status()
+    assert 'size' not in status
+    assert status['checkouts'] == 1
+    assert status['average_wait_time'] == status['total_wait_time']
+    executor.engine.dispose()
@@ -0,0 +1,103 @@
+import yaml
+from modules import test_manager
+from modules.baseline import BaselineStore
+from modules.query_executor import QueryExecutor
+from modules.query_plan import (describe_plan_change, normalize_mysql_plan, normalize_postgresql_plan,
+                                normalize_sqlite_plan, plan_fingerprint, plan_node)
+
+
+def test_normalize_sqlite_plan():
+    rows = [
+        (2, 0, 0, 'SEARCH orders USING INDEX idx_orders_user (user_id=?)'),
+        (3, 0, 0, 'SCAN TABLE users AS u'),
+        (4, 3, 0, 'SEARCH items USING INTEGER PRIMARY KEY (rowid=?)'),
+        (5, 0, 0, 'USE TEMP B-TREE FOR ORDER BY'),
+    ]
+    assert normalize_sqlite_plan(rows) == [
+        plan_node(0, 'SEARCH', 'orders', 'idx_orders_user'),
+        plan_node(0, 'SCAN', 'users', full_scan=True),
+        plan_node(1, 'SEARCH', 'items', 'INTEGER PRIMARY KEY'),
+        plan_node(0, 'USE TEMP B-TREE FOR ORDER BY'),
+    ]
+
+
+def test_normalize_postgresql_plan_drops_costs():
+    document = [{'Plan': {
+        'Node Type': 'Hash Join', 'Join Type': 'Inner', 'Total Cost': 12.5, 'Plans': [
+            {'Node Type': 'Seq Scan', 'Relation Name': 'users', 'Plan Rows': 100},
+            {'Node Type': 'Index Scan', 'Relation Name': 'orders', 'Index Name': 'orders_pkey'},
+        ]
+    }}]
+    nodes = normalize_postgresql_plan(document)
+    assert nodes == [
+        plan_node(0, 'Inner Hash Join'),
+        plan_node(1, 'Seq Scan', 'users', full_scan=True),
+        plan_node(1, 'Index Scan', 'orders', 'orders_pkey'),
+    ]
+    cheaper = [dict(document[0], Plan=dict(document[0]['Plan'], **{'Total Cost': 1.0}))]
+    assert plan_fingerprint(normalize_postgresql_plan(cheaper)) == plan_fingerprint(nodes)
+
+
+def test_normalize_mysql_plan():
+    document = '{"query_block": {"nested_loop": [' \
+        '{"table": {"table_name": "users", "access_type": "ALL"}},' \
+        '{"table": {"table_name": "orders", "access_type": "ref", "key": "idx_user"}}]}}'
+    nodes = normalize_mysql_plan(document)
+    assert [(node['relation'], node['index'], node['full_scan']) for node in nodes] == \
+        [('users', None, True), ('orders', 'idx_user', False)]
+
+
+def test_describe_plan_change():
+    indexed = [plan_node(0, 'SEARCH', 'orders', 'idx_orders_user')]
+    scanned = [plan_node(0, 'SCAN', 'orders', full_scan=True)]
+    assert describe_plan_change(indexed, scanned) == {
+        'new_full_scans': ['orders'], 'dropped_indexes': ['idx_orders_user'], 'likely_regression': True
+    }
+    assert describe_plan_change(scanned, indexed) == {
+        'new_full_scans': [], 'dropped_indexes': [], 'likely_regression': False
+    }
+    assert plan_fingerprint(indexed) != plan_fingerprint(scanned)
+
+
+def test_dropped_index_is_flagged_as_plan_change(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}")
+    executor.execute('CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER)')
+    executor.execute('CREATE INDEX idx_orders_user ON orders (user_id)')
+    cases_dir = tmp_path / 'cases'
+    cases_dir.mkdir()
+    (cases_dir / 'orders.yaml').write_text(yaml.safe_dump([
+        {'name': 'by user', 'query': 'SELECT id FROM orders WHERE user_id = 1', 'expected_output': []},
+        {'name': 'insert', 'query': 'INSERT INTO orders (user_id) VALUES (2)',
+         'expected_output': {'affected_rows': 1}, 'isolated': True},
+    ]))
+    manager = test_manager.TestManager(str(cases_dir), baseline_store=BaselineStore(str(tmp_path / 'baselines.db')))
+
+    first, insert = manager.run_tests(executor, capture_plans=True)
+    assert 'plan_changed' not in first
+    assert 'plan_fingerprint' not in insert
+    assert 'plan_changed' not in manager.run_tests(executor, capture_plans=True)[0]
+
+    executor.execute('DROP INDEX idx_orders_user')
+    changed = manager.run_tests(executor, capture_plans=True)[0]
+    assert changed['status'] == 'PASS'
+    assert changed['plan_changed'] == {
+        'new_full_scans': ['orders'], 'dropped_indexes': ['idx_orders_user'], 'likely_regression': True,
+        'previous_fingerprint': first['plan_fingerprint']
+    }
+    # The new plan becomes the reference
+    assert 'plan_changed' not in manager.run_tests(executor, capture_plans=True)[0]
+    executor.engine.dispose()
+
+
+def test_plan_errors_do_not_fail_the_case(tmp_path, monkeypatch):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}")
+
+    def explain(*args, **kwargs):
+        raise RuntimeError('no plan')
+
+    monkeypatch.setattr(executor, 'explain', explain)
+    manager = test_manager.TestManager(str(tmp_path / 'cases'))
+    result = {'status': 'PASS'}
+    manager._check_plan(executor, {'name': 'one', 'query': 'SELECT 1'}, result)
+    assert result == {'status': 'PASS', 'plan_error': 'no plan'}
+    executor.engine.dispose()
@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+import threading
+import pytest
+import yaml
+from modules.report_writers import ReportWriter, create_writer
+from modules.reporter import ReportGenerator
+
+RESULTS = [
+    {'name': 'first', 'status': 'PASS', 'execution_time': 0.5, 'query': 'SELECT 1'},
+    {'name': 'second', 'status': 'FAIL', 'execution_time': 1.5, 'query': 'SELECT 2', 'error': 'mismatch'},
+    {'name': 'third', 'status': 'ERROR', 'execution_time': 0, 'query': 'SELECT', 'error': 'syntax'},
+]
+
+
+def test_json_report_holds_results_and_summary(tmp_path):
+    report = ReportGenerator(str(tmp_path)).generate_report([dict(result) for result in RESULTS])
+    with open(report['report_file'], encoding='utf-8') as f:
+        document = json.load(f)
+    assert [result['name'] for result in document['test_results']] == ['first', 'second', 'third']
+    summary = document['summary']
+    assert summary == report['summary']
+    assert (summary['total_tests'], summary['passed_tests'], summary['failed_tests'], summary['error_tests']) == (3, 1, 1, 1)
+    # Errors are left out of the average execution time
+    assert summary['average_execution_time'] == 1.0
+
+
+def test_jsonl_report_streams_records(tmp_path):
+    report = ReportGenerator(str(tmp_path)).generate_report([dict(result) for result in RESULTS], format='jsonl')
+    with open(report['report_file'], encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    assert [record['type'] for record in records] == ['header', 'result', 'result', 'result', 'summary']
+
+
+def test_yaml_report_parses(tmp_path):
+    report = ReportGenerator(str(tmp_path)).generate_report([dict(result) for result in RESULTS], format='yaml')
+    with open(report['report_file'], encoding='utf-8') as f:
+        document = yaml.safe_load(f)
+    assert len(document['test_results']) == 3
+    assert document['summary']['total_tests'] == 3
+
+
+def test_empty_yaml_report_has_empty_results(tmp_path):
+    report = ReportGenerator(str(tmp_path)).generate_report([], format='yaml')
+    with open(report['report_file'], encoding='utf-8') as f:
+        assert yaml.safe_load(f)['test_results'] == []
+
+
+def test_html_report_escapes_values(tmp_path):
+    results = [{'name': '<script>', 'status': 'PASS', 'execution_time': 0.1, 'query': 'SELECT 1'}]
+    report = ReportGenerator(str(tmp_path)).generate_report(results, format='html')
+    with open(report['report_file'], encoding='utf-8') as f:
+        page = f.read()
+    assert '&lt;script&gt;' in page and '<script>' not in page
+    assert 'Total Tests: 1' in page
+
+
+def test_gzip_report(tmp_path):
+    generator = ReportGenerator(str(tmp_path), compression='gzip')
+    report = generator.generate_report([dict(result) for result in RESULTS], format='jsonl')
+    assert report['report_file'].endswith('.jsonl.gz')
+    with gzip.open(report['report_file'], 'rt', encoding='utf-8') as f:
+        assert len(f.readlines()) == 5
+
+
+def test_unsupported_format_and_compression(tmp_path):
+    generator = ReportGenerator(str(tmp_path))
+    with pytest.raises(ValueError):
+        generator.begin_report('csv')
+    with pytest.raises(ValueError):
+        generator.begin_report('json', compression='bz2')
+
+
+def test_concurrent_reports_get_their_own_files(tmp_path):
+    generator = ReportGenerator(str(tmp_path))
+    reports = []
+    lock = threading.Lock()
+
+    def start():
+        report = generator.begin_report('jsonl')
+        with lock:
+            reports.append(report)
+
+    threads = [threading.Thread(target=start) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for index, report in enumerate(reports):
+        report.add_result(dict(RESULTS[0], name=f'case {index}'))
+        report.finish()
+
+    assert len({report.path for report in reports}) == 20
+    assert len(os.listdir(tmp_path)) == 20
+    for report in reports:
+        with open(report.path, encoding='utf-8') as f:
+            assert len(f.readlines()) == 3
+
+
+def test_writers_refuse_to_overwrite(tmp_path):
+    path = str(tmp_path / 'report.json')
+    create_writer(path).close()
+    with pytest.raises(FileExistsError):
+        create_writer(path)
+
+
+def test_report_writer_requires_write_result():
+    class Incomplete(ReportWriter):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete(None)
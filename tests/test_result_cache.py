@@ -0,0 +1,157 @@
+import pytest
+from modules import result_cache
+from modules.query_executor import QueryExecutor
+from modules.result_cache import ResultCache, copy_rows
+
+
+def test_key_ignores_whitespace_and_comments():
+    assert ResultCache.make_key('SELECT id FROM users WHERE id = 1') == \
+        ResultCache.make_key('SELECT  id\nFROM users -- lookup\nWHERE id = 1;')
+
+
+def test_key_keeps_identifier_case_and_literals():
+    assert ResultCache.make_key('SELECT 1 AS Total') != ResultCache.make_key('SELECT 1 AS total')
+    assert ResultCache.make_key('SELECT * FROM users WHERE id = 1') != \
+        ResultCache.make_key('SELECT * FROM users WHERE id = 2')
+    assert ResultCache.make_key('SELECT * FROM users WHERE id = :id', {'id': 1}) != \
+        ResultCache.make_key('SELECT * FROM users WHERE id = :id', {'id': 2})
+
+
+@pytest.mark.parametrize('query, cacheable', [
+    ('SELECT * FROM users', True),
+    ('WITH recent AS (SELECT * FROM orders) SELECT * FROM recent', True),
+    ('SELECT random()', False),
+    ('SELECT * FROM users WHERE created_at < NOW()', False),
+    ('SELECT 1; SELECT 2', False),
+    ("UPDATE users SET name = 'x'", False),
+])
+def test_is_cacheable(query, cacheable):
+    assert ResultCache.is_cacheable(query) is cacheable
+
+
+def test_write_invalidates_only_tables_it_changes():
+    cache = ResultCache()
+    users = ResultCache.make_key('SELECT * FROM users')
+    orders = ResultCache.make_key('SELECT * FROM orders')
+    cache.put(users, 'SELECT * FROM users', [{'id': 1}])
+    cache.put(orders, 'SELECT * FROM orders', [{'id': 2}])
+
+    cache.invalidate("UPDATE users SET name = 'x'")
+    assert cache.get(users) is None
+    assert cache.get(orders) == [{'id': 2}]
+
+    cache.invalidate('CALL refresh_everything()')
+    assert cache.get(orders) is None
+
+
+def test_result_read_before_a_write_is_not_stored():
+    cache = ResultCache()
+    key = ResultCache.make_key('SELECT * FROM users')
+    generation = cache.generation
+    cache.invalidate('DELETE FROM users')
+    cache.put(key, 'SELECT * FROM users', [{'id': 1}], generation)
+    assert cache.get(key) is None
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(result_cache.time, 'monotonic', lambda: now[0])
+    cache = ResultCache(ttl=10)
+    key = ResultCache.make_key('SELECT * FROM users')
+    cache.put(key, 'SELECT * FROM users', [{'id': 1}])
+    now[0] += 9
+    assert cache.get(key) == [{'id': 1}]
+    now[0] += 2
+    assert cache.get(key) is None
+    assert cache.stats()['expirations'] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = ResultCache(max_entries=2)
+    keys = [ResultCache.make_key(f'SELECT {i}') for i in range(3)]
+    cache.put(keys[0], 'SELECT 0', [{'v': 0}])
+    cache.put(keys[1], 'SELECT 1', [{'v': 1}])
+    cache.get(keys[0])
+    cache.put(keys[2], 'SELECT 2', [{'v': 2}])
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == [{'v': 0}]
+    assert cache.stats()['evictions'] == 1
+
+
+def test_executor_serves_repeated_reads_and_invalidates_on_write():
+    executor = QueryExecutor('sqlite:///:memory:', result_cache=ResultCache())
+    executor.execute('CREATE TABLE items (id INTEGER)')
+    executor.execute('INSERT INTO items VALUES (1)')
+    assert executor.execute('SELECT count(*) AS n FROM items', use_cache=True) == [{'n': 1}]
+    assert executor.execute('SELECT count(*) AS N FROM items', use_cache=True) == [{'N': 1}]
+
+    rows = executor.execute('SELECT count(*) AS n FROM items', use_cache=True)
+    rows[0]['n'] = 99
+    assert executor.execute('SELECT count(*) AS n FROM items', use_cache=True) == [{'n': 1}]
+    assert executor.result_cache.stats()['hits'] == 2
+
+    executor.execute('INSERT INTO items VALUES (2)')
+    assert executor.execute('SELECT count(*) AS n FROM items', use_cache=True) == [{'n': 2}]
+
+
+@pytest.fixture
+def executor():
+    executor = QueryExecutor('sqlite:///:memory:', result_cache=ResultCache())
+    executor.execute('CREATE TABLE items (id INTEGER, name TEXT)')
+    executor.execute('CREATE TABLE tags (id INTEGER)')
+    executor.execute("INSERT INTO items VALUES (1, 'a')")
+    yield executor
+    executor.engine.dispose()
+
+
+def count(executor, table='items', **params):
+    where = ' WHERE id >= :min_id' if params else ''
+    return executor.execute(f'SELECT count(*) AS n FROM {table}{where}', use_cache=True, params=params)[0]['n']
+
+
+def test_executor_invalidates_only_written_tables(executor):
+    assert (count(executor), count(executor, 'tags')) == (1, 0)
+    executor.execute('INSERT INTO tags VALUES (1)')
+    assert count(executor, 'tags') == 1
+    assert count(executor) == 1
+    assert executor.result_cache.stats()['hits'] == 1
+
+
+def test_batched_and_streamed_writes_invalidate(executor):
+    assert count(executor) == 1
+    executor.execute_many('INSERT INTO items (id, name) VALUES (:id, :name)',
+                          [{'id': 2, 'name': 'b'}, {'id': 3, 'name': 'c'}])
+    assert count(executor) == 3
+    assert list(executor.execute_stream('DELETE FROM items WHERE id > 1')) == []
+    assert count(executor) == 1
+
+
+def test_parameters_are_part_of_the_key(executor):
+    executor.execute("INSERT INTO items VALUES (2, 'b')")
+    assert count(executor, min_id=1) == 2
+    assert count(executor, min_id=2) == 1
+    assert count(executor, min_id=1) == 2
+    assert executor.result_cache.stats()['hits'] == 1
+
+
+def test_caller_connections_bypass_the_cache(executor):
+    assert count(executor) == 1
+    with executor.isolated() as connection:
+        executor.execute("INSERT INTO items VALUES (2, 'b')", connection)
+        # The uncommitted row is visible on the connection but never cached
+        assert executor.execute('SELECT count(*) AS n FROM items', connection, use_cache=True) == [{'n': 2}]
+    assert count(executor) == 1
+
+
+def test_failed_reads_are_not_cached(executor):
+    with pytest.raises(Exception):
+        executor.execute('SELECT missing FROM items', use_cache=True)
+    executor.execute('ALTER TABLE items ADD COLUMN missing INTEGER')
+    assert executor.execute('SELECT missing FROM items', use_cache=True) == [{'missing': None}]
+
+
+def test_copy_rows_copies_each_row():
+    rows = [{'id': 1}]
+    copied = copy_rows(rows)
+    copied[0]['id'] = 2
+    assert rows == [{'id': 1}]
@@ -0,0 +1,85 @@
+import random
+import re
+import pytest
+from modules.security import PatternScanner, SecurityTester
+
+
+def expected_hits(rules, query):
+    """Match each rule on its own, the way the checks did before the scanner."""
+    hits = {}
+    for key, pattern, is_regex, case_sensitive in rules:
+        flags = 0 if case_sensitive else re.IGNORECASE
+        if is_regex:
+            count = 1 if re.search(pattern, query, flags) else 0
+        else:
+            # Every occurrence counts, overlapping ones included
+            count = len(re.findall(f'(?={re.escape(pattern)})', query, flags))
+        if count:
+            hits[key] = count
+    return hits
+
+
+def default_rules():
+    tester = SecurityTester()
+    rules = [(('injection', pattern), pattern, False, True) for pattern in tester.injection_patterns]
+    rules += [(('vulnerability', pattern), pattern, True, False) for pattern in tester.common_vulnerabilities]
+    return rules
+
+
+QUERIES = [
+    "SELECT * FROM users WHERE name = '' OR '1'='1'",
+    "SELECT * FROM users WHERE id = 1' OR '1'='1",
+    "SELECT * FROM users WHERE id = 1; DROP TABLE users; --",
+    "SELECT name FROM t WHERE a = 'x' UNION SELECT password FROM users",
+    "SELECT 'a'\nUNION SELECT 1",
+    "select 'x' union select 1",
+    "SELECT 'x'; exec xp_cmdshell 'dir'",
+    "SELECT * FROM t WHERE note = 'wait' OR 1=1; WAITFOR DELAY '0:0:5'",
+    "SELECT * FROM users WHERE id = 1",
+    "SELECT 'İstanbul' UNION SELECT 1",
+    "'' OR '1'='1' OR '1'='1'",
+]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+def test_scanner_matches_rules_one_by_one(query):
+    rules = default_rules()
+    assert PatternScanner(rules).scan(query) == expected_hits(rules, query)
+
+
+def test_scanner_matches_rules_on_random_queries():
+    rules = default_rules() + [
+        ('prefixed', r"UNION\s+SELECT", True, False),
+        ('fallback', r"\bOR\s+\d+=\d+", True, False),
+        ('cased', 'Drop', False, True),
+    ]
+    scanner = PatternScanner(rules)
+    pieces = ["'", "1", "=", " OR ", "or", " UNION", " select", "\n", "DROP", " TABLE", "; --",
+              "Drop", "exec", "SLEEP(5)", "1=1", "  ", "x", "İ", "WAITFOR", " DELAY"]
+    generator = random.Random(0)
+    for _ in range(2000):
+        query = ''.join(generator.choice(pieces) for _ in range(generator.randint(1, 12)))
+        assert scanner.scan(query) == expected_hits(rules, query), query
+
+
+def test_sql_injection_findings():
+    tester = SecurityTester()
+    findings = tester.test_sql_injection("SELECT * FROM users WHERE name = '' OR '1'='1'; DROP TABLE users")
+    assert {finding['type'] for finding in findings} == {'SQL_INJECTION', 'DANGEROUS_OPERATION'}
+    assert [finding['type'] for finding in tester.test_sql_injection("SELECT 'open")] == ['UNESCAPED_QUOTES']
+    assert tester.test_sql_injection("SELECT 'DROP TABLE users' AS note") == []
+
+
+def test_query_findings():
+    tester = SecurityTester()
+    types = [finding['type'] for finding in tester.test_query('SELECT password FROM users WHERE id = 1')]
+    assert types == ['PARAMETERIZATION', 'SENSITIVE_DATA']
+    assert tester.test_query("SELECT name FROM users WHERE note = 'password' AND id = :id") == []
+
+
+def test_changed_patterns_are_scanned_again():
+    tester = SecurityTester()
+    query = 'SELECT * FROM users WHERE id = 1 -- marker'
+    assert tester.test_sql_injection(query) == []
+    tester.injection_patterns = ['-- marker']
+    assert [finding['pattern'] for finding in tester.test_sql_injection(query)] == ['-- marker']
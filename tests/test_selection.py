@@ -0,0 +1,59 @@
+import pytest
+from modules import selection
+from modules.baseline import query_hash
+
+
+@pytest.mark.parametrize('spec, expected', [('1/1', (1, 1)), ('3/8', (3, 8))])
+def test_parse_shard(spec, expected):
+    assert selection.parse_shard(spec) == expected
+
+
+@pytest.mark.parametrize('spec', ['0/4', '5/4', '1/0', '2', 'a/b', '1/2/3'])
+def test_parse_shard_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        selection.parse_shard(spec)
+
+
+def test_assign_shards_balances_durations():
+    durations = [8, 7, 6, 5, 4, 3, 2, 1]
+    shards = selection.assign_shards(durations, 3)
+    loads = [sum(duration for duration, shard in zip(durations, shards) if shard == index) for index in range(3)]
+    # Longest first onto the least loaded shard: 8+3+2, 7+4+1, 6+5
+    assert sorted(loads) == [11, 12, 13]
+    assert shards[:3] == [0, 1, 2]
+    assert selection.assign_shards(durations, 3) == shards
+
+
+def test_assign_shards_with_more_shards_than_items():
+    assert sorted(selection.assign_shards([1.0, 2.0], 4)) == [0, 1]
+    assert selection.assign_shards([], 2) == []
+
+
+def test_estimate_durations_defaults_to_median():
+    test_cases = [{'name': name, 'query': f'SELECT {index}'} for index, name in enumerate('abcd')]
+    timings = {('a', query_hash('SELECT 0')): 1.0, ('b', query_hash('SELECT 1')): 3.0,
+               ('c', query_hash('SELECT 2')): 5.0}
+    assert selection.estimate_durations(test_cases, timings) == [1.0, 3.0, 5.0, 3.0]
+    assert selection.estimate_durations(test_cases, {}) == [selection.DEFAULT_DURATION] * 4
+
+
+def test_filters_and_shards_partition_the_suite():
+    test_cases = [
+        {'name': f'orders {index}', 'query': f'SELECT {index}', 'tags': ['smoke'] if index % 2 else [],
+         'source_file': 'orders.yaml'}
+        for index in range(10)
+    ] + [{'name': 'users', 'query': 'SELECT 1', 'source_file': 'users.yaml'}]
+
+    assert [case['name'] for case in selection.TestSelection(tags=['smoke']).apply(test_cases)] == \
+        ['orders 1', 'orders 3', 'orders 5', 'orders 7', 'orders 9']
+    assert len(selection.TestSelection(files=['users.*']).apply(test_cases)) == 1
+    assert len(selection.TestSelection(names=['orders *'], files=['users.yaml']).apply(test_cases)) == 0
+    assert not selection.TestSelection()
+
+    shards = [selection.TestSelection(shard=(index, 3)).apply(test_cases) for index in (1, 2, 3)]
+    names = [case['name'] for shard in shards for case in shard]
+    assert sorted(names) == sorted(case['name'] for case in test_cases)
+    assert all(len(shard) in (3, 4) for shard in shards)
+    # Each shard keeps suite order
+    for shard in shards:
+        assert [test_cases.index(case) for case in shard] == sorted(test_cases.index(case) for case in shard)
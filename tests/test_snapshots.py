@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+import pytest
+from modules.snapshots import is_snapshot_path, read_snapshot, write_snapshot
+
+pytest.importorskip('pyarrow')
+
+FORMATS = ['arrow', 'parquet']
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_round_trip(tmp_path, extension):
+    path = str(tmp_path / f'result.{extension}')
+    rows = [{'id': index, 'name': f'n{index}', 'total': Decimal('1.50'), 'day': date(2024, 1, index + 1)}
+            for index in range(5)]
+    assert write_snapshot(path, iter(rows), batch_size=2) == 5
+    assert list(read_snapshot(path, batch_size=2)) == rows
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_empty_result(tmp_path, extension):
+    path = str(tmp_path / f'empty.{extension}')
+    assert write_snapshot(path, []) == 0
+    assert list(read_snapshot(path)) == []
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_null_columns_take_the_type_of_later_values(tmp_path, extension):
+    path = str(tmp_path / f'nulls.{extension}')
+    rows = [{'a': None, 'b': 1}] * 2 + [{'a': 'x', 'b': 2}] + [{'a': None, 'b': 3}] * 2 + [{'a': 'y', 'b': 4}]
+    assert write_snapshot(path, rows, batch_size=2) == 6
+    assert list(read_snapshot(path)) == rows
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_missing_columns_are_null(tmp_path, extension):
+    path = str(tmp_path / f'sparse.{extension}')
+    assert write_snapshot(path, [{'a': 1}, {'a': 2, 'b': 'x'}, {'b': 'y'}], batch_size=3) == 3
+    assert list(read_snapshot(path)) == [{'a': 1, 'b': None}, {'a': 2, 'b': 'x'}, {'a': None, 'b': 'y'}]
+
+
+@pytest.mark.parametrize('extension', FORMATS)
+def test_new_columns_after_the_first_batch_are_rejected(tmp_path, extension):
+    path = str(tmp_path / f'extra.{extension}')
+    write_snapshot(path, [{'a': 0}])
+    with pytest.raises(ValueError, match='extra'):
+        write_snapshot(path, [{'a': 1}, {'a': 2, 'extra': 3}], batch_size=1)
+    # The previous snapshot is left in place
+    assert list(read_snapshot(path)) == [{'a': 0}]
+    assert not (tmp_path / f'extra.{extension}.tmp').exists()
+
+
+def test_conflicting_types_are_rejected(tmp_path):
+    with pytest.raises(ValueError, match='rows 2-2'):
+        write_snapshot(str(tmp_path / 'types.arrow'), [{'a': 1}, {'a': 'x'}], batch_size=1)
+
+
+def test_paths():
+    assert is_snapshot_path('expected/ORDERS.Parquet')
+    assert not is_snapshot_path('expected/orders.csv')
+    with pytest.raises(ValueError):
+        write_snapshot('orders.csv', [])
+    with pytest.raises(ValueError, match='--update-snapshots'):
+        list(read_snapshot('missing.arrow'))
@@ -0,0 +1,133 @@
+import pytest
+from modules import sql_lexer
+from modules.sql_lexer import (analyze, find_keywords, fingerprint, has_parameters, is_unterminated,
+                               statement_type, table_access, tokenize)
+
+
+def token_pairs(query):
+    return [(token.type, token.value) for token in tokenize(query)]
+
+
+def test_doubled_and_backslash_quotes_stay_inside_strings():
+    assert token_pairs("SELECT 'it''s', 'a\\'b' FROM t") == [
+        ('word', 'SELECT'), ('string', "'it''s'"), ('punctuation', ','),
+        ('string', "'a\\'b'"), ('word', 'FROM'), ('word', 't')
+    ]
+
+
+def test_dollar_quoted_strings():
+    assert token_pairs("SELECT $$it's$$, $fn$ SELECT 'x' $fn$") == [
+        ('word', 'SELECT'), ('string', "$$it's$$"), ('punctuation', ','), ('string', "$fn$ SELECT 'x' $fn$")
+    ]
+    assert token_pairs('SELECT $1') == [('word', 'SELECT'), ('parameter', '$1')]
+
+
+def test_comments_hide_quotes_and_keywords():
+    query = "SELECT 1 -- it's\n, 2 /* DROP TABLE users; ' */"
+    assert [token.type for token in tokenize(query)].count('comment') == 2
+    assert [token.value for token in analyze(query).significant] == ['SELECT', '1', ',', '2']
+    assert not is_unterminated(query)
+    assert not find_keywords(query, 'DROP TABLE')
+
+
+@pytest.mark.parametrize('query, unterminated', [
+    ("SELECT 'open", True),
+    ('SELECT "open', True),
+    ("SELECT 'it''s'", False),
+    ("SELECT 'a\\'", False),
+    ("SELECT $$it's$$", False),
+    ("SELECT 1 -- it's", False),
+    ("SELECT 1 /* it's", False),
+])
+def test_is_unterminated(query, unterminated):
+    assert is_unterminated(query) is unterminated
+    assert analyze(query).unterminated is unterminated
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('select 1', 'SELECT'),
+    ('  -- note\n  DELETE FROM t', 'DELETE'),
+    ('(SELECT 1) UNION (SELECT 2)', 'SELECT'),
+    ('WITH recent AS (SELECT * FROM orders) SELECT * FROM recent', 'SELECT'),
+    ('WITH a AS (SELECT 1), b AS (DELETE FROM t RETURNING *) INSERT INTO c SELECT * FROM b', 'INSERT'),
+    ('WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) UPDATE t SET x = 1', 'UPDATE'),
+    ("N'text'", None),
+    ('', None),
+])
+def test_statement_type(query, expected):
+    assert statement_type(query) == expected
+    assert analyze(query).statement_type == expected
+
+
+@pytest.mark.parametrize('query, parameterized', [
+    ('SELECT * FROM t WHERE id = :id', True),
+    ('SELECT * FROM t WHERE id = ?', True),
+    ('SELECT * FROM t WHERE id = %s', True),
+    ('SELECT * FROM t WHERE id = %(id)s', True),
+    ('SELECT * FROM t WHERE id = $1', True),
+    ("SELECT * FROM t WHERE note = ':id ?'", False),
+    ('SELECT 10 % 3, x::int FROM t', False),
+])
+def test_has_parameters(query, parameterized):
+    assert has_parameters(query) is parameterized
+
+
+@pytest.mark.parametrize('query, sequence, found', [
+    ('delete from users', 'DELETE FROM', True),
+    ("SELECT 'DELETE FROM users'", 'DELETE FROM', False),
+    ('SELECT deleted FROM users', 'DELETE', False),
+    ('DELETE /* all */ FROM users', 'DELETE FROM', True),
+    ('SELECT "drop" FROM t', 'DROP', False),
+])
+def test_find_keywords(query, sequence, found):
+    assert find_keywords(query, sequence) is found
+
+
+@pytest.mark.parametrize('query', [
+    "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y');",
+    "SELECT * FROM t WHERE id IN (:a, :b, %s, ?) AND x::int = 10 % 3",
+    "SELECT N'a''b', 1.5e3, .5, f((1, 2), (3)) FROM t;;",
+    "SELECT 'it''s' FROM t -- note",
+    'SELECT "Name" FROM t WHERE x = $1',
+])
+def test_fingerprint_plain_path_matches_tokens(query):
+    expected = []
+    for token in analyze(query).significant:
+        if token.type in sql_lexer.LITERAL_TOKEN_TYPES:
+            expected.append('?')
+        elif token.type == 'word':
+            expected.append(token.value.lower())
+        else:
+            expected.append(token.value)
+            if token.value == ')':
+                sql_lexer._collapse_value_list(expected)
+    while expected and expected[-1] == ';':
+        expected.pop()
+    assert fingerprint(query) == ' '.join(expected)
+
+
+def test_fingerprint_normalizes_literals_and_lists():
+    assert fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x' -- note") == \
+        'select * from t where id in (?+) and name = ?'
+    assert fingerprint('SELECT * FROM t WHERE id IN (:a)') == fingerprint('select * from t where id in (1, 2);')
+
+
+def test_table_access():
+    access = table_access('WITH x AS (SELECT * FROM a) UPDATE b SET c = (SELECT 1 FROM x)')
+    assert access.read == {'a'}
+    assert access.written == {'b'}
+    assert not access.unknown_writes
+
+    access = table_access('SELECT * FROM "My Table" JOIN s.orders o ON o.id = 1')
+    assert access.read == {'my table', 'orders'}
+
+    assert table_access('DELETE FROM users WHERE id = 1').written == {'users'}
+    assert table_access('CALL refresh()').unknown_writes
+    assert table_access('DROP VIEW v').unknown_writes
+
+
+def test_table_access_of_parenthesized_queries():
+    access = table_access('(SELECT a FROM t) UNION (SELECT a FROM u)')
+    assert access.read == {'t', 'u'}
+    assert not access.unknown_writes
+    assert table_access('((SELECT 1)); (DELETE FROM t)').written == {'t'}
@@ -0,0 +1,100 @@
+import threading
+import pytest
+import yaml
+from modules import test_manager
+from modules.query_executor import QueryExecutor
+
+CASES = [
+    {'name': 'count before', 'query': 'SELECT count(*) AS n FROM items', 'expected_output': [{'n': 1}]},
+    {'name': 'names before', 'query': 'SELECT name FROM items', 'expected_output': [{'name': 'a'}]},
+    {'name': 'insert', 'query': "INSERT INTO items (name) VALUES ('b')", 'expected_output': {'affected_rows': 1}},
+    {'name': 'count after insert', 'query': 'SELECT count(*) AS n FROM items', 'expected_output': [{'n': 2}]},
+    {'name': 'max after insert', 'query': 'SELECT max(name) AS m FROM items', 'expected_output': [{'m': 'b'}]},
+    {'name': 'delete', 'query': "DELETE FROM items WHERE name = 'a'", 'expected_output': {'affected_rows': 1}},
+    {'name': 'count after delete', 'query': 'SELECT count(*) AS n FROM items', 'expected_output': [{'n': 1}]},
+]
+NAMES = [test_case['name'] for test_case in CASES]
+
+
+@pytest.fixture
+def executor(tmp_path):
+    executor = QueryExecutor(f"sqlite:///{tmp_path / 'test.db'}")
+    executor.execute('CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)')
+    executor.execute("INSERT INTO items (name) VALUES ('a')")
+    yield executor
+    executor.engine.dispose()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    cases_dir = tmp_path / 'cases'
+    cases_dir.mkdir()
+    (cases_dir / 'items.yaml').write_text(yaml.safe_dump({'test_cases': CASES}, sort_keys=False))
+    return test_manager.TestManager(str(cases_dir))
+
+
+def test_mutating_cases_split_read_only_batches(executor, manager):
+    batches = []
+
+    def run_batch(batch):
+        batches.append([test_case['name'] for test_case in batch])
+        return [manager._run_test_case(executor, test_case) for test_case in batch]
+
+    results = manager._run_batches(executor, manager.load_test_cases(), {}, run_batch, {})
+    assert batches == [['count before', 'names before'], ['count after insert', 'max after insert'],
+                       ['count after delete']]
+    assert [result['name'] for result in results] == NAMES
+    assert {result['status'] for result in results} == {'PASS'}
+
+
+def test_isolated_cases_need_no_barrier(executor, manager):
+    batches = []
+
+    def run_batch(batch):
+        batches.append(len(batch))
+        return [manager._run_test_case(executor, test_case, options={'isolated': True}) for test_case in batch]
+
+    manager._run_batches(executor, manager.load_test_cases(), {'isolated': True}, run_batch, {})
+    assert batches == [len(CASES)]
+
+
+def test_batches_start_longest_first_and_report_in_suite_order(executor, manager):
+    test_cases = manager.load_test_cases()[:2]
+    started = []
+
+    def run_batch(batch):
+        started.extend(test_case['name'] for test_case in batch)
+        return [manager._run_test_case(executor, test_case) for test_case in batch]
+
+    reported = []
+    hooks = {'durations': [1.0, 5.0], 'on_result': lambda result: reported.append(result['name'])}
+    results = manager._run_batches(executor, test_cases, {}, run_batch, hooks)
+    assert started == ['names before', 'count before']
+    assert [result['name'] for result in results] == reported == ['count before', 'names before']
+
+
+@pytest.mark.parametrize('worker_mode', ['thread', 'process'])
+def test_parallel_runs_match_a_serial_run(executor, manager, worker_mode):
+    reported = []
+    results = manager.run_tests(executor, workers=3, worker_mode=worker_mode,
+                                on_result=lambda result: reported.append(result['name']))
+    assert [result['name'] for result in results] == reported == NAMES
+    assert [result['status'] for result in results] == ['PASS'] * len(CASES)
+
+
+def test_cancelled_runs_stop_at_the_next_case(executor, manager):
+    cancel = threading.Event()
+
+    def on_result(result):
+        if result['name'] == 'insert':
+            cancel.set()
+
+    results = manager.run_tests(executor, workers=2, on_result=on_result, cancel=cancel)
+    assert [result['name'] for result in results] == NAMES[:3]
+    # The insert already ran, so the first count now fails
+    assert [result['status'] for result in manager.run_tests(executor, max_failures=1)] == ['FAIL']
+
+
+def test_unsupported_worker_mode(executor, manager):
+    with pytest.raises(ValueError):
+        manager.run_tests(executor, workers=2, worker_mode='fiber')